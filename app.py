@@ -1,238 +1,283 @@
-from flask import Flask, render_template, request, redirect, url_for, session, jsonify, flash
+from flask import Flask, render_template, request, redirect, url_for, session, jsonify, flash, Response, g
+from flask import before_render_template, template_rendered
+from flask.logging import default_handler
 from flask_bcrypt import Bcrypt
 from flask_wtf.csrf import CSRFProtect
 from flask_talisman import Talisman
+from markupsafe import Markup
 import psycopg2
 import psycopg2.extras
+import psycopg2.pool
+import base64
+import hashlib
 import json
 import os
-import logging
+import threading
+import uuid
 from datetime import datetime
+from functools import partial
 from config import Config
+# atexit sırası için önce içe aktarılır: diğer modüllerin kapanış logları da yazılsın
+from structured_logging import ensure_log_listener, setup_logging
+from db_pool import db_connection, pool_stats
+from bootstrap import check_ready
+from permission_cache import permission_cache
+from permission_listener import start_permission_listener
+from rbac import rbac_engine, NO_PERMISSIONS
+from i18n import get_translations, install_reload_signal, translation_catalog
+from exporter import EXPORT_FORMATS, stream_query
+from user_import import ImportTooLarge, UserImportError, import_users_csv
+from password_hashing import VerifierBusyError, needs_rehash, password_verifier
+from last_login import apply_pending_logins, last_login_stats, record_login
+from project_costs import get_project_costs
+from dashboard_stats import SECTION_PERMISSIONS, dashboard_stats
+import static_assets
+from repricing import RepriceError, RepriceFailed, reprice
+from cost_simulation import ScenarioError, SimulationUnavailable, simulate as simulate_costs
+import metrics
+import query_profiler
+from structured_logging import logging_stats
 
 app = Flask(__name__)
 
 # Yetki sistemi yardımcı fonksiyonları
+def get_effective_permissions(user_id):
+    """Kullanıcının derlenmiş yetki maskesini getirir (önbellekli)
+
+    Hata durumunda exception yükseltir.
+    """
+    return rbac_engine.for_user(user_id)
+
 def get_user_permissions(user_id):
     """Kullanıcının tüm yetkilerini getirir"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT DISTINCT p.name, p.module
-            FROM permissions p
-            LEFT JOIN user_permissions up ON p.id = up.permission_id AND up.user_id = %s
-            LEFT JOIN user_roles ur ON ur.user_id = %s
-            LEFT JOIN role_permissions rp ON ur.role_id = rp.role_id AND rp.permission_id = p.id
-            WHERE up.user_id IS NOT NULL OR rp.role_id IS NOT NULL
-        """, (user_id, user_id))
-        
-        permissions = cursor.fetchall()
-        return [{'name': perm[0], 'module': perm[1]} for perm in permissions]
+        compiled = get_effective_permissions(user_id)
+        return [{'name': name, 'module': module} for name, module in compiled.items()]
         
     except Exception as e:
-        app.logger.error(f"Yetki getirme hatası: {e}")
+        app.logger.error("Yetki getirme hatası: %s", e)
         return []
-    finally:
-        if conn:
-            cursor.close()
-            conn.close()
 
 def has_permission(user_id, permission_name):
     """Kullanıcının belirli bir yetkisi var mı kontrol eder"""
+    if not user_id:
+        return False
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT COUNT(*) FROM (
-                SELECT 1 FROM user_permissions up
-                JOIN permissions p ON up.permission_id = p.id
-                WHERE up.user_id = %s AND p.name = %s
-                UNION
-                SELECT 1 FROM user_roles ur
-                JOIN role_permissions rp ON ur.role_id = rp.role_id
-                JOIN permissions p ON rp.permission_id = p.id
-                WHERE ur.user_id = %s AND p.name = %s
-            ) as user_perms
-        """, (user_id, permission_name, user_id, permission_name))
-        
-        count = cursor.fetchone()[0]
-        return count > 0
+        return get_effective_permissions(user_id).has(permission_name)
         
     except Exception as e:
-        app.logger.error(f"Yetki kontrol hatası: {e}")
+        app.logger.error("Yetki kontrol hatası: %s", e)
         return False
-    finally:
-        if conn:
-            cursor.close()
-            conn.close()
 
 def get_user_roles(user_id):
     """Kullanıcının rollerini getirir"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        with db_connection() as conn, conn.cursor() as cursor:
+            cursor.execute("""
+                SELECT r.name, r.description
+                FROM roles r
+                JOIN user_roles ur ON r.id = ur.role_id
+                WHERE ur.user_id = %s
+            """, (user_id,))
         
-        cursor.execute("""
-            SELECT r.name, r.description
-            FROM roles r
-            JOIN user_roles ur ON r.id = ur.role_id
-            WHERE ur.user_id = %s
-        """, (user_id,))
-        
-        roles = cursor.fetchall()
-        return [{'name': role[0], 'description': role[1]} for role in roles]
+            roles = cursor.fetchall()
+            return [{'name': role[0], 'description': role[1]} for role in roles]
         
     except Exception as e:
-        app.logger.error(f"Rol getirme hatası: {e}")
+        app.logger.error("Rol getirme hatası: %s", e)
         return []
-    finally:
-        if conn:
-            cursor.close()
-            conn.close()
 
 def get_all_permissions():
     """Tüm yetkileri getirir"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT id, name, description, module
-            FROM permissions
-            ORDER BY module, name
-        """)
+        with db_connection() as conn, conn.cursor() as cursor:
+            cursor.execute("""
+                SELECT id, name, description, module
+                FROM permissions
+                ORDER BY module, name
+            """)
         
-        permissions = cursor.fetchall()
-        return [{'id': perm[0], 'name': perm[1], 'description': perm[2], 'module': perm[3]} for perm in permissions]
+            permissions = cursor.fetchall()
+            return [{'id': perm[0], 'name': perm[1], 'description': perm[2], 'module': perm[3]} for perm in permissions]
         
     except Exception as e:
-        app.logger.error(f"Tüm yetkileri getirme hatası: {e}")
+        app.logger.error("Tüm yetkileri getirme hatası: %s", e)
         return []
-    finally:
-        if conn:
-            cursor.close()
-            conn.close()
 
 def get_all_roles():
     """Tüm rolleri getirir"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        with db_connection() as conn, conn.cursor() as cursor:
+            cursor.execute("""
+                SELECT id, name, description
+                FROM roles
+                ORDER BY name
+            """)
         
-        cursor.execute("""
-            SELECT id, name, description
-            FROM roles
-            ORDER BY name
-        """)
-        
-        roles = cursor.fetchall()
-        return [{'id': role[0], 'name': role[1], 'description': role[2]} for role in roles]
+            roles = cursor.fetchall()
+            return [{'id': role[0], 'name': role[1], 'description': role[2]} for role in roles]
         
     except Exception as e:
-        app.logger.error(f"Tüm rolleri getirme hatası: {e}")
+        app.logger.error("Tüm rolleri getirme hatası: %s", e)
         return []
-    finally:
-        if conn:
-            cursor.close()
-            conn.close()
 
 def assign_permission_to_user(user_id, permission_id):
     """Kullanıcıya yetki atar"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            INSERT INTO user_permissions (user_id, permission_id, granted_by)
-            VALUES (%s, %s, %s)
-            ON CONFLICT (user_id, permission_id) DO NOTHING
-        """, (user_id, permission_id, session.get('user_id')))
+        with db_connection() as conn, conn.cursor() as cursor:
+            cursor.execute("""
+                INSERT INTO user_permissions (user_id, permission_id, granted_by)
+                VALUES (%s, %s, %s)
+                ON CONFLICT (user_id, permission_id) DO NOTHING
+            """, (user_id, permission_id, session.get('user_id')))
         
-        conn.commit()
+            conn.commit()
+        permission_cache.invalidate(user_id)
         return True
         
     except Exception as e:
-        app.logger.error(f"Yetki atama hatası: {e}")
+        app.logger.error("Yetki atama hatası: %s", e)
         return False
-    finally:
-        if conn:
-            cursor.close()
-            conn.close()
 
 def remove_permission_from_user(user_id, permission_id):
     """Kullanıcıdan yetki kaldırır"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            DELETE FROM user_permissions
-            WHERE user_id = %s AND permission_id = %s
-        """, (user_id, permission_id))
+        with db_connection() as conn, conn.cursor() as cursor:
+            cursor.execute("""
+                DELETE FROM user_permissions
+                WHERE user_id = %s AND permission_id = %s
+            """, (user_id, permission_id))
         
-        conn.commit()
+            conn.commit()
+        permission_cache.invalidate(user_id)
         return True
         
     except Exception as e:
-        app.logger.error(f"Yetki kaldırma hatası: {e}")
+        app.logger.error("Yetki kaldırma hatası: %s", e)
         return False
-    finally:
-        if conn:
-            cursor.close()
-            conn.close()
+
+# Toplu kaydetmede tek ifadede çözümlenen değişiklik kümesi:
+# - unnest ile (ad, işlem) dizileri satırlara açılır ve yetki id'leri çözülür
+# - aynı yetki için birden fazla değişiklik varsa son gelen geçerlidir
+# - atamalar INSERT ... ON CONFLICT DO NOTHING, kaldırmalar tek DELETE ile yapılır
+BATCH_PERMISSIONS_SQL = """
+    WITH input AS (
+        SELECT t.name, t.action, t.ord
+        FROM unnest(%(names)s::text[], %(actions)s::text[]) WITH ORDINALITY AS t(name, action, ord)
+    ),
+    resolved AS (
+        SELECT i.ord, i.name, i.action, p.id AS permission_id
+        FROM input i
+        LEFT JOIN permissions p ON p.name = i.name
+    ),
+    final AS (
+        SELECT DISTINCT ON (permission_id) permission_id, action, ord
+        FROM resolved
+        WHERE permission_id IS NOT NULL AND action IN ('assign', 'revoke')
+        ORDER BY permission_id, ord DESC
+    ),
+    inserted AS (
+        INSERT INTO user_permissions (user_id, permission_id, granted_by)
+        SELECT %(user_id)s, permission_id, %(granted_by)s FROM final WHERE action = 'assign'
+        ON CONFLICT (user_id, permission_id) DO NOTHING
+        RETURNING permission_id
+    ),
+    deleted AS (
+        DELETE FROM user_permissions up
+        USING final f
+        WHERE up.user_id = %(user_id)s AND up.permission_id = f.permission_id AND f.action = 'revoke'
+        RETURNING up.permission_id
+    )
+    SELECT r.name, r.action,
+           CASE
+               WHEN r.permission_id IS NULL THEN 'not_found'
+               WHEN r.action IS NULL OR r.action NOT IN ('assign', 'revoke') THEN 'invalid_action'
+               WHEN f.ord <> r.ord THEN 'superseded'
+               WHEN ins.permission_id IS NOT NULL THEN 'assigned'
+               WHEN del.permission_id IS NOT NULL THEN 'revoked'
+               ELSE 'unchanged'
+           END AS status
+    FROM resolved r
+    LEFT JOIN final f ON f.permission_id = r.permission_id
+    LEFT JOIN inserted ins ON ins.permission_id = r.permission_id AND r.action = 'assign'
+    LEFT JOIN deleted del ON del.permission_id = r.permission_id AND r.action = 'revoke'
+    ORDER BY r.ord
+"""
+
+def batch_save_user_permissions(user_id, changes, granted_by=None):
+    """Yetki değişikliklerini tek sorguda uygular; değişiklik başına sonuç döndürür
+
+    Durumlar: assigned, revoked, unchanged, superseded, not_found, invalid_action
+    """
+    names = []
+    actions = []
+    for change in changes:
+        if not isinstance(change, dict):
+            change = {}
+        names.append(change.get('permission_name') or None)
+        actions.append(change.get('action') or None)
+    
+    with db_connection() as conn, conn.cursor() as cursor:
+        cursor.execute(BATCH_PERMISSIONS_SQL, {
+            'names': names,
+            'actions': actions,
+            'user_id': user_id,
+            'granted_by': granted_by
+        })
+        results = [{'permission_name': name, 'action': action, 'status': status}
+                   for name, action, status in cursor.fetchall()]
+        conn.commit()
+    
+    if any(result['status'] in ('assigned', 'revoked') for result in results):
+        permission_cache.invalidate(user_id)
+    return results
 
 def assign_role_to_user(user_id, role_id):
     """Kullanıcıya rol atar"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        with db_connection() as conn, conn.cursor() as cursor:
+            cursor.execute("""
+                INSERT INTO user_roles (user_id, role_id, assigned_by)
+                VALUES (%s, %s, %s)
+                ON CONFLICT (user_id, role_id) DO NOTHING
+            """, (user_id, role_id, session.get('user_id')))
         
-        cursor.execute("""
-            INSERT INTO user_roles (user_id, role_id, assigned_by)
-            VALUES (%s, %s, %s)
-            ON CONFLICT (user_id, role_id) DO NOTHING
-        """, (user_id, role_id, session.get('user_id')))
-        
-        conn.commit()
+            conn.commit()
+        permission_cache.invalidate(user_id)
         return True
         
     except Exception as e:
-        app.logger.error(f"Rol atama hatası: {e}")
+        app.logger.error("Rol atama hatası: %s", e)
         return False
-    finally:
-        if conn:
-            cursor.close()
-            conn.close()
 
 def remove_role_from_user(user_id, role_id):
     """Kullanıcıdan rol kaldırır"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            DELETE FROM user_roles
-            WHERE user_id = %s AND role_id = %s
-        """, (user_id, role_id))
+        with db_connection() as conn, conn.cursor() as cursor:
+            cursor.execute("""
+                DELETE FROM user_roles
+                WHERE user_id = %s AND role_id = %s
+            """, (user_id, role_id))
         
-        conn.commit()
+            conn.commit()
+        permission_cache.invalidate(user_id)
         return True
         
     except Exception as e:
-        app.logger.error(f"Rol kaldırma hatası: {e}")
+        app.logger.error("Rol kaldırma hatası: %s", e)
         return False
-    finally:
-        if conn:
-            cursor.close()
-            conn.close()
 
 def get_sidebar_menu_items(user_id):
     """Kullanıcının yetkilerine göre sidebar menü öğelerini getirir"""
     menu_items = []
     
+    # Yetkiler tek seferde çözülür; her kontrol bitwise AND'dir
+    try:
+        allowed = get_effective_permissions(user_id)
+    except Exception as e:
+        app.logger.error("Yetki kontrol hatası: %s", e)
+        allowed = NO_PERMISSIONS
+    
     # Dashboard - herkese açık
     menu_items.append({
         'name': 'dashboard',
@@ -243,7 +288,7 @@ def get_sidebar_menu_items(user_id):
     })
     
     # Kullanıcı yönetimi - user_view yetkisi gerekli
-    if has_permission(user_id, 'user_view'):
+    if allowed.has('user_view'):
         menu_items.append({
             'name': 'users',
             'title': 'User Management',
@@ -253,7 +298,7 @@ def get_sidebar_menu_items(user_id):
         })
     
     # Tur yönetimi - tour_view yetkisi gerekli
-    if has_permission(user_id, 'tour_view'):
+    if allowed.has('tour_view'):
         menu_items.append({
             'name': 'tours',
             'title': 'Tour Management',
@@ -263,7 +308,7 @@ def get_sidebar_menu_items(user_id):
         })
     
     # Maliyet yönetimi - cost_view yetkisi gerekli
-    if has_permission(user_id, 'cost_view'):
+    if allowed.has('cost_view'):
         menu_items.append({
             'name': 'costs',
             'title': 'Cost Management',
@@ -273,7 +318,7 @@ def get_sidebar_menu_items(user_id):
         })
     
     # Raporlar - report_view yetkisi gerekli
-    if has_permission(user_id, 'report_view'):
+    if allowed.has('report_view'):
         menu_items.append({
             'name': 'reports',
             'title': 'Reports',
@@ -283,7 +328,7 @@ def get_sidebar_menu_items(user_id):
         })
     
     # Ayarlar - settings_view yetkisi gerekli
-    if has_permission(user_id, 'settings_view'):
+    if allowed.has('settings_view'):
         menu_items.append({
             'name': 'settings',
             'title': 'Settings',
@@ -302,12 +347,43 @@ def get_sidebar_menu_items(user_id):
     })
     
     return menu_items
+
+# Render edilmiş sidebar parçaları: (görünür menüler, dil, endpoint, çeviri sürümü) -> HTML
+SIDEBAR_CACHE_MAX_ENTRIES = 256
+_sidebar_cache = {}
+_sidebar_cache_lock = threading.Lock()
+
+def render_sidebar():
+    """includes/sidebar.html parçasını yetki kümesi ve dile göre önbellekten döndürür
+
+    Aynı menü görünürlüğüne sahip tüm kullanıcılar aynı parçayı paylaşır;
+    aktif menü işareti için endpoint de anahtarın parçasıdır.
+    """
+    menu_items = get_sidebar_menu_items(session.get('user_id'))
+    visible = tuple(item['name'] for item in menu_items)
+    key = (visible, session.get('language', 'en'), request.endpoint, translation_catalog.version)
+    
+    html = _sidebar_cache.get(key)
+    if html is None:
+        html = Markup(render_template('includes/sidebar.html',
+                                      menu_items=menu_items,
+                                      visible_menu=frozenset(visible)))
+        with _sidebar_cache_lock:
+            if len(_sidebar_cache) >= SIDEBAR_CACHE_MAX_ENTRIES:
+                _sidebar_cache.clear()
+            _sidebar_cache[key] = html
+    return html
+
 app.secret_key = Config.SECRET_KEY
 app.permanent_session_lifetime = Config.PERMANENT_SESSION_LIFETIME
 
-# Cache kontrolü - geliştirme için
+# Cache kontrolü - hash'siz /static/ adresleri her seferinde doğrulanır
 app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 0
 
+# Parmak izli statik dosyalar (python static_assets.py): şablonlardaki
+# url_for('static', ...) /assets/<hash'li ad> adresine çevrilir, 1 yıl immutable
+static_assets.init_app(app, Config.STATIC_ASSET_MANIFEST)
+
 # Güvenlik konfigürasyonu
 app.config.update(
     SESSION_COOKIE_SECURE=Config.SESSION_COOKIE_SECURE,
@@ -315,6 +391,7 @@ app.config.update(
     SESSION_COOKIE_SAMESITE=Config.SESSION_COOKIE_SAMESITE,
     REMEMBER_COOKIE_SECURE=Config.REMEMBER_COOKIE_SECURE,
     REMEMBER_COOKIE_HTTPONLY=Config.REMEMBER_COOKIE_HTTPONLY,
+    BCRYPT_LOG_ROUNDS=Config.BCRYPT_LOG_ROUNDS,
 )
 
 # CSRF koruması
@@ -336,104 +413,75 @@ def inject_permissions():
     return {
         'has_permission': has_permission,
         'get_user_permissions': get_user_permissions,
-        'get_user_roles': get_user_roles
+        'get_user_roles': get_user_roles,
+        'render_sidebar': render_sidebar
     }
 
+# Arka plan servisleri - her worker sürecinde ilk istekte başlatılır
+@app.before_request
+def start_background_services():
+    """Süreç başına arka plan thread'lerini başlatır"""
+    ensure_log_listener()
+    if Config.PERMISSION_NOTIFY_ENABLED:
+        start_permission_listener()
+
+# İstek bağlamı - log kayıtlarına request_id/user_id eklenir
+@app.before_request
+def assign_request_context():
+    if Config.METRICS_ENABLED:
+        metrics.begin_request()
+    if Config.QUERY_PROFILER_ENABLED:
+        query_profiler.begin()
+    g.request_id = request.headers.get('X-Request-ID') or uuid.uuid4().hex
+    g.user_id = session.get('user_id')
+
+@app.after_request
+def add_request_id_header(response):
+    request_id = getattr(g, 'request_id', None)
+    if request_id:
+        response.headers['X-Request-ID'] = request_id
+    return response
+
+# Rota bazında süre ölçümleri
+@app.after_request
+def record_request_metrics(response):
+    if not Config.METRICS_ENABLED:
+        return response
+    measured = metrics.end_request()
+    if measured is not None:
+        elapsed, timers, queries = measured
+        # Eşleşmeyen URL'ler tek etikette toplanır (etiket sayısı sınırlı kalsın)
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        metrics.metrics_registry.observe_request(route, request.method, response.status_code,
+                                                 elapsed, timers, queries)
+    return response
+
+# Sorgu profili - istek başına özet başlıkları ve N+1 uyarısı
+@app.after_request
+def report_query_profile(response):
+    summary = query_profiler.finish(Config.QUERY_PROFILER_N1_THRESHOLD)
+    if summary is not None:
+        route = request.url_rule.rule if request.url_rule else request.path
+        query_profiler.report(summary, route, response, Config.QUERY_PROFILER_N1_THRESHOLD)
+    return response
+
+if Config.METRICS_ENABLED:
+    before_render_template.connect(metrics.template_started, app)
+    template_rendered.connect(metrics.template_finished, app)
+
 # Geçici olarak Talisman tamamen devre dışı (geliştirme için)
 # Talisman(app, content_security_policy=csp, force_https=False)
 # Talisman(app, force_https=False)
 
 bcrypt = Bcrypt(app)
 
-# Logging konfigürasyonu
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s %(levelname)s %(name)s %(message)s'
-)
-
-def get_db_connection():
-    """PostgreSQL veritabanı bağlantısı oluşturur"""
-    try:
-        conn = psycopg2.connect(
-            host=Config.DB_HOST,
-            port=Config.DB_PORT,
-            database=Config.DB_NAME,
-            user=Config.DB_USER,
-            password=Config.DB_PASSWORD,
-            connect_timeout=5
-        )
-        return conn
-    except psycopg2.Error as e:
-        app.logger.error(f"PostgreSQL bağlantı hatası: {e}")
-        return None
-
-
-def init_database():
-    """PostgreSQL veritabanı tablolarını oluşturur"""
-    conn = get_db_connection()
-    if not conn:
-        return False
-    
-    try:
-        cur = conn.cursor()
-        
-        # Kullanıcılar tablosu
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS users (
-                id SERIAL PRIMARY KEY,
-                username VARCHAR(50) UNIQUE NOT NULL,
-                email VARCHAR(100) UNIQUE NOT NULL,
-                password VARCHAR(255) NOT NULL,
-                full_name VARCHAR(100) NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                is_active BOOLEAN DEFAULT TRUE,
-                last_login TIMESTAMP,
-                language VARCHAR(5) DEFAULT 'en'
-            )
-        """)
-        
-        # Varsayılan admin kullanıcısı oluştur (şifre: admin123)
-        admin_password = bcrypt.generate_password_hash('admin123').decode('utf-8')
-        cur.execute("""
-            INSERT INTO users (username, email, password, full_name, language) 
-            VALUES (%s, %s, %s, %s, %s)
-            ON CONFLICT (username) DO UPDATE SET
-                email = EXCLUDED.email,
-                password = EXCLUDED.password,
-                full_name = EXCLUDED.full_name
-        """, ('admin', 'admin@example.com', admin_password, 'Administrator', 'en'))
-        
-        # Test kullanıcısı oluştur (şifre: test123)
-        test_password = bcrypt.generate_password_hash('test123').decode('utf-8')
-        cur.execute("""
-            INSERT INTO users (username, email, password, full_name, language) 
-            VALUES (%s, %s, %s, %s, %s)
-            ON CONFLICT (username) DO UPDATE SET
-                email = EXCLUDED.email,
-                password = EXCLUDED.password,
-                full_name = EXCLUDED.full_name
-        """, ('test', 'test@example.com', test_password, 'Test User', 'tr'))
-        
-        conn.commit()
-        cur.close()
-        conn.close()
-        return True
-    except psycopg2.Error as e:
-        print(f"PostgreSQL başlatma hatası: {e}")
-        return False
+# Logging konfigürasyonu - kayıtlar kuyruğa, JSON biçimlendirme ve G/Ç listener thread'inde
+setup_logging()
+app.logger.removeHandler(default_handler)
 
 def load_translations(lang='en'):
-    """Çeviri dosyalarını yükler"""
-    try:
-        with open(f'translations/{lang}.json', 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        # Fallback olarak İngilizce yükle
-        try:
-            with open('translations/en.json', 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            return {}
+    """Çevirileri bellek içi katalogdan döndürür (bkz. i18n.TranslationCatalog)"""
+    return get_translations(lang)
 
 @app.context_processor
 def inject_translations():
@@ -465,23 +513,19 @@ def login():
             return render_template('login.html')
         
         # Veritabanından kullanıcıyı kontrol et
-        conn = get_db_connection()
-        if not conn:
-            flash('Sistem hatası (veritabanı).', 'error')
-            return render_template('login.html')
-        
         try:
-            cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-            cur.execute("""
-                SELECT id, username, email, password, full_name, is_active, language
-                FROM users 
-                WHERE username = %s AND is_active = TRUE
-            """, (username,))
-            
-            user = cur.fetchone()
+            with db_connection() as conn, conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+                cur.execute("""
+                    SELECT id, username, email, password, full_name, is_active, language
+                    FROM users 
+                    WHERE username = %s AND is_active = TRUE
+                """, (username,))
+                
+                user = cur.fetchone()
             
-            if not user or not bcrypt.check_password_hash(user['password'], password):
-                app.logger.warning(f"Failed login attempt for username: {username} from IP: {request.remote_addr}")
+            # bcrypt kontrolü ayrı, sınırlı havuzda; bu sırada bağlantı tutulmaz
+            if not user or not password_verifier.verify(password, user['password']):
+                app.logger.warning("Failed login attempt for username: %s from IP: %s", username, request.remote_addr)
                 flash('Kullanıcı adı veya şifre hatalı.', 'error')
                 return render_template('login.html')
             
@@ -497,27 +541,44 @@ def login():
             if remember_me:
                 session.permanent = True
             
-            # Son giriş zamanını güncelle
-            cur.execute("UPDATE users SET last_login = NOW() WHERE id = %s", (user['id'],))
-            conn.commit()
+            # Son giriş zamanı write-behind kuyruğuna yazılır (toplu UPDATE)
+            record_login(user['id'])
             
-            app.logger.info(f"Successful login for user: {username} from IP: {request.remote_addr}")
+            # Maliyet faktörü değiştiyse parolayı arka planda yeniden hash'le
+            if needs_rehash(user['password']):
+                password_verifier.hash_async(password, partial(update_password_hash, user['id']))
+            
+            app.logger.info("Successful login for user: %s from IP: %s", username, request.remote_addr)
             return redirect(url_for('dashboard'))
                 
+        except VerifierBusyError as e:
+            app.logger.warning("Login shed for username %s: %s", username, e)
+            flash('Sistem şu anda yoğun, lütfen birkaç saniye sonra tekrar deneyin.', 'error')
+            return render_template('login.html'), 503, {'Retry-After': str(Config.LOGIN_RETRY_AFTER)}
+        except psycopg2.pool.PoolError as e:
+            app.logger.error("Login error for username %s: %s", username, e)
+            flash('Sistem hatası (veritabanı).', 'error')
         except Exception as e:
-            app.logger.error(f"Login error for username {username}: {e}")
+            app.logger.error("Login error for username %s: %s", username, e)
             flash('Giriş sırasında hata oluştu!', 'error')
-        finally:
-            if conn:
-                conn.close()
     
     return render_template('login.html')
 
+def update_password_hash(user_id, hashed):
+    """Girişte yeniden hash'lenen parolayı kaydeder"""
+    try:
+        with db_connection() as conn, conn.cursor() as cur:
+            cur.execute("UPDATE users SET password = %s WHERE id = %s", (hashed, user_id))
+            conn.commit()
+        app.logger.info("Password rehashed for user id %s", user_id)
+    except Exception as e:
+        app.logger.error("Password rehash error for user id %s: %s", user_id, e)
+
 @app.route('/logout')
 def logout():
     """Çıkış yap"""
     if session.get('username'):
-        app.logger.info(f"User logout: {session.get('username')} from IP: {request.remote_addr}")
+        app.logger.info("User logout: %s from IP: %s", session.get('username'), request.remote_addr)
     session.clear()
     return redirect(url_for('login'))
 
@@ -527,39 +588,303 @@ def dashboard():
     if not session.get('user_id'):
         return redirect(url_for('login'))
     
-    return render_template('dashboard.html')
+    try:
+        stats, _ = dashboard_stats.for_permissions(dashboard_permissions(session.get('user_id')))
+    except Exception as e:
+        app.logger.error("Dashboard stats error: %s", e)
+        stats = {}
+    return render_template('dashboard.html', stats=stats)
 
-@app.route('/users')
-def users():
-    """Kullanıcı yönetimi sayfası"""
+def dashboard_permissions(user_id):
+    """Panel bölümlerinden kullanıcının görebildiği yetkiler (yetki önbelleğinden)"""
+    return {permission for permission in SECTION_PERMISSIONS.values() if has_permission(user_id, permission)}
+
+def conditional_json(etag, build_payload, max_age=None):
+    """ETag'li JSON yanıtı; If-None-Match eşleşirse gövdeyi üretmeden 304 döner
+
+    ``max_age`` verilmezse istemci her kullanımda doğrulama yapar (no-cache).
+    """
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    else:
+        response = jsonify(build_payload())
+    response.set_etag(etag, weak=True)
+    response.cache_control.private = True
+    if max_age is None:
+        response.cache_control.no_cache = True
+    else:
+        response.cache_control.max_age = max_age
+    return response
+
+@app.route('/api/dashboard/stats')
+def api_dashboard_stats():
+    """Önbellekteki panel özetleri; yetkisiz bölümler çıkarılır, ETag ile 304 döner"""
     if not session.get('user_id'):
-        return redirect(url_for('login'))
+        return jsonify({'success': False, 'message': 'Oturum açmanız gerekiyor!'}), 401
     
-    # Veritabanından kullanıcıları getir
-    conn = get_db_connection()
-    if not conn:
-        flash('Database connection error!', 'error')
-        return render_template('definitions/user.html', users=[])
+    try:
+        stats, etag = dashboard_stats.for_permissions(dashboard_permissions(session.get('user_id')))
+    except Exception as e:
+        app.logger.error("Dashboard stats error: %s", e)
+        return jsonify({'success': False, 'message': 'Veri yüklenirken hata oluştu!'}), 503
     
+    return conditional_json(etag, lambda: {'success': True, 'data': stats}, dashboard_stats.max_age())
+
+# Kullanıcı listesi - keyset (seek) sayfalama
+# Sıralanabilir sütunlar: keyset karşılaştırması için NULL içermemeli
+USER_LIST_SORT_COLUMNS = ('created_at', 'username', 'email', 'id')
+USER_LIST_TEXT_FILTERS = ('username', 'email', 'country', 'region', 'department', 'position')
+USER_LIST_DEFAULT_LIMIT = 50
+USER_LIST_MAX_LIMIT = 200
+# Dışa aktarılabilir sütunlar (parola hash'i asla dahil edilmez)
+USER_EXPORT_COLUMNS = ('id', 'username', 'email', 'first_name', 'last_name', 'full_name',
+                       'country', 'region', 'department', 'position', 'is_active',
+                       'created_at', 'last_login')
+
+def _escape_like(value):
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+def encode_user_cursor(sort, direction, row):
+    """Son satırdan opak sayfa imleci üretir"""
+    value = row[sort]
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    payload = json.dumps([sort, direction, value, row['id']], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_user_cursor(token, sort, direction):
+    """İmleci çözer; farklı bir sıralamaya aitse ValueError yükseltir"""
     try:
-        cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-        cur.execute("""
+        padded = token + '=' * (-len(token) % 4)
+        cursor_sort, cursor_direction, value, last_id = json.loads(base64.urlsafe_b64decode(padded))
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if cursor_sort != sort or cursor_direction != direction:
+        raise ValueError('Cursor does not match sort order')
+    return value, int(last_id)
+
+def build_user_filters(filters):
+    """Liste/dışa aktarma filtrelerinden WHERE koşullarını ve parametreleri üretir"""
+    conditions = []
+    params = []
+    for field in USER_LIST_TEXT_FILTERS:
+        value = (filters.get(field) or '').strip()
+        if value:
+            conditions.append(f"{field} ILIKE %s")
+            params.append(f"%{_escape_like(value)}%")
+    
+    is_active = (filters.get('is_active') or '').strip().lower()
+    if is_active in ('true', '1', 'on'):
+        conditions.append("is_active = TRUE")
+    elif is_active in ('false', '0', 'off'):
+        conditions.append("is_active = FALSE")
+    
+    return conditions, params
+
+def fetch_users_page(filters, sort='created_at', direction='desc', cursor=None, limit=USER_LIST_DEFAULT_LIMIT):
+    """Filtrelenmiş kullanıcı listesinin bir sayfasını ve sonraki imleci döndürür
+
+    Sayfalama OFFSET yerine (sıralama sütunu, id) üzerinden yapılır; her sayfa
+    tablo boyutundan bağımsız olarak indeks üzerinde sabit maliyetlidir.
+    """
+    if sort not in USER_LIST_SORT_COLUMNS:
+        raise ValueError('Invalid sort column')
+    direction = 'asc' if direction == 'asc' else 'desc'
+    
+    conditions, params = build_user_filters(filters)
+    
+    if cursor:
+        value, last_id = decode_user_cursor(cursor, sort, direction)
+        operator = '<' if direction == 'desc' else '>'
+        conditions.append(f"({sort}, id) {operator} (%s, %s)")
+        params.extend([value, last_id])
+    
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+    params.append(limit + 1)
+    
+    with db_connection() as conn, conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+        cur.execute(f"""
             SELECT id, username, email, first_name, last_name, full_name, 
                    country, region, department, position, is_active, created_at, last_login
             FROM users
-            ORDER BY created_at DESC
-        """)
-        users = cur.fetchall()
-        
-        return render_template('definitions/user.html', users=users)
+            {where}
+            ORDER BY {sort} {direction}, id {direction}
+            LIMIT %s
+        """, params)
+        rows = cur.fetchall()
+        # Bu süreçte henüz yazılmamış giriş zamanları (veritabanı saatiyle)
+        apply_pending_logins(rows, cur)
+    
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_user_cursor(sort, direction, rows[-1])
+    return rows, next_cursor
+
+def serialize_user_row(row):
+    """Liste satırını JSON'a hazırlar (tarihler tablo biçiminde)"""
+    data = dict(row)
+    for field in ('created_at', 'last_login'):
+        if data.get(field):
+            data[field] = data[field].strftime('%Y-%m-%d %H:%M:%S')
+    return data
+
+@app.route('/users')
+def users():
+    """Kullanıcı yönetimi sayfası"""
+    if not session.get('user_id'):
+        return redirect(url_for('login'))
+    
+    # İlk sayfa sunucuda render edilir; sonraki sayfalar /api/users'tan yüklenir
+    try:
+        users, next_cursor = fetch_users_page({})
+        return render_template('definitions/user.html', users=users, next_cursor=next_cursor)
         
+    except psycopg2.pool.PoolError as e:
+        app.logger.error("Users loading error: %s", e)
+        flash('Database connection error!', 'error')
+        return render_template('definitions/user.html', users=[], next_cursor=None)
     except psycopg2.Error as e:
-        app.logger.error(f"Users loading error: {e}")
+        app.logger.error("Users loading error: %s", e)
         flash('Kullanıcılar yüklenirken hata oluştu!', 'error')
-        return render_template('definitions/user.html', users=[])
-    finally:
-        if conn:
-            conn.close()
+        return render_template('definitions/user.html', users=[], next_cursor=None)
+
+@app.route('/api/users')
+def api_users():
+    """Filtrelenmiş, keyset sayfalı kullanıcı listesi"""
+    if not session.get('user_id'):
+        return jsonify({'success': False, 'message': 'Oturum açmanız gerekiyor!'})
+    
+    # Yetki kontrolü
+    if not has_permission(session.get('user_id'), 'user_view'):
+        return jsonify({'success': False, 'message': 'Bu işlem için yetkiniz yok!'})
+    
+    sort = request.args.get('sort', 'created_at')
+    direction = request.args.get('direction', 'desc').lower()
+    if sort not in USER_LIST_SORT_COLUMNS or direction not in ('asc', 'desc'):
+        return jsonify({'success': False, 'message': 'Invalid sort parameter!'}), 400
+    
+    try:
+        limit = int(request.args.get('limit', USER_LIST_DEFAULT_LIMIT))
+    except ValueError:
+        limit = USER_LIST_DEFAULT_LIMIT
+    limit = max(1, min(limit, USER_LIST_MAX_LIMIT))
+    
+    try:
+        users, next_cursor = fetch_users_page(request.args, sort, direction,
+                                              request.args.get('cursor'), limit)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    except Exception as e:
+        app.logger.error("API users error: %s", e)
+        return jsonify({'success': False, 'message': 'Veri yüklenirken hata oluştu!'})
+    
+    return jsonify({
+        'success': True,
+        'data': {
+            'users': [serialize_user_row(user) for user in users],
+            'next_cursor': next_cursor
+        }
+    })
+
+@app.route('/api/users/export')
+def api_users_export():
+    """Filtrelenmiş kullanıcı listesini CSV/NDJSON olarak akış halinde dışa aktar"""
+    if not session.get('user_id'):
+        return jsonify({'success': False, 'message': 'Oturum açmanız gerekiyor!'})
+    
+    # Yetki kontrolü
+    if not has_permission(session.get('user_id'), 'report_export'):
+        return jsonify({'success': False, 'message': 'Bu işlem için yetkiniz yok!'})
+    
+    fmt = request.args.get('format', 'csv').lower()
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({'success': False, 'message': 'Invalid export format!'}), 400
+    
+    sort = request.args.get('sort', 'created_at')
+    direction = request.args.get('direction', 'desc').lower()
+    if sort not in USER_LIST_SORT_COLUMNS or direction not in ('asc', 'desc'):
+        return jsonify({'success': False, 'message': 'Invalid sort parameter!'}), 400
+    
+    requested = [c.strip() for c in request.args.get('columns', '').split(',') if c.strip()]
+    if any(column not in USER_EXPORT_COLUMNS for column in requested):
+        return jsonify({'success': False, 'message': 'Invalid export column!'}), 400
+    columns = requested or list(USER_EXPORT_COLUMNS)
+    
+    conditions, params = build_user_filters(request.args)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+    sql = f"""
+        SELECT {', '.join(columns)}
+        FROM users
+        {where}
+        ORDER BY {sort} {direction}, id {direction}
+    """
+    
+    try:
+        body = stream_query(sql, params, columns, fmt, Config.EXPORT_FETCH_SIZE)
+    except psycopg2.pool.PoolError as e:
+        app.logger.error("User export error: %s", e)
+        return jsonify({'success': False, 'message': 'Database connection error!'}), 503
+    except Exception as e:
+        app.logger.error("User export error: %s", e)
+        return jsonify({'success': False, 'message': 'Dışa aktarma sırasında hata oluştu!'})
+    
+    filename = f"users-{datetime.now().strftime('%Y%m%d-%H%M%S')}.{fmt}"
+    return Response(body, content_type=EXPORT_FORMATS[fmt],
+                    headers={'Content-Disposition': f'attachment; filename="{filename}"',
+                             'X-Accel-Buffering': 'no'})
+
+@app.route('/api/users/import', methods=['POST'])
+@csrf.exempt
+def api_users_import():
+    """CSV'den toplu kullanıcı içe aktar (COPY + paralel bcrypt)"""
+    if not session.get('user_id'):
+        return jsonify({'success': False, 'message': 'Oturum açmanız gerekiyor!'})
+    
+    # Yetki kontrolü
+    if not has_permission(session.get('user_id'), 'user_create'):
+        return jsonify({'success': False, 'message': 'Bu işlem için yetkiniz yok!'})
+    
+    # Boyut sınırı gövde okunmadan kontrol edilir; büyük dosyalar CLI ile yüklenir
+    max_bytes = Config.USER_IMPORT_HTTP_MAX_BYTES
+    too_large = {'success': False,
+                 'message': f'File too large (max {max_bytes} bytes); use user_import.py for larger files!'}
+    if request.content_length and request.content_length > max_bytes + 64 * 1024:
+        return jsonify(too_large), 413
+    
+    upload = request.files.get('file')
+    if not upload:
+        return jsonify({'success': False, 'message': 'CSV file is required!'}), 400
+    
+    raw = upload.read(max_bytes + 1)
+    if len(raw) > max_bytes:
+        return jsonify(too_large), 413
+    try:
+        content = raw.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        return jsonify({'success': False, 'message': 'File must be UTF-8 encoded!'}), 400
+    
+    try:
+        report = import_users_csv(content, max_rows=Config.USER_IMPORT_HTTP_MAX_ROWS)
+    except ImportTooLarge as e:
+        return jsonify({'success': False, 'message': f'{e}; use user_import.py for larger files!'}), 413
+    except UserImportError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    except psycopg2.pool.PoolError as e:
+        app.logger.error("User import error: %s", e)
+        return jsonify({'success': False, 'message': 'Database connection error!'}), 503
+    except Exception as e:
+        app.logger.error("User import error: %s", e)
+        return jsonify({'success': False, 'message': 'İçe aktarma sırasında hata oluştu!'})
+    
+    dashboard_stats.invalidate()
+    app.logger.info("User import - %s/%s rows inserted, %s rows/sec",
+                    report['inserted'], report['total_rows'], report['rows_per_sec'])
+    return jsonify({
+        'success': True,
+        'message': f"{report['inserted']} users imported.",
+        'data': report
+    })
 
 @app.route('/change_language/<lang>')
 def change_language(lang):
@@ -580,67 +905,67 @@ def user_permissions(user_id):
         return redirect(url_for('login'))
     
     # Yetki kontrolü - sadece admin ve manager yetkisi olanlar
-    if not has_permission(session.get('user_id'), 'user.edit'):
+    if not has_permission(session.get('user_id'), 'user_edit'):
         flash('Bu sayfaya erişim yetkiniz yok!', 'error')
         return redirect(url_for('users'))
     
     # Users sayfasına yönlendir ve popup açılmasını sağla
     return redirect(url_for('users') + f'#permissions-{user_id}')
 
+def user_permissions_etag(user, compiled):
+    """Yetki modalı yanıtının sürüm belirteci
+
+    Katalog sürümü, kullanıcının etkin yetki maskesi (önbellekten) ve kullanıcı
+    satırından türetilir; yük (tam katalog + gruplama) üretilmeden hesaplanır.
+    """
+    token = repr((compiled.catalog.version, compiled.mask, sorted(user.items())))
+    return hashlib.sha1(token.encode('utf-8')).hexdigest()
+
 @app.route('/api/user_permissions/<int:user_id>')
 def api_user_permissions(user_id):
-    """API endpoint for user permissions data"""
+    """API endpoint for user permissions data (ETag / 304 destekli)"""
     if not session.get('user_id'):
         return jsonify({'success': False, 'message': 'Oturum açmanız gerekiyor!'})
     
     # Yetki kontrolü
-    if not has_permission(session.get('user_id'), 'user.edit'):
+    if not has_permission(session.get('user_id'), 'user_edit'):
         return jsonify({'success': False, 'message': 'Bu işlem için yetkiniz yok!'})
     
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-        
-        # Kullanıcı bilgilerini getir
-        cursor.execute("""
-            SELECT id, username, email, full_name, is_active, created_at, last_login
-            FROM users WHERE id = %s
-        """, (user_id,))
-        user = cursor.fetchone()
+        with db_connection() as conn, conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
+            # Kullanıcı bilgilerini getir
+            cursor.execute("""
+                SELECT id, username, email, full_name, is_active, created_at, last_login
+                FROM users WHERE id = %s
+            """, (user_id,))
+            user = cursor.fetchone()
         
         if not user:
             return jsonify({'success': False, 'message': 'Kullanıcı bulunamadı!'})
         
-        # Kullanıcının mevcut yetkilerini getir
-        user_permissions = get_user_permissions(user_id)
-        
-        # Tüm yetkileri getir
-        all_permissions = get_all_permissions()
-        
-        # Modüllere göre yetkileri grupla
-        permissions_by_module = {}
-        for perm in all_permissions:
-            module = perm['module']
-            if module not in permissions_by_module:
-                permissions_by_module[module] = []
-            permissions_by_module[module].append(perm)
-        
-        return jsonify({
-            'success': True,
-            'data': {
-                'user': dict(user),
-                'user_permissions': user_permissions,
-                'permissions_by_module': permissions_by_module
+        # Kullanıcının mevcut yetkileri (derlenmiş maske, önbellekli)
+        compiled = get_effective_permissions(user_id)
+        
+        def build_payload():
+            # Tüm yetkileri getir ve modüllere göre grupla
+            permissions_by_module = {}
+            for perm in get_all_permissions():
+                permissions_by_module.setdefault(perm['module'], []).append(perm)
+            
+            return {
+                'success': True,
+                'data': {
+                    'user': dict(user),
+                    'user_permissions': [{'name': name, 'module': module} for name, module in compiled.items()],
+                    'permissions_by_module': permissions_by_module
+                }
             }
-        })
+        
+        return conditional_json(user_permissions_etag(user, compiled), build_payload)
         
     except Exception as e:
-        app.logger.error(f"API user permissions error: {e}")
+        app.logger.error("API user permissions error: %s", e)
         return jsonify({'success': False, 'message': 'Veri yüklenirken hata oluştu!'})
-    finally:
-        if conn:
-            cursor.close()
-            conn.close()
 
 @app.route('/api/user_permissions/<int:user_id>/assign', methods=['POST'])
 @csrf.exempt
@@ -650,65 +975,56 @@ def api_assign_permission(user_id):
         return jsonify({'success': False, 'message': 'Oturum açmanız gerekiyor!'})
     
     # Yetki kontrolü
-    if not has_permission(session.get('user_id'), 'user.edit'):
+    if not has_permission(session.get('user_id'), 'user_edit'):
         return jsonify({'success': False, 'message': 'Bu işlem için yetkiniz yok!'})
     
     try:
         data = request.get_json()
         permission_name = data.get('permission_name')
         
-        app.logger.info(f"=== ASSIGN PERMISSION DEBUG ===")
-        app.logger.info(f"User ID: {user_id}")
-        app.logger.info(f"Permission Name: {permission_name}")
-        app.logger.info(f"Request Data: {data}")
+        app.logger.debug("Assign permission request - user_id=%s permission=%s", user_id, permission_name)
         
         if not permission_name:
             return jsonify({'success': False, 'message': 'Permission name is required!'})
         
         # Permission ID'yi bul
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT id FROM permissions WHERE name = %s", (permission_name,))
-        permission = cursor.fetchone()
+        with db_connection() as conn, conn.cursor() as cursor:
+            cursor.execute("SELECT id FROM permissions WHERE name = %s", (permission_name,))
+            permission = cursor.fetchone()
         
-        if not permission:
-            return jsonify({'success': False, 'message': 'Permission not found!'})
+            if not permission:
+                return jsonify({'success': False, 'message': 'Permission not found!'})
         
-        permission_id = permission[0]
-        app.logger.info(f"Found permission ID: {permission_id} for permission: {permission_name}")
+            permission_id = permission[0]
+            app.logger.debug("Found permission id=%s for %s", permission_id, permission_name)
         
-        # Kullanıcıya permission atanmış mı kontrol et
-        cursor.execute("""
-            SELECT COUNT(*) FROM user_permissions 
-            WHERE user_id = %s AND permission_id = %s
-        """, (user_id, permission_id))
+            # Kullanıcıya permission atanmış mı kontrol et
+            cursor.execute("""
+                SELECT COUNT(*) FROM user_permissions 
+                WHERE user_id = %s AND permission_id = %s
+            """, (user_id, permission_id))
         
-        existing_count = cursor.fetchone()[0]
+            existing_count = cursor.fetchone()[0]
         
-        if existing_count > 0:
-            # Permission zaten atanmış
-            return jsonify({'success': True, 'message': 'Permission was already assigned!'})
+            if existing_count > 0:
+                # Permission zaten atanmış
+                return jsonify({'success': True, 'message': 'Permission was already assigned!'})
         
-        # Permission ata
-        app.logger.info(f"Inserting permission - User ID: {user_id}, Permission ID: {permission_id}")
-        cursor.execute("""
-            INSERT INTO user_permissions (user_id, permission_id) 
-            VALUES (%s, %s)
-        """, (user_id, permission_id))
+            # Permission ata
+            cursor.execute("""
+                INSERT INTO user_permissions (user_id, permission_id) 
+                VALUES (%s, %s)
+            """, (user_id, permission_id))
         
-        conn.commit()
-        app.logger.info(f"Permission assigned successfully - User ID: {user_id}, Permission ID: {permission_id}")
+            conn.commit()
+            permission_cache.invalidate(user_id)
+            app.logger.info("Permission assigned successfully - User ID: %s, Permission ID: %s", user_id, permission_id)
         
-        return jsonify({'success': True, 'message': 'Permission assigned successfully!'})
+            return jsonify({'success': True, 'message': 'Permission assigned successfully!'})
         
     except Exception as e:
-        app.logger.error(f"Permission assign error: {e}")
+        app.logger.error("Permission assign error: %s", e)
         return jsonify({'success': False, 'message': 'Failed to assign permission!'})
-    finally:
-        if conn:
-            cursor.close()
-            conn.close()
 
 @app.route('/api/user_permissions/<int:user_id>/batch', methods=['POST'])
 @csrf.exempt
@@ -718,87 +1034,35 @@ def api_batch_save_permissions(user_id):
         return jsonify({'success': False, 'message': 'Oturum açmanız gerekiyor!'})
     
     # Yetki kontrolü
-    if not has_permission(session.get('user_id'), 'user.edit'):
+    if not has_permission(session.get('user_id'), 'user_edit'):
         return jsonify({'success': False, 'message': 'Bu işlem için yetkiniz yok!'})
     
     try:
         data = request.get_json()
         changes = data.get('changes', [])
         
-        app.logger.info(f"Batch save permissions - User ID: {user_id}, Changes: {len(changes)}")
+        app.logger.info("Batch save permissions - User ID: %s, Changes: %s", user_id, len(changes))
         
         if not changes:
             return jsonify({'success': True, 'message': 'No changes to save!'})
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        results = batch_save_user_permissions(user_id, changes, session.get('user_id'))
         
-        success_count = 0
-        error_count = 0
-        
-        for change in changes:
-            permission_name = change.get('permission_name')
-            action = change.get('action')  # 'assign' or 'revoke'
-            
-            if not permission_name or not action:
-                error_count += 1
-                continue
-            
-            # Permission ID'yi bul
-            cursor.execute("SELECT id FROM permissions WHERE name = %s", (permission_name,))
-            permission = cursor.fetchone()
-            
-            if not permission:
-                app.logger.warning(f"Permission not found: {permission_name}")
-                error_count += 1
-                continue
-            
-            permission_id = permission[0]
-            
-            if action == 'assign':
-                # Permission ata
-                cursor.execute("""
-                    SELECT COUNT(*) FROM user_permissions 
-                    WHERE user_id = %s AND permission_id = %s
-                """, (user_id, permission_id))
-                
-                existing_count = cursor.fetchone()[0]
-                
-                if existing_count == 0:
-                    cursor.execute("""
-                        INSERT INTO user_permissions (user_id, permission_id) 
-                        VALUES (%s, %s)
-                    """, (user_id, permission_id))
-                    success_count += 1
-                    app.logger.info(f"Assigned permission: {permission_name}")
-                else:
-                    app.logger.info(f"Permission already assigned: {permission_name}")
-                    success_count += 1
-                    
-            elif action == 'revoke':
-                # Permission'ı kaldır
-                cursor.execute("""
-                    DELETE FROM user_permissions 
-                    WHERE user_id = %s AND permission_id = %s
-                """, (user_id, permission_id))
-                success_count += 1
-                app.logger.info(f"Revoked permission: {permission_name}")
-        
-        conn.commit()
+        error_count = sum(1 for result in results if result['status'] in ('not_found', 'invalid_action'))
+        success_count = len(results) - error_count
+        for result in results:
+            if result['status'] == 'not_found':
+                app.logger.warning("Permission not found: %s", result['permission_name'])
         
         message = f"Permissions saved successfully! {success_count} changes applied."
         if error_count > 0:
             message += f" {error_count} errors occurred."
         
-        return jsonify({'success': True, 'message': message})
+        return jsonify({'success': True, 'message': message, 'results': results})
         
     except Exception as e:
-        app.logger.error(f"Batch permission save error: {e}")
+        app.logger.error("Batch permission save error: %s", e)
         return jsonify({'success': False, 'message': 'Failed to save permissions!'})
-    finally:
-        if conn:
-            cursor.close()
-            conn.close()
 
 @app.route('/api/user_permissions/<int:user_id>/revoke', methods=['POST'])
 @csrf.exempt
@@ -808,50 +1072,42 @@ def api_revoke_permission(user_id):
         return jsonify({'success': False, 'message': 'Oturum açmanız gerekiyor!'})
     
     # Yetki kontrolü
-    if not has_permission(session.get('user_id'), 'user.edit'):
+    if not has_permission(session.get('user_id'), 'user_edit'):
         return jsonify({'success': False, 'message': 'Bu işlem için yetkiniz yok!'})
     
     try:
         data = request.get_json()
         permission_name = data.get('permission_name')
         
-        app.logger.info(f"=== REVOKE PERMISSION DEBUG ===")
-        app.logger.info(f"User ID: {user_id}")
-        app.logger.info(f"Permission Name: {permission_name}")
-        app.logger.info(f"Request Data: {data}")
+        app.logger.debug("Revoke permission request - user_id=%s permission=%s", user_id, permission_name)
         
         if not permission_name:
             return jsonify({'success': False, 'message': 'Permission name is required!'})
         
         # Permission ID'yi bul
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT id FROM permissions WHERE name = %s", (permission_name,))
-        permission = cursor.fetchone()
+        with db_connection() as conn, conn.cursor() as cursor:
+            cursor.execute("SELECT id FROM permissions WHERE name = %s", (permission_name,))
+            permission = cursor.fetchone()
         
-        if not permission:
-            return jsonify({'success': False, 'message': 'Permission not found!'})
+            if not permission:
+                return jsonify({'success': False, 'message': 'Permission not found!'})
         
-        permission_id = permission[0]
+            permission_id = permission[0]
         
-        # Permission'ı kaldır
-        cursor.execute("""
-            DELETE FROM user_permissions 
-            WHERE user_id = %s AND permission_id = %s
-        """, (user_id, permission_id))
+            # Permission'ı kaldır
+            cursor.execute("""
+                DELETE FROM user_permissions 
+                WHERE user_id = %s AND permission_id = %s
+            """, (user_id, permission_id))
         
-        conn.commit()
+            conn.commit()
+            permission_cache.invalidate(user_id)
         
-        return jsonify({'success': True, 'message': 'Permission revoked successfully!'})
+            return jsonify({'success': True, 'message': 'Permission revoked successfully!'})
         
     except Exception as e:
-        app.logger.error(f"Permission revoke error: {e}")
+        app.logger.error("Permission revoke error: %s", e)
         return jsonify({'success': False, 'message': 'Failed to revoke permission!'})
-    finally:
-        if conn:
-            cursor.close()
-            conn.close()
 
 @app.route('/assign_permission', methods=['POST'])
 def assign_permission():
@@ -860,7 +1116,7 @@ def assign_permission():
         return jsonify({'success': False, 'message': 'Oturum açmanız gerekiyor!'})
     
     # Yetki kontrolü
-    if not has_permission(session.get('user_id'), 'user.edit'):
+    if not has_permission(session.get('user_id'), 'user_edit'):
         return jsonify({'success': False, 'message': 'Bu işlem için yetkiniz yok!'})
     
     try:
@@ -873,7 +1129,7 @@ def assign_permission():
             return jsonify({'success': False, 'message': 'Yetki atanırken hata oluştu!'})
             
     except Exception as e:
-        app.logger.error(f"Yetki atama hatası: {e}")
+        app.logger.error("Yetki atama hatası: %s", e)
         return jsonify({'success': False, 'message': 'Yetki atanırken hata oluştu!'})
 
 @app.route('/remove_permission', methods=['POST'])
@@ -883,7 +1139,7 @@ def remove_permission():
         return jsonify({'success': False, 'message': 'Oturum açmanız gerekiyor!'})
     
     # Yetki kontrolü
-    if not has_permission(session.get('user_id'), 'user.edit'):
+    if not has_permission(session.get('user_id'), 'user_edit'):
         return jsonify({'success': False, 'message': 'Bu işlem için yetkiniz yok!'})
     
     try:
@@ -896,7 +1152,7 @@ def remove_permission():
             return jsonify({'success': False, 'message': 'Yetki kaldırılırken hata oluştu!'})
             
     except Exception as e:
-        app.logger.error(f"Yetki kaldırma hatası: {e}")
+        app.logger.error("Yetki kaldırma hatası: %s", e)
         return jsonify({'success': False, 'message': 'Yetki kaldırılırken hata oluştu!'})
 
 @app.route('/assign_role', methods=['POST'])
@@ -906,7 +1162,7 @@ def assign_role():
         return jsonify({'success': False, 'message': 'Oturum açmanız gerekiyor!'})
     
     # Yetki kontrolü
-    if not has_permission(session.get('user_id'), 'user.edit'):
+    if not has_permission(session.get('user_id'), 'user_edit'):
         return jsonify({'success': False, 'message': 'Bu işlem için yetkiniz yok!'})
     
     try:
@@ -919,7 +1175,7 @@ def assign_role():
             return jsonify({'success': False, 'message': 'Rol atanırken hata oluştu!'})
             
     except Exception as e:
-        app.logger.error(f"Rol atama hatası: {e}")
+        app.logger.error("Rol atama hatası: %s", e)
         return jsonify({'success': False, 'message': 'Rol atanırken hata oluştu!'})
 
 @app.route('/remove_role', methods=['POST'])
@@ -929,7 +1185,7 @@ def remove_role():
         return jsonify({'success': False, 'message': 'Oturum açmanız gerekiyor!'})
     
     # Yetki kontrolü
-    if not has_permission(session.get('user_id'), 'user.edit'):
+    if not has_permission(session.get('user_id'), 'user_edit'):
         return jsonify({'success': False, 'message': 'Bu işlem için yetkiniz yok!'})
     
     try:
@@ -942,7 +1198,7 @@ def remove_role():
             return jsonify({'success': False, 'message': 'Rol kaldırılırken hata oluştu!'})
             
     except Exception as e:
-        app.logger.error(f"Rol kaldırma hatası: {e}")
+        app.logger.error("Rol kaldırma hatası: %s", e)
         return jsonify({'success': False, 'message': 'Rol kaldırılırken hata oluştu!'})
 
 
@@ -954,7 +1210,7 @@ def add_user():
         return redirect(url_for('login'))
     
     # Yetki kontrolü
-    if not has_permission(session.get('user_id'), 'user.edit'):
+    if not has_permission(session.get('user_id'), 'user_create'):
         flash('Bu işlem için yetkiniz yok!', 'error')
         return redirect(url_for('users'))
     
@@ -983,42 +1239,38 @@ def add_user():
         # Create full_name from first_name and last_name
         full_name = f"{first_name} {last_name}".strip() if first_name or last_name else ''
         
-        conn = get_db_connection()
-        if not conn:
-            flash('Database connection error!', 'error')
-            return redirect(url_for('users'))
+        with db_connection() as conn, conn.cursor() as cur:
+            # Check if username or email already exists
+            cur.execute("SELECT id FROM users WHERE username = %s OR email = %s", (username, email))
+            if cur.fetchone():
+                flash('Bu kullanıcı adı veya e-posta zaten kullanılıyor!', 'error')
+                return redirect(url_for('users'))
         
-        cur = conn.cursor()
+            # Hash password
+            with metrics.Timer('bcrypt'):
+                hashed_password = bcrypt.generate_password_hash(password).decode('utf-8')
         
-        # Check if username or email already exists
-        cur.execute("SELECT id FROM users WHERE username = %s OR email = %s", (username, email))
-        if cur.fetchone():
-            flash('Bu kullanıcı adı veya e-posta zaten kullanılıyor!', 'error')
-            return redirect(url_for('users'))
-        
-        # Hash password
-        hashed_password = bcrypt.generate_password_hash(password).decode('utf-8')
-        
-        # Insert new user
-        cur.execute("""
-            INSERT INTO users (username, email, password, first_name, last_name, full_name,
-                             country, region, department, position, is_active, created_at)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, NOW())
-        """, (username, email, hashed_password, first_name, last_name, full_name,
-              country, region, department, position, is_active))
+            # Insert new user
+            cur.execute("""
+                INSERT INTO users (username, email, password, first_name, last_name, full_name,
+                                 country, region, department, position, is_active, created_at)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, NOW())
+            """, (username, email, hashed_password, first_name, last_name, full_name,
+                  country, region, department, position, is_active))
         
-        conn.commit()
-        flash('Kullanıcı başarıyla eklendi!', 'success')
+            conn.commit()
+            dashboard_stats.invalidate()
+            flash('Kullanıcı başarıyla eklendi!', 'success')
         
+    except psycopg2.pool.PoolError as e:
+        app.logger.error("Add user error: %s", e)
+        flash('Database connection error!', 'error')
     except psycopg2.Error as e:
-        app.logger.error(f"Add user error: {e}")
+        app.logger.error("Add user error: %s", e)
         flash('Kullanıcı eklenirken hata oluştu!', 'error')
     except Exception as e:
-        app.logger.error(f"Add user error: {e}")
+        app.logger.error("Add user error: %s", e)
         flash('Kullanıcı eklenirken hata oluştu!', 'error')
-    finally:
-        if conn:
-            conn.close()
     
     return redirect(url_for('users'))
 
@@ -1029,7 +1281,7 @@ def edit_user():
         return redirect(url_for('login'))
     
     # Yetki kontrolü
-    if not has_permission(session.get('user_id'), 'user.edit'):
+    if not has_permission(session.get('user_id'), 'user_edit'):
         flash('Bu işlem için yetkiniz yok!', 'error')
         return redirect(url_for('users'))
     
@@ -1058,56 +1310,220 @@ def edit_user():
         # Create full_name from first_name and last_name
         full_name = f"{first_name} {last_name}".strip() if first_name or last_name else ''
         
-        conn = get_db_connection()
-        if not conn:
-            flash('Database connection error!', 'error')
-            return redirect(url_for('users'))
+        with db_connection() as conn, conn.cursor() as cur:
+            # Check if email already exists for another user
+            cur.execute("SELECT id FROM users WHERE email = %s AND id != %s", (email, user_id))
+            if cur.fetchone():
+                flash('Bu e-posta adresi başka bir kullanıcı tarafından kullanılıyor!', 'error')
+                return redirect(url_for('users'))
+        
+            # Update user
+            if password:
+                # Hash new password
+                with metrics.Timer('bcrypt'):
+                    hashed_password = bcrypt.generate_password_hash(password).decode('utf-8')
+                cur.execute("""
+                    UPDATE users 
+                    SET email = %s, first_name = %s, last_name = %s, full_name = %s,
+                        country = %s, region = %s, department = %s, position = %s,
+                        password = %s, is_active = %s
+                    WHERE id = %s
+                """, (email, first_name, last_name, full_name, country, region, 
+                      department, position, hashed_password, is_active, user_id))
+            else:
+                cur.execute("""
+                    UPDATE users 
+                    SET email = %s, first_name = %s, last_name = %s, full_name = %s,
+                        country = %s, region = %s, department = %s, position = %s,
+                        is_active = %s
+                    WHERE id = %s
+                """, (email, first_name, last_name, full_name, country, region, 
+                      department, position, is_active, user_id))
         
-        cur = conn.cursor()
-        
-        # Check if email already exists for another user
-        cur.execute("SELECT id FROM users WHERE email = %s AND id != %s", (email, user_id))
-        if cur.fetchone():
-            flash('Bu e-posta adresi başka bir kullanıcı tarafından kullanılıyor!', 'error')
-            return redirect(url_for('users'))
-        
-        # Update user
-        if password:
-            # Hash new password
-            hashed_password = bcrypt.generate_password_hash(password).decode('utf-8')
-            cur.execute("""
-                UPDATE users 
-                SET email = %s, first_name = %s, last_name = %s, full_name = %s,
-                    country = %s, region = %s, department = %s, position = %s,
-                    password = %s, is_active = %s
-                WHERE id = %s
-            """, (email, first_name, last_name, full_name, country, region, 
-                  department, position, hashed_password, is_active, user_id))
-        else:
-            cur.execute("""
-                UPDATE users 
-                SET email = %s, first_name = %s, last_name = %s, full_name = %s,
-                    country = %s, region = %s, department = %s, position = %s,
-                    is_active = %s
-                WHERE id = %s
-            """, (email, first_name, last_name, full_name, country, region, 
-                  department, position, is_active, user_id))
-        
-        conn.commit()
-        flash('Kullanıcı başarıyla güncellendi!', 'success')
+            conn.commit()
+            dashboard_stats.invalidate()
+            flash('Kullanıcı başarıyla güncellendi!', 'success')
         
+    except psycopg2.pool.PoolError as e:
+        app.logger.error("Edit user error: %s", e)
+        flash('Database connection error!', 'error')
     except psycopg2.Error as e:
-        app.logger.error(f"Edit user error: {e}")
+        app.logger.error("Edit user error: %s", e)
         flash('Kullanıcı güncellenirken hata oluştu!', 'error')
     except Exception as e:
-        app.logger.error(f"Edit user error: {e}")
+        app.logger.error("Edit user error: %s", e)
         flash('Kullanıcı güncellenirken hata oluştu!', 'error')
-    finally:
-        if conn:
-            conn.close()
     
     return redirect(url_for('users'))
 
+# Tek istekte sorgulanabilecek en fazla proje
+PROJECT_COSTS_MAX_IDS = 500
+
+@app.route('/api/projects/costs')
+def api_project_costs():
+    """Birden çok projenin maliyet özeti (?ids=1,2,3)"""
+    if not session.get('user_id'):
+        return jsonify({'success': False, 'message': 'Oturum açmanız gerekiyor!'})
+    
+    # Yetki kontrolü
+    if not has_permission(session.get('user_id'), 'cost_view'):
+        return jsonify({'success': False, 'message': 'Bu işlem için yetkiniz yok!'})
+    
+    try:
+        project_ids = sorted({int(value) for value in request.args.get('ids', '').split(',') if value.strip()})
+    except ValueError:
+        return jsonify({'success': False, 'message': 'Invalid project id!'}), 400
+    if not project_ids or len(project_ids) > PROJECT_COSTS_MAX_IDS:
+        return jsonify({'success': False,
+                        'message': f'Between 1 and {PROJECT_COSTS_MAX_IDS} project ids are required!'}), 400
+    
+    try:
+        costs = get_project_costs(project_ids)
+    except Exception as e:
+        app.logger.error("Project costs error: %s", e)
+        return jsonify({'success': False, 'message': 'Veri yüklenirken hata oluştu!'})
+    
+    return jsonify({'success': True, 'data': [costs[pid] for pid in project_ids if pid in costs]})
+
+@app.route('/api/projects/<int:project_id>/costs')
+def api_project_cost(project_id):
+    """Tek projenin maliyet özeti (özet tablosundan tek satır)"""
+    if not session.get('user_id'):
+        return jsonify({'success': False, 'message': 'Oturum açmanız gerekiyor!'})
+    
+    # Yetki kontrolü
+    if not has_permission(session.get('user_id'), 'cost_view'):
+        return jsonify({'success': False, 'message': 'Bu işlem için yetkiniz yok!'})
+    
+    try:
+        costs = get_project_costs([project_id])
+    except Exception as e:
+        app.logger.error("Project costs error: %s", e)
+        return jsonify({'success': False, 'message': 'Veri yüklenirken hata oluştu!'})
+    
+    if project_id not in costs:
+        return jsonify({'success': False, 'message': 'Project not found!'}), 404
+    return jsonify({'success': True, 'data': costs[project_id]})
+
+@app.route('/api/projects/simulate', methods=['POST'])
+@csrf.exempt
+def api_project_cost_simulation():
+    """Fiyat şoku senaryolarını tüm portföy üzerinde çalıştır (NumPy)"""
+    if not session.get('user_id'):
+        return jsonify({'success': False, 'message': 'Oturum açmanız gerekiyor!'})
+    
+    # Yetki kontrolü
+    if not has_permission(session.get('user_id'), 'cost_view'):
+        return jsonify({'success': False, 'message': 'Bu işlem için yetkiniz yok!'})
+    
+    data = request.get_json(silent=True) or {}
+    try:
+        top = max(0, min(int(data.get('top', 10)), 100))
+    except (TypeError, ValueError):
+        return jsonify({'success': False, 'message': 'Invalid top parameter!'}), 400
+    
+    try:
+        report = simulate_costs(data.get('scenarios'), top)
+    except ScenarioError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    except SimulationUnavailable as e:
+        return jsonify({'success': False, 'message': str(e)}), 501
+    except Exception as e:
+        app.logger.error("Cost simulation error: %s", e)
+        return jsonify({'success': False, 'message': 'Simülasyon sırasında hata oluştu!'})
+    
+    return jsonify({'success': True, 'data': report})
+
+@app.route('/api/projects/reprice', methods=['POST'])
+@csrf.exempt
+def api_project_reprice():
+    """Katalog fiyat değişikliklerini uygula ve açık proje satırlarına yansıt"""
+    if not session.get('user_id'):
+        return jsonify({'success': False, 'message': 'Oturum açmanız gerekiyor!'})
+    
+    # Yetki kontrolü
+    if not has_permission(session.get('user_id'), 'cost_edit'):
+        return jsonify({'success': False, 'message': 'Bu işlem için yetkiniz yok!'})
+    
+    data = request.get_json(silent=True) or {}
+    try:
+        report = reprice(data.get('changes'), resync=bool(data.get('resync')))
+    except RepriceError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    except RepriceFailed as e:
+        app.logger.error("Reprice error: %s", e)
+        if e.catalog_committed:
+            dashboard_stats.invalidate()
+        # Katalog commit edildiyse istemci aynı değişiklikleri resync ile göndermeli
+        return jsonify({'success': False, 'message': 'Fiyat güncellemesi yarıda kaldı!',
+                        'phase': e.phase, 'catalog_committed': e.catalog_committed}), 500
+    except psycopg2.pool.PoolError as e:
+        app.logger.error("Reprice error: %s", e)
+        return jsonify({'success': False, 'message': 'Database connection error!'}), 503
+    except Exception as e:
+        app.logger.error("Reprice error: %s", e)
+        return jsonify({'success': False, 'message': 'Fiyat güncellemesi sırasında hata oluştu!'})
+    
+    dashboard_stats.invalidate()
+    app.logger.info("Reprice - user %s, %s lines, %s projects",
+                    session.get('user_id'), sum(report['lines_updated'].values()), report['projects_affected'])
+    return jsonify({
+        'success': True,
+        'message': f"{report['projects_affected']} projects repriced.",
+        'data': report
+    })
+
+@app.route('/api/system/db_pool')
+def api_db_pool_stats():
+    """Bağlantı havuzu istatistikleri (izleme için)"""
+    if not session.get('user_id'):
+        return jsonify({'success': False, 'message': 'Oturum açmanız gerekiyor!'})
+
+    # Yetki kontrolü
+    if not has_permission(session.get('user_id'), 'system_logs'):
+        return jsonify({'success': False, 'message': 'Bu işlem için yetkiniz yok!'})
+
+    return jsonify({'success': True, 'data': pool_stats()})
+
+@app.route('/api/system/password_hashing')
+def api_password_hashing_stats():
+    """Giriş doğrulama havuzu istatistikleri (izleme için)"""
+    if not session.get('user_id'):
+        return jsonify({'success': False, 'message': 'Oturum açmanız gerekiyor!'})
+
+    # Yetki kontrolü
+    if not has_permission(session.get('user_id'), 'system_logs'):
+        return jsonify({'success': False, 'message': 'Bu işlem için yetkiniz yok!'})
+
+    return jsonify({'success': True, 'data': password_verifier.stats()})
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Prometheus metin biçiminde istek, havuz ve önbellek ölçümleri"""
+    if not session.get('user_id'):
+        return jsonify({'success': False, 'message': 'Oturum açmanız gerekiyor!'}), 401
+
+    # Yetki kontrolü
+    if not has_permission(session.get('user_id'), 'system_logs'):
+        return jsonify({'success': False, 'message': 'Bu işlem için yetkiniz yok!'}), 403
+
+    gauges = {}
+    for prefix, help_prefix, stats in (
+        ('db_pool', 'Connection pool', pool_stats()),
+        ('permission_cache', 'Permission cache', permission_cache.stats()),
+        ('password_hashing', 'Login password verifier', password_verifier.stats()),
+        ('last_login_writer', 'last_login write-behind queue', last_login_stats()),
+        ('log_queue', 'Logging queue', logging_stats()),
+        ('dashboard_stats', 'Dashboard aggregate cache', dashboard_stats.stats()),
+    ):
+        for key, value in stats.items():
+            if isinstance(value, (int, float)):
+                gauges[f'{prefix}_{key}'] = (f'{help_prefix} {key.replace("_", " ")}', value)
+    gauges['sidebar_cache_size'] = ('Rendered sidebar cache entries', len(_sidebar_cache))
+
+    body = metrics.render_prometheus(metrics.metrics_registry, gauges)
+    return Response(body, content_type='text/plain; version=0.0.4; charset=utf-8')
+
 @app.errorhandler(404)
 def not_found(error):
     return render_template('error.html', 
@@ -1128,10 +1544,17 @@ def forbidden(error):
 
 
 if __name__ == '__main__':
-    # Veritabanını başlat
-    if init_database():
-        print("PostgreSQL veritabanı başarıyla başlatıldı!")
-    else:
-        print("PostgreSQL veritabanı başlatma hatası!")
+    # SIGUSR2 ile çevirileri yeniden yükle
+    install_reload_signal()
+    
+    # Yalnızca hazır olma kontrolü; varsayılan veriler: python bootstrap.py
+    try:
+        problems = check_ready()
+    except psycopg2.Error as e:
+        problems = [f"PostgreSQL baglanti hatasi: {e}"]
+    for problem in problems:
+        print(problem)
+    if not problems:
+        print("PostgreSQL veritabanı hazır")
     
     app.run(debug=Config.DEBUG, host=Config.HOST, port=Config.PORT)
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+İki benchmark sonucunu karşılaştırır
+
+Her senaryo ve eşzamanlılık seviyesi için istek/sn ve p95/p99 gecikmesini
+karşılaştırır; eşik değerinden kötü olan farkları gerileme olarak işaretler.
+Gerileme varsa çıkış kodu 1'dir (CI'da kullanılabilir).
+
+    python benchmarks/compare.py base.json new.json --threshold 10
+"""
+import argparse
+import json
+import sys
+
+# (alan, yüksek değer iyi mi)
+METRICS = (('throughput', True), ('p50_ms', False), ('p95_ms', False), ('p99_ms', False))
+
+
+def _load(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        report = json.load(f)
+    return {(name, level['concurrency']): level
+            for name, levels in report['results'].items() for level in levels}
+
+
+def compare(base, new, threshold):
+    """(satırlar, gerileme sayısı) döndürür"""
+    rows = []
+    regressions = 0
+    for key in sorted(set(base) & set(new)):
+        for metric, higher_is_better in METRICS:
+            old_value = base[key].get(metric)
+            new_value = new[key].get(metric)
+            if not old_value or new_value is None:
+                continue
+            change = (new_value - old_value) / old_value * 100
+            worse = -change if higher_is_better else change
+            regressed = worse > threshold
+            regressions += regressed
+            rows.append((key[0], key[1], metric, old_value, new_value, change, regressed))
+        if new[key].get('errors', 0) > base[key].get('errors', 0):
+            rows.append((key[0], key[1], 'errors', base[key].get('errors', 0), new[key]['errors'], None, True))
+            regressions += 1
+    return rows, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark sonuclarini karsilastirir')
+    parser.add_argument('base')
+    parser.add_argument('new')
+    parser.add_argument('--threshold', type=float, default=10.0, help='Gerileme esigi (yuzde)')
+    args = parser.parse_args(argv)
+
+    base = _load(args.base)
+    new = _load(args.new)
+    rows, regressions = compare(base, new, args.threshold)
+
+    for name, level, metric, old_value, new_value, change, regressed in rows:
+        change_text = f'{change:+.1f}%' if change is not None else ''
+        flag = '  << REGRESSION' if regressed else ''
+        print(f'{name:<24} c={level:<4} {metric:<11} {old_value:>10} -> {new_value:<10} {change_text:>8}{flag}')
+    missing = sorted(set(base) - set(new))
+    for name, level in missing:
+        print(f'{name:<24} c={level:<4} yeni sonucta yok')
+
+    print(f'\n{regressions} gerileme (esik %{args.threshold:g})')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
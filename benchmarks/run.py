@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+HTTP yük/benchmark koşucusu
+
+Uygulamayı ayrı bir süreçte başlatır (ya da ``--url`` ile çalışan bir
+sunucuya bağlanır), ``benchmarks/seed.py`` ile yüklenmiş kullanıcılarla giriş
+yapar ve her senaryoyu farklı eşzamanlılık seviyelerinde sabit süre boyunca
+çalıştırır. Sonuçlar (istek/sn, p50/p95/p99 gecikme, hata sayıları) JSON
+dosyasına yazılır; iki çalıştırma ``benchmarks/compare.py`` ile karşılaştırılır.
+
+Bir senaryonun tüm istekleri reddedilirse (ör. yetki yok) ölçüm işleyiciyi
+değil ret yanıtını gösterir; bu durumda koşucu 1 ile çıkar.
+``user_permissions_batch`` hedef kullanıcılara doğrudan yetki atar/kaldırır;
+çalıştırma sonunda bu atamalar silinerek tohum verisi geri yüklenir.
+
+    python benchmarks/run.py --concurrency 1,8,32 --duration 20 --output results.json
+
+Yalnızca standart kütüphane kullanılır.
+"""
+import argparse
+import http.cookiejar
+import json
+import os
+import platform
+import random
+import re
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from seed import BENCH_ADMIN, BENCH_PASSWORD, BENCH_PREFIX, like_prefix
+
+CSRF_RE = re.compile(r'name="csrf_token"[^>]*value="([^"]+)"')
+
+SCENARIOS = ('login', 'users', 'dashboard', 'user_permissions', 'user_permissions_batch')
+
+
+class Client:
+    """Çerezleri tutan basit HTTP istemcisi (yönlendirmeleri takip etmez)"""
+
+    class _NoRedirect(urllib.request.HTTPRedirectHandler):
+        def redirect_request(self, *args, **kwargs):
+            return None
+
+    def __init__(self, base_url, timeout=30):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.cookies = http.cookiejar.CookieJar()
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(self.cookies), self._NoRedirect)
+
+    def request(self, path, data=None, json_body=None):
+        """(durum kodu, gövde) döndürür"""
+        headers = {}
+        if json_body is not None:
+            data = json.dumps(json_body).encode('utf-8')
+            headers['Content-Type'] = 'application/json'
+        elif data is not None:
+            data = urllib.parse.urlencode(data).encode('utf-8')
+        req = urllib.request.Request(self.base_url + path, data=data, headers=headers)
+        try:
+            with self.opener.open(req, timeout=self.timeout) as response:
+                return response.status, response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read()
+
+    def login(self, username, password):
+        status, body = self.request('/login')
+        match = CSRF_RE.search(body.decode('utf-8', 'replace'))
+        form = {'username': username, 'password': password}
+        if match:
+            form['csrf_token'] = match.group(1)
+        return self.request('/login', data=form)
+
+
+def _ok(status, body, json_api):
+    """(başarılı mı, reddedildi mi) - JSON API'lerde success=false 'reddedildi' sayılır"""
+    if status >= 400:
+        return False, False
+    if json_api:
+        try:
+            return True, not json.loads(body).get('success', False)
+        except ValueError:
+            return False, False
+    return True, False
+
+
+class Scenario:
+    def __init__(self, base_url, user_ids, permission_names, rng):
+        self.base_url = base_url
+        self.user_ids = user_ids
+        self.permission_names = permission_names
+        self.rng = rng
+
+    def client(self):
+        client = Client(self.base_url)
+        status, _ = client.login(BENCH_ADMIN, BENCH_PASSWORD)
+        if status != 302:
+            raise RuntimeError(f'Benchmark login failed (HTTP {status})')
+        return client
+
+    def login(self, _client):
+        # Her giriş yeni bir oturumla yapılır; yalnızca POST süresi ölçülür
+        client = Client(self.base_url)
+        status, body = client.request('/login')
+        token = CSRF_RE.search(body.decode('utf-8', 'replace'))
+        username = f'{BENCH_PREFIX}{self.rng.randint(1, len(self.user_ids) - 1 or 1):07d}'
+        form = {'username': username, 'password': BENCH_PASSWORD}
+        if token:
+            form['csrf_token'] = token.group(1)
+        started = time.perf_counter()
+        status, body = client.request('/login', data=form)
+        # Başarılı giriş 302, yanlış kullanıcı/parola 200 (form tekrar) döner
+        return time.perf_counter() - started, status == 302, False
+
+    def users(self, client):
+        return self._timed(client, '/users')
+
+    def dashboard(self, client):
+        return self._timed(client, '/dashboard')
+
+    def user_permissions(self, client):
+        user_id = self.rng.choice(self.user_ids)
+        return self._timed(client, f'/api/user_permissions/{user_id}', json_api=True)
+
+    def user_permissions_batch(self, client):
+        user_id = self.rng.choice(self.user_ids)
+        changes = [{'permission_name': name, 'action': self.rng.choice(('assign', 'revoke'))}
+                   for name in self.permission_names]
+        return self._timed(client, f'/api/user_permissions/{user_id}/batch',
+                           json_body={'changes': changes}, json_api=True)
+
+    def _timed(self, client, path, json_body=None, json_api=False):
+        started = time.perf_counter()
+        status, body = client.request(path, json_body=json_body)
+        elapsed = time.perf_counter() - started
+        ok, rejected = _ok(status, body, json_api)
+        return elapsed, ok, rejected
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+
+def run_level(scenario, name, concurrency, duration, warmup):
+    """Bir senaryoyu verilen eşzamanlılıkla çalıştırır ve özet döndürür"""
+    action = getattr(scenario, name)
+    clients = [scenario.client() for _ in range(concurrency)]
+    latencies = []
+    counters = {'errors': 0, 'rejected': 0}
+    lock = threading.Lock()
+    start_at = time.perf_counter() + warmup
+    stop_at = start_at + duration
+
+    def worker(client):
+        local = []
+        errors = rejected = 0
+        while True:
+            now = time.perf_counter()
+            if now >= stop_at:
+                break
+            try:
+                elapsed, ok, was_rejected = action(client)
+            except Exception:
+                elapsed, ok, was_rejected = None, False, False
+            if now < start_at:
+                continue
+            if elapsed is not None:
+                local.append(elapsed)
+            if not ok:
+                errors += 1
+            if was_rejected:
+                rejected += 1
+        with lock:
+            latencies.extend(local)
+            counters['errors'] += errors
+            counters['rejected'] += rejected
+
+    threads = [threading.Thread(target=worker, args=(client,)) for client in clients]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    latencies.sort()
+    total = len(latencies)
+    ms = lambda value: round(value * 1000, 3) if value is not None else None
+    return {
+        'concurrency': concurrency,
+        'requests': total,
+        'errors': counters['errors'],
+        'rejected': counters['rejected'],
+        'throughput': round(total / duration, 2),
+        'mean_ms': ms(sum(latencies) / total) if total else None,
+        'p50_ms': ms(percentile(latencies, 0.50)),
+        'p95_ms': ms(percentile(latencies, 0.95)),
+        'p99_ms': ms(percentile(latencies, 0.99)),
+        'max_ms': ms(latencies[-1]) if total else None,
+    }
+
+
+def _connect():
+    import psycopg2
+    from config import Config
+    return psycopg2.connect(**Config.get_db_config())
+
+
+def load_fixture_ids(limit=1000):
+    """Hedef kullanıcı id'lerini ve yetki adlarını veritabanından okur"""
+    conn = _connect()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT id FROM users WHERE username LIKE %s AND username <> %s ORDER BY id LIMIT %s",
+                        (like_prefix(BENCH_PREFIX), BENCH_ADMIN, limit))
+            user_ids = [row[0] for row in cur.fetchall()]
+            cur.execute("SELECT name FROM permissions ORDER BY id")
+            permission_names = [row[0] for row in cur.fetchall()]
+    finally:
+        conn.close()
+    if not user_ids:
+        raise SystemExit("Benchmark kullanicilari yok; once benchmarks/seed.py calistirin")
+    return user_ids, permission_names
+
+
+def restore_fixture(user_ids):
+    """Batch senaryosunun hedef kullanıcılara yaptığı doğrudan yetki atamalarını siler"""
+    conn = _connect()
+    try:
+        with conn.cursor() as cur:
+            # Tohum verisinde bench kullanıcılarının doğrudan yetkisi yoktur
+            cur.execute("DELETE FROM user_permissions WHERE user_id = ANY(%s)", (user_ids,))
+            removed = cur.rowcount
+        conn.commit()
+    finally:
+        conn.close()
+    return removed
+
+
+def start_server(port):
+    env = dict(os.environ, APP_PORT=str(port), DEBUG='False', LOG_LEVEL='WARNING')
+    process = subprocess.Popen([sys.executable, os.path.join(ROOT, 'app.py')], cwd=ROOT, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f'http://127.0.0.1:{port}'
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"Sunucu baslatilamadi (cikis kodu {process.returncode})")
+        try:
+            Client(base_url, timeout=2).request('/login')
+            return process, base_url
+        except OSError:
+            time.sleep(0.5)
+    process.terminate()
+    raise SystemExit("Sunucu 60 saniyede hazir olmadi")
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Flask uygulamasi icin yuk testi')
+    parser.add_argument('--url', help='Calisan sunucu adresi (verilmezse app.py baslatilir)')
+    parser.add_argument('--port', type=int, default=5099)
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS))
+    parser.add_argument('--concurrency', default='1,8,32')
+    parser.add_argument('--duration', type=float, default=20.0, help='Seviye basina olcum suresi (sn)')
+    parser.add_argument('--warmup', type=float, default=3.0)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default=f"benchmarks/results-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    args = parser.parse_args(argv)
+
+    scenarios = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    unknown = [name for name in scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"Bilinmeyen senaryo: {', '.join(unknown)}")
+    levels = [int(level) for level in args.concurrency.split(',')]
+
+    user_ids, permission_names = load_fixture_ids()
+    process = None
+    base_url = args.url
+    if not base_url:
+        process, base_url = start_server(args.port)
+
+    results = {}
+    try:
+        scenario = Scenario(base_url, user_ids, permission_names, random.Random(args.seed))
+        for name in scenarios:
+            results[name] = []
+            for level in levels:
+                summary = run_level(scenario, name, level, args.duration, args.warmup)
+                results[name].append(summary)
+                print(f"{name:<24} c={level:<4} {summary['throughput']:>9} req/s  "
+                      f"p50={summary['p50_ms']}ms p95={summary['p95_ms']}ms p99={summary['p99_ms']}ms "
+                      f"errors={summary['errors']} rejected={summary['rejected']}")
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(10)
+        if 'user_permissions_batch' in results:
+            print(f"Batch senaryosunun yetki atamalari geri alindi: {restore_fixture(user_ids)} satir")
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'git_revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'duration': args.duration,
+            'warmup': args.warmup,
+            'seed': args.seed,
+        },
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Sonuclar: {args.output}")
+
+    # Tamamen reddedilen senaryo işleyiciyi ölçmemiştir
+    failed = [f"{name} c={summary['concurrency']}" for name, summaries in results.items()
+              for summary in summaries if summary['requests'] and summary['rejected'] == summary['requests']]
+    if failed:
+        print(f"HATA: tum istekleri reddedilen senaryolar: {', '.join(failed)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
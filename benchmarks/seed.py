@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Benchmark veritabanı tohumlama
+
+Yerel bir PostgreSQL veritabanına gerçekçi hacimde kullanıcı, rol ve yetki
+ataması yükler. Aynı ``--seed`` ile her çalıştırma aynı veriyi üretir.
+Tüm benchmark kullanıcıları aynı parolayı paylaşır; hash bir kez hesaplanır,
+satırlar ``COPY`` ile yüklenir.
+
+    python benchmarks/seed.py --users 100000 --roles 50
+"""
+import argparse
+import io
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bcrypt
+import psycopg2
+
+from config import Config
+from permissions_system import (create_permissions_tables, create_permission_notify_triggers,
+                                insert_default_permissions, assign_role_permissions, assign_default_roles)
+
+BENCH_PREFIX = 'bench_'
+BENCH_PASSWORD = 'bench123'
+# Benchmark kullanıcıları listede tüm rollerin yetkilerini görebilsin
+BENCH_ADMIN = 'bench_admin'
+# Önceki sürümlerin kataloğa eklediği sahte yetki; reset() ile silinir
+LEGACY_BENCH_PERMISSION = ('user.edit', 'Benchmark: kullanıcı yetki API erişimi')
+
+
+def like_prefix(prefix):
+    """Öneki LIKE deseni olarak kaçışlar ('bench_' içindeki '_' tek karakter joker değildir)"""
+    return prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+
+
+def _copy(cur, table, columns, rows):
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write('\t'.join('\\N' if value is None else str(value) for value in row))
+        buffer.write('\n')
+    buffer.seek(0)
+    cur.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", buffer)
+
+
+def reset(cur):
+    """Önceki benchmark verisini siler (kaskad ile rol/yetki atamaları da gider)"""
+    cur.execute("DELETE FROM users WHERE username LIKE %s", (like_prefix(BENCH_PREFIX),))
+    cur.execute("DELETE FROM roles WHERE name LIKE %s", (like_prefix(BENCH_PREFIX),))
+    cur.execute("DELETE FROM permissions WHERE name = %s AND description = %s", LEGACY_BENCH_PERMISSION)
+
+
+def seed(conn, users, roles, roles_per_user, seed_value):
+    rng = random.Random(seed_value)
+    password_hash = bcrypt.hashpw(BENCH_PASSWORD.encode('utf-8'),
+                                  bcrypt.gensalt(Config.BCRYPT_LOG_ROUNDS)).decode('utf-8')
+    started = time.perf_counter()
+
+    with conn.cursor() as cur:
+        reset(cur)
+
+        # Kullanıcılar: son iki yıla yayılmış kayıt tarihleri
+        base = datetime(2024, 1, 1)
+        user_rows = [(BENCH_ADMIN, 'bench_admin@example.com', password_hash, 'Bench Admin', True, base)]
+        for i in range(1, users):
+            created = base + timedelta(seconds=rng.randrange(0, 2 * 365 * 86400))
+            user_rows.append((f'{BENCH_PREFIX}{i:07d}', f'{BENCH_PREFIX}{i:07d}@example.com', password_hash,
+                              f'Bench User {i}', rng.random() > 0.05, created.strftime('%Y-%m-%d %H:%M:%S')))
+        _copy(cur, 'users', ('username', 'email', 'password', 'full_name', 'is_active', 'created_at'), user_rows)
+
+        # Roller ve rastgele yetki alt kümeleri
+        _copy(cur, 'roles', ('name', 'description'),
+              [(f'{BENCH_PREFIX}role_{i:03d}', f'Benchmark role {i}') for i in range(roles)])
+        cur.execute("SELECT id FROM roles WHERE name LIKE %s ORDER BY name", (like_prefix(BENCH_PREFIX),))
+        role_ids = [row[0] for row in cur.fetchall()]
+        cur.execute("SELECT id FROM permissions ORDER BY id")
+        permission_ids = [row[0] for row in cur.fetchall()]
+        grants = []
+        for role_id in role_ids:
+            for permission_id in rng.sample(permission_ids, rng.randint(1, max(1, len(permission_ids) // 2))):
+                grants.append((role_id, permission_id))
+        _copy(cur, 'role_permissions', ('role_id', 'permission_id'), grants)
+
+        # Kullanıcı rolleri
+        cur.execute("SELECT id, username FROM users WHERE username LIKE %s ORDER BY id",
+                    (like_prefix(BENCH_PREFIX),))
+        user_ids = cur.fetchall()
+        assignments = []
+        for user_id, username in user_ids:
+            if username == BENCH_ADMIN:
+                chosen = role_ids
+            else:
+                chosen = rng.sample(role_ids, min(len(role_ids), rng.randint(1, roles_per_user)))
+            assignments.extend((user_id, role_id) for role_id in chosen)
+        _copy(cur, 'user_roles', ('user_id', 'role_id'), assignments)
+
+        # bench_admin sistemdeki 'admin' rolünü de alır (tüm yetkiler)
+        cur.execute("""
+            INSERT INTO user_roles (user_id, role_id)
+            SELECT u.id, r.id FROM users u, roles r
+            WHERE u.username = %s AND r.name = 'admin'
+            ON CONFLICT DO NOTHING
+        """, (BENCH_ADMIN,))
+    conn.commit()
+
+    with conn.cursor() as cur:
+        cur.execute("ANALYZE users; ANALYZE roles; ANALYZE role_permissions; ANALYZE user_roles")
+    conn.commit()
+    return {
+        'users': len(user_rows),
+        'roles': len(role_ids),
+        'role_permissions': len(grants),
+        'user_roles': len(assignments),
+        'seconds': round(time.perf_counter() - started, 2),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark verisi yukler')
+    parser.add_argument('--users', type=int, default=100000)
+    parser.add_argument('--roles', type=int, default=50)
+    parser.add_argument('--roles-per-user', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args(argv)
+
+    # Yetki tabloları ve varsayılan katalog (zaten varsa değişmez)
+    create_permissions_tables()
+    create_permission_notify_triggers()
+    insert_default_permissions()
+    assign_role_permissions()
+    assign_default_roles()
+
+    conn = psycopg2.connect(**Config.get_db_config())
+    try:
+        summary = seed(conn, args.users, args.roles, args.roles_per_user, args.seed)
+    finally:
+        conn.close()
+    print(f"Yuklendi: {summary}")
+
+
+if __name__ == '__main__':
+    main()
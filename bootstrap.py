@@ -0,0 +1,102 @@
+"""
+Veritabanı tohumlama ve hazır olma kontrolü
+
+Varsayılan kullanıcılar ve yetki kataloğu sunucu açılışında değil, bu açık
+komutla yüklenir. Komut tekrar çalıştırılabilir: var olan kullanıcıların
+parolalarına dokunulmaz (``--reset-passwords`` verilmedikçe) ve yalnızca eksik
+kullanıcılar için bcrypt hash'i hesaplanır.
+
+    python bootstrap.py                   # şema + varsayılan veriler
+    python bootstrap.py --reset-passwords # admin/test parolalarını sıfırla
+    python bootstrap.py --check           # yalnızca hazır olma kontrolü
+
+Sunucu (``python app.py``) yalnızca ``check_ready`` çağırır.
+"""
+import argparse
+import sys
+
+import bcrypt
+
+from config import Config
+from db_pool import db_connection
+from migrations import ensure_schema
+from permissions_system import insert_default_permissions, assign_role_permissions, assign_default_roles
+
+# (kullanıcı adı, e-posta, parola, ad soyad, dil)
+DEFAULT_USERS = (
+    ('admin', 'admin@example.com', 'admin123', 'Administrator', 'en'),
+    ('test', 'test@example.com', 'test123', 'Test User', 'tr'),
+)
+
+
+def _hash(password):
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(Config.BCRYPT_LOG_ROUNDS)).decode('utf-8')
+
+
+def seed_default_users(conn, reset_passwords=False):
+    """Eksik varsayılan kullanıcıları ekler; oluşturulan/güncellenen adları döndürür"""
+    with conn.cursor() as cur:
+        cur.execute("SELECT username FROM users WHERE username = ANY(%s)",
+                    ([user[0] for user in DEFAULT_USERS],))
+        existing = {row[0] for row in cur.fetchall()}
+        changed = []
+        for username, email, password, full_name, language in DEFAULT_USERS:
+            if username in existing and not reset_passwords:
+                continue
+            # Hash yalnızca gerçekten yazılacak kullanıcılar için hesaplanır
+            cur.execute("""
+                INSERT INTO users (username, email, password, full_name, language)
+                VALUES (%s, %s, %s, %s, %s)
+                ON CONFLICT (username) DO UPDATE SET password = EXCLUDED.password
+            """, (username, email, _hash(password), full_name, language))
+            changed.append(username)
+    conn.commit()
+    return changed
+
+
+def seed(reset_passwords=False):
+    """Şemayı günceller, varsayılan kullanıcıları ve yetki kataloğunu yükler"""
+    applied = ensure_schema()
+    with db_connection() as conn:
+        users = seed_default_users(conn, reset_passwords)
+    insert_default_permissions()
+    assign_role_permissions()
+    assign_default_roles()
+    return {'migrations': applied, 'users': users}
+
+
+def check_ready():
+    """Sunucu açılışında çalışır: havuzu ısıtır, şemayı doğrular; sorun listesi döndürür
+
+    Şema güncelse toplam maliyet iki basit sorgudur; bcrypt ya da yazma yoktur.
+    """
+    problems = []
+    ensure_schema()
+    with db_connection() as conn, conn.cursor() as cur:
+        cur.execute("SELECT EXISTS (SELECT 1 FROM users)")
+        if not cur.fetchone()[0]:
+            problems.append("Kullanici yok; varsayilan veriler icin: python bootstrap.py")
+        conn.rollback()
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Varsayilan verileri yukler')
+    parser.add_argument('--reset-passwords', action='store_true',
+                        help='Var olan admin/test kullanicilarinin parolalarini sifirla')
+    parser.add_argument('--check', action='store_true', help='Yalnizca hazir olma kontrolu')
+    args = parser.parse_args(argv)
+
+    if args.check:
+        problems = check_ready()
+        for problem in problems:
+            print(problem)
+        return 1 if problems else 0
+
+    summary = seed(args.reset_passwords)
+    print(f"Tohumlama tamamlandi: {summary}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -20,6 +20,72 @@ class Config:
     DB_USER = os.environ.get('DB_USER') or 'postgres'
     DB_PASSWORD = os.environ.get('DB_PASSWORD') or '123456789'
     
+    # Bağlantı havuzu konfigürasyonu
+    DB_POOL_MIN = int(os.environ.get('DB_POOL_MIN') or 1)
+    DB_POOL_MAX = int(os.environ.get('DB_POOL_MAX') or 10)
+    DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT') or 10)
+    DB_POOL_MAX_LIFETIME = float(os.environ.get('DB_POOL_MAX_LIFETIME') or 1800)
+    DB_POOL_PING_INTERVAL = float(os.environ.get('DB_POOL_PING_INTERVAL') or 30)
+    
+    # Yetki önbelleği konfigürasyonu
+    PERMISSION_CACHE_SIZE = int(os.environ.get('PERMISSION_CACHE_SIZE') or 1024)
+    PERMISSION_CACHE_TTL = float(os.environ.get('PERMISSION_CACHE_TTL') or 60)
+    # Diğer süreçlerdeki yetki değişikliklerini LISTEN/NOTIFY ile dinle
+    PERMISSION_NOTIFY_ENABLED = os.environ.get('PERMISSION_NOTIFY_ENABLED', 'True').lower() == 'true'
+    
+    # Çeviri dosyalarının değişiklik kontrol aralığı (saniye, negatif: kapalı)
+    TRANSLATIONS_RELOAD_INTERVAL = float(os.environ.get('TRANSLATIONS_RELOAD_INTERVAL') or 2)
+    
+    # bcrypt maliyet faktörü (Flask-Bcrypt de bu ayarı kullanır)
+    BCRYPT_LOG_ROUNDS = int(os.environ.get('BCRYPT_LOG_ROUNDS') or 12)
+    # Giriş doğrulama havuzu: eşzamanlı hash sayısı, bekleme kuyruğu ve zaman aşımı
+    LOGIN_HASH_WORKERS = int(os.environ.get('LOGIN_HASH_WORKERS') or 4)
+    LOGIN_HASH_QUEUE = int(os.environ.get('LOGIN_HASH_QUEUE') or 32)
+    LOGIN_HASH_TIMEOUT = float(os.environ.get('LOGIN_HASH_TIMEOUT') or 5)
+    # Kuyruk doluyken 503 yanıtındaki Retry-After (saniye)
+    LOGIN_RETRY_AFTER = int(os.environ.get('LOGIN_RETRY_AFTER') or 2)
+    # Toplu parola hash'leme süreç sayısı (0: çekirdek sayısı)
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS') or 0)
+    # Tek bir toplu içe aktarmada kabul edilen en fazla satır
+    USER_IMPORT_MAX_ROWS = int(os.environ.get('USER_IMPORT_MAX_ROWS') or 50000)
+    # HTTP içe aktarma sınırları: bcrypt istek süresini satır sayısıyla uzatır,
+    # daha büyük dosyalar komut satırından (user_import.py) yüklenir
+    USER_IMPORT_HTTP_MAX_ROWS = int(os.environ.get('USER_IMPORT_HTTP_MAX_ROWS') or 500)
+    USER_IMPORT_HTTP_MAX_BYTES = int(os.environ.get('USER_IMPORT_HTTP_MAX_BYTES') or 1024 * 1024)
+    
+    # last_login write-behind: en fazla bu kadar ms ya da girdi biriktikten sonra yazılır
+    LAST_LOGIN_FLUSH_INTERVAL_MS = int(os.environ.get('LAST_LOGIN_FLUSH_INTERVAL_MS') or 1000)
+    LAST_LOGIN_MAX_BATCH = int(os.environ.get('LAST_LOGIN_MAX_BATCH') or 500)
+    
+    # Loglama: seviye, biçim (json/text), DEBUG örnekleme ("app=0.1,rbac=0.01"), kuyruk boyutu
+    LOG_LEVEL = (os.environ.get('LOG_LEVEL') or 'INFO').upper()
+    LOG_FORMAT = (os.environ.get('LOG_FORMAT') or 'json').lower()
+    LOG_SAMPLING = os.environ.get('LOG_SAMPLING') or ''
+    LOG_QUEUE_SIZE = int(os.environ.get('LOG_QUEUE_SIZE') or 10000)
+    
+    # Rota bazında istek ölçümleri (/metrics)
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'True').lower() == 'true'
+    
+    # Sorgu profilleyici (geliştirme/test): aynı ifade bu kadar tekrarlanırsa N+1 sayılır
+    QUERY_PROFILER_ENABLED = os.environ.get('QUERY_PROFILER_ENABLED', 'False').lower() == 'true'
+    QUERY_PROFILER_N1_THRESHOLD = int(os.environ.get('QUERY_PROFILER_N1_THRESHOLD') or 5)
+    
+    # Maliyet simülasyonu modelinin yeniden yüklenmeden kullanılacağı süre (saniye)
+    COST_SIMULATION_MAX_AGE = int(os.environ.get('COST_SIMULATION_MAX_AGE') or 300)
+    
+    # Fiyat güncellemesinde tek işlemde güncellenen proje satırı sayısı ve kilit bekleme sınırı (ms)
+    REPRICE_CHUNK_SIZE = int(os.environ.get('REPRICE_CHUNK_SIZE') or 5000)
+    REPRICE_LOCK_TIMEOUT_MS = int(os.environ.get('REPRICE_LOCK_TIMEOUT_MS') or 2000)
+    
+    # Kontrol paneli özetlerinin yeniden hesaplanma aralığı (saniye)
+    DASHBOARD_STATS_TTL = int(os.environ.get('DASHBOARD_STATS_TTL') or 30)
+    
+    # static/dist/manifest.json varsa hash'li statik dosya adreslerini kullan
+    STATIC_ASSET_MANIFEST = os.environ.get('STATIC_ASSET_MANIFEST', 'True').lower() == 'true'
+    
+    # Dışa aktarmada sunucu tarafı imleçten tek seferde okunan satır sayısı
+    EXPORT_FETCH_SIZE = int(os.environ.get('EXPORT_FETCH_SIZE') or 2000)
+    
     # Veritabanı URL'si
     DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
     
@@ -56,23 +122,6 @@ class Config:
             'password': Config.DB_PASSWORD
         }
 
-def get_db_connection():
-    """Veritabanı bağlantısı oluşturur"""
-    import psycopg2
-    try:
-        conn = psycopg2.connect(
-            host=Config.DB_HOST,
-            port=Config.DB_PORT,
-            database=Config.DB_NAME,
-            user=Config.DB_USER,
-            password=Config.DB_PASSWORD,
-            connect_timeout=10
-        )
-        return conn
-    except Exception as e:
-        print(f"PostgreSQL veritabanı bağlantı hatası: {e}")
-        return None
-
 class DevelopmentConfig(Config):
     """Geliştirme ortamı konfigürasyonu"""
     DEBUG = True
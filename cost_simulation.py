@@ -0,0 +1,286 @@
+"""
+Proje portföyü üzerinde "ya olursa" maliyet simülasyonu
+
+Satır tabloları (``project_materials``, ``project_labor``,
+``project_equipment``) bir kez okunup sütunsal NumPy dizilerine yüklenir.
+Satırlar önceden (proje, katalog kalemi) çiftlerine toplanır; bir senaryo
+yalnızca kalem başına çarpan vektörüdür. Her senaryo için proje ve kategori
+farkları ``np.bincount`` ile tek geçişte hesaplanır, SQL tekrar çalışmaz.
+
+Senaryo biçimi::
+
+    {"name": "cement+12 labor+8",
+     "shocks": [{"kind": "materials", "item_id": 1, "pct": 12},
+                {"kind": "labor", "pct": 8},
+                {"kind": "equipment", "category": "Vinç", "pct": -5}]}
+
+Aynı kaleme uyan şoklar bileşik uygulanır. NumPy isteğe bağlıdır; kurulu
+değilse ``SimulationUnavailable`` yükseltilir.
+
+    python cost_simulation.py scenarios.json [--top 10]
+"""
+import argparse
+import io
+import json
+import logging
+import sys
+import threading
+import time
+
+try:
+    import numpy as np
+except ImportError:  # İsteğe bağlı bağımlılık: pip install numpy
+    np = None
+
+from config import Config
+from db_pool import db_connection
+
+logger = logging.getLogger(__name__)
+
+# tür -> (satır tablosu, kalem sütunu, miktar, birim fiyat, katalog tablosu)
+KINDS = {
+    'materials': ('project_materials', 'material_id', 'quantity', 'unit_price', 'materials'),
+    'labor': ('project_labor', 'labor_id', 'hours', 'hourly_rate', 'labor'),
+    'equipment': ('project_equipment', 'equipment_id', 'days', 'daily_rate', 'equipment'),
+}
+
+# Kalemi olmayan (NULL) satırlar için katalog yer tutucusu
+NO_ITEM = 0
+NO_CATEGORY = ''
+
+MAX_SCENARIOS = 100
+
+
+class SimulationUnavailable(RuntimeError):
+    """NumPy kurulu olmadığında yükseltilir"""
+
+
+class ScenarioError(ValueError):
+    """Geçersiz senaryo tanımı"""
+
+
+def _require_numpy():
+    if np is None:
+        raise SimulationUnavailable("NumPy is not installed")
+
+
+def _copy_columns(cur, sql, columns):
+    """COPY ... TO STDOUT çıktısını float64 sütun matrisine okur"""
+    buffer = io.StringIO()
+    cur.copy_expert(f"COPY ({sql}) TO STDOUT WITH (FORMAT csv)", buffer)
+    buffer.seek(0)
+    if not buffer.getvalue():
+        return np.empty((0, columns))
+    return np.loadtxt(buffer, delimiter=',', ndmin=2)
+
+
+class KindArrays:
+    """Tek bir satır türünün (proje, kalem) çiftlerine toplanmış sütunları"""
+
+    def __init__(self, kind, pair_project, pair_item, pair_base, item_ids, item_categories, line_count):
+        self.kind = kind
+        self.pair_project = pair_project      # proje dizisindeki konum (int)
+        self.pair_item = pair_item            # item_ids içindeki konum (int)
+        self.pair_base = pair_base            # çiftin mevcut toplam maliyeti
+        self.item_ids = item_ids              # sıralı katalog id'leri (0 = kalemsiz)
+        self.categories, self.item_category = np.unique(item_categories, return_inverse=True)
+        self.line_count = line_count
+
+    def multipliers(self, shocks):
+        """Senaryonun bu türe ait şoklarından kalem başına çarpan vektörü"""
+        factors = np.ones(len(self.item_ids))
+        for shock in shocks:
+            if 'item_id' in shock:
+                position = np.searchsorted(self.item_ids, shock['item_id'])
+                if position >= len(self.item_ids) or self.item_ids[position] != shock['item_id']:
+                    continue
+                mask = np.zeros(len(self.item_ids), dtype=bool)
+                mask[position] = True
+            elif 'category' in shock:
+                mask = self.categories[self.item_category] == shock['category']
+            else:
+                mask = np.ones(len(self.item_ids), dtype=bool)
+            factors[mask] *= 1 + shock['pct'] / 100.0
+        return factors
+
+
+class CostModel:
+    """Portföyün bellek içi sütunsal maliyet modeli"""
+
+    def __init__(self, project_ids, kinds, load_seconds):
+        self.project_ids = project_ids
+        self.kinds = kinds
+        self.load_seconds = load_seconds
+        self.loaded_at = time.time()
+        self.base_by_project = np.zeros(len(project_ids))
+        for arrays in kinds.values():
+            self.base_by_project += np.bincount(arrays.pair_project, weights=arrays.pair_base,
+                                                minlength=len(project_ids))
+
+    @classmethod
+    def load(cls, conn):
+        """Satır ve katalog tablolarını tek seferde okur"""
+        _require_numpy()
+        started = time.perf_counter()
+        raw = {}
+        with conn.cursor() as cur:
+            # Tutarlı bir anlık görüntü için tüm okumalar tek işlemde
+            cur.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY")
+            cur.execute("SELECT id FROM projects ORDER BY id")
+            project_ids = np.array([row[0] for row in cur.fetchall()], dtype=np.int64)
+            for kind, (table, item_column, quantity, price, catalog) in KINDS.items():
+                lines = _copy_columns(cur, f"""
+                    SELECT project_id, COALESCE({item_column}, {NO_ITEM}), {quantity} * {price}
+                    FROM {table} WHERE project_id IS NOT NULL
+                """, 3)
+                cur.execute(f"SELECT id, COALESCE(category, '') FROM {catalog} ORDER BY id")
+                raw[kind] = (lines, cur.fetchall())
+        conn.rollback()
+
+        kinds = {}
+        for kind, (lines, catalog_rows) in raw.items():
+            item_ids = np.array([NO_ITEM] + [row[0] for row in catalog_rows], dtype=np.int64)
+            item_categories = np.array([NO_CATEGORY] + [row[1] for row in catalog_rows], dtype=object)
+            line_project = np.searchsorted(project_ids, lines[:, 0].astype(np.int64))
+            line_item = np.searchsorted(item_ids, lines[:, 1].astype(np.int64))
+            # Satırları (proje, kalem) çiftlerine indir: senaryo maliyeti satır sayısına değil
+            # çift sayısına bağlı olur
+            keys = line_project * len(item_ids) + line_item
+            pair_keys, inverse = np.unique(keys, return_inverse=True)
+            pair_base = np.bincount(inverse, weights=lines[:, 2], minlength=len(pair_keys))
+            kinds[kind] = KindArrays(kind, pair_keys // len(item_ids), pair_keys % len(item_ids),
+                                     pair_base, item_ids, item_categories, len(lines))
+        return cls(project_ids, kinds, time.perf_counter() - started)
+
+    def stats(self):
+        return {
+            'projects': int(len(self.project_ids)),
+            'lines': {kind: arrays.line_count for kind, arrays in self.kinds.items()},
+            'pairs': {kind: int(len(arrays.pair_base)) for kind, arrays in self.kinds.items()},
+            'base_total': round(float(self.base_by_project.sum()), 2),
+            'load_seconds': round(self.load_seconds, 3),
+            'age_seconds': round(time.time() - self.loaded_at, 1),
+        }
+
+    def simulate(self, scenarios, top=10):
+        """Senaryo listesini uygular; senaryo başına özet sözlükleri döndürür"""
+        scenarios = validate_scenarios(scenarios)
+        started = time.perf_counter()
+        results = []
+        for scenario in scenarios:
+            project_delta = np.zeros(len(self.project_ids))
+            by_kind = {}
+            by_category = {}
+            for kind, arrays in self.kinds.items():
+                shocks = [shock for shock in scenario['shocks'] if shock['kind'] == kind]
+                if not shocks:
+                    by_kind[kind] = 0.0
+                    continue
+                pair_delta = arrays.pair_base * (arrays.multipliers(shocks)[arrays.pair_item] - 1.0)
+                project_delta += np.bincount(arrays.pair_project, weights=pair_delta,
+                                             minlength=len(self.project_ids))
+                by_kind[kind] = round(float(pair_delta.sum()), 2)
+                category_delta = np.bincount(arrays.item_category[arrays.pair_item], weights=pair_delta,
+                                             minlength=len(arrays.categories))
+                by_category[kind] = {str(category): round(float(value), 2)
+                                     for category, value in zip(arrays.categories, category_delta) if value}
+            results.append(self._summarize(scenario['name'], project_delta, by_kind, by_category, top))
+        elapsed = time.perf_counter() - started
+        logger.debug("Cost simulation: %d scenarios in %.1f ms", len(scenarios), elapsed * 1000)
+        return results, elapsed
+
+    def _summarize(self, name, project_delta, by_kind, by_category, top):
+        base_total = float(self.base_by_project.sum())
+        delta_total = float(project_delta.sum())
+        order = np.argsort(-np.abs(project_delta))[:top]
+        return {
+            'name': name,
+            'base_total': round(base_total, 2),
+            'delta_total': round(delta_total, 2),
+            'delta_pct': round(delta_total / base_total * 100, 4) if base_total else None,
+            'by_kind': by_kind,
+            'by_category': by_category,
+            'projects_affected': int(np.count_nonzero(project_delta)),
+            'top_projects': [{
+                'project_id': int(self.project_ids[i]),
+                'base': round(float(self.base_by_project[i]), 2),
+                'delta': round(float(project_delta[i]), 2),
+            } for i in order if project_delta[i]],
+        }
+
+
+def validate_scenarios(scenarios):
+    """Senaryo tanımlarını doğrular ve normalleştirir"""
+    if not isinstance(scenarios, list) or not scenarios:
+        raise ScenarioError("At least one scenario is required")
+    if len(scenarios) > MAX_SCENARIOS:
+        raise ScenarioError(f"At most {MAX_SCENARIOS} scenarios are allowed")
+    normalized = []
+    for index, scenario in enumerate(scenarios):
+        if not isinstance(scenario, dict) or not isinstance(scenario.get('shocks'), list):
+            raise ScenarioError(f"Scenario {index + 1}: 'shocks' list is required")
+        shocks = []
+        for shock in scenario['shocks']:
+            if not isinstance(shock, dict) or shock.get('kind') not in KINDS:
+                raise ScenarioError(f"Scenario {index + 1}: shock kind must be one of {', '.join(KINDS)}")
+            try:
+                normalized_shock = {'kind': shock['kind'], 'pct': float(shock['pct'])}
+                if shock.get('item_id') is not None:
+                    normalized_shock['item_id'] = int(shock['item_id'])
+                elif shock.get('category') is not None:
+                    normalized_shock['category'] = str(shock['category'])
+            except (KeyError, TypeError, ValueError):
+                raise ScenarioError(f"Scenario {index + 1}: invalid shock {shock!r}")
+            if normalized_shock['pct'] <= -100:
+                raise ScenarioError(f"Scenario {index + 1}: pct must be greater than -100")
+            shocks.append(normalized_shock)
+        normalized.append({'name': str(scenario.get('name') or f'scenario-{index + 1}'), 'shocks': shocks})
+    return normalized
+
+
+_model = None
+_model_lock = threading.Lock()
+
+
+def get_cost_model(max_age=None):
+    """Süreç başına önbelleğe alınmış modeli döndürür; eskidiyse yeniden yükler"""
+    global _model
+    _require_numpy()
+    max_age = Config.COST_SIMULATION_MAX_AGE if max_age is None else max_age
+    model = _model
+    if model is not None and time.time() - model.loaded_at < max_age:
+        return model
+    with _model_lock:
+        if _model is None or time.time() - _model.loaded_at >= max_age:
+            with db_connection() as conn:
+                _model = CostModel.load(conn)
+            logger.info("Cost model loaded: %s", _model.stats())
+        return _model
+
+
+def simulate(scenarios, top=10):
+    """Önbellekteki modelle senaryoları çalıştırır"""
+    model = get_cost_model()
+    results, elapsed = model.simulate(scenarios, top)
+    return {'model': model.stats(), 'elapsed_ms': round(elapsed * 1000, 3), 'scenarios': results}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Portfoy uzerinde maliyet senaryolari calistirir')
+    parser.add_argument('scenarios', help='Senaryo listesi iceren JSON dosyasi')
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args(argv)
+
+    with open(args.scenarios, 'r', encoding='utf-8') as f:
+        scenarios = json.load(f)
+    try:
+        report = simulate(scenarios, args.top)
+    except (SimulationUnavailable, ScenarioError) as e:
+        print(f"Hata: {e}")
+        return 1
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
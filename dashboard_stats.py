@@ -0,0 +1,191 @@
+"""
+Kontrol paneli özet önbelleği
+
+Panel kartları (proje/kullanıcı sayıları, maliyet toplamları) ve son
+etkinlikler tek bir toplu sorguyla hesaplanıp süreç içinde önbelleğe alınır.
+Önbellek ``DASHBOARD_STATS_TTL`` saniyede bir yenilenir ya da bu süreçteki
+değişikliklerden sonra ``invalidate`` ile eskitilir. Yenileme tek bir
+thread'de yapılır; diğer istekler bu sırada eski anlık görüntüyü alır, henüz
+anlık görüntü yoksa devam eden hesaplamayı bekler.
+
+Yetki filtresi önbellekteki bölümler üzerinde uygulanır: her bölüm bir
+yetkiye bağlıdır ve kullanıcının göremediği bölümler yanıttan çıkarılır.
+"""
+import hashlib
+import json
+import logging
+import threading
+import time
+
+import psycopg2.extras
+
+from config import Config
+from db_pool import db_connection
+
+logger = logging.getLogger(__name__)
+
+# bölüm -> gereken yetki
+SECTION_PERMISSIONS = {
+    'users': 'user_view',
+    'projects': 'tour_view',
+    'costs': 'cost_view',
+}
+
+RECENT_LIMIT = 10
+
+
+def _money(value):
+    return round(float(value or 0), 2)
+
+
+def _timestamp(value):
+    return value.strftime('%Y-%m-%d %H:%M:%S') if value else None
+
+
+def compute_stats(conn):
+    """Tüm bölümleri veritabanından hesaplar"""
+    with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+        cur.execute("""
+            SELECT (SELECT COUNT(*) FROM users) AS users_total,
+                   (SELECT COUNT(*) FROM users WHERE is_active) AS users_active,
+                   (SELECT COUNT(*) FROM projects) AS projects_total,
+                   (SELECT COUNT(*) FROM projects WHERE status = 'active') AS projects_active,
+                   (SELECT COALESCE(SUM(budget), 0) FROM projects) AS budget_total,
+                   (SELECT COALESCE(SUM(materials_total), 0) FROM project_cost_summary) AS materials_total,
+                   (SELECT COALESCE(SUM(labor_total), 0) FROM project_cost_summary) AS labor_total,
+                   (SELECT COALESCE(SUM(equipment_total), 0) FROM project_cost_summary) AS equipment_total,
+                   (SELECT COALESCE(SUM(grand_total), 0) FROM project_cost_summary) AS cost_total
+        """)
+        totals = cur.fetchone()
+        cur.execute("""
+            SELECT id, username, full_name, created_at FROM users
+            ORDER BY created_at DESC, id DESC LIMIT %s
+        """, (RECENT_LIMIT,))
+        recent_users = cur.fetchall()
+        cur.execute("""
+            SELECT p.id, p.name, p.status, p.created_at, COALESCE(s.grand_total, 0) AS grand_total
+            FROM projects p
+            LEFT JOIN project_cost_summary s ON s.project_id = p.id
+            ORDER BY p.created_at DESC, p.id DESC LIMIT %s
+        """, (RECENT_LIMIT,))
+        recent_projects = cur.fetchall()
+        conn.rollback()
+
+    projects_total = totals['projects_total']
+    return {
+        'users': {
+            'total': totals['users_total'],
+            'active': totals['users_active'],
+            'recent': [{'id': row['id'], 'username': row['username'], 'full_name': row['full_name'],
+                        'created_at': _timestamp(row['created_at'])} for row in recent_users],
+        },
+        'projects': {
+            'total': projects_total,
+            'active': totals['projects_active'],
+            'budget_total': _money(totals['budget_total']),
+            'recent': [{'id': row['id'], 'name': row['name'], 'status': row['status'],
+                        'created_at': _timestamp(row['created_at'])} for row in recent_projects],
+        },
+        'costs': {
+            'total': _money(totals['cost_total']),
+            'average_per_project': _money(totals['cost_total'] / projects_total) if projects_total else 0.0,
+            'materials': _money(totals['materials_total']),
+            'labor': _money(totals['labor_total']),
+            'equipment': _money(totals['equipment_total']),
+            'recent': [{'id': row['id'], 'grand_total': _money(row['grand_total'])} for row in recent_projects],
+        },
+    }
+
+
+class DashboardStatsCache:
+    """Tek anlık görüntülü, TTL ile yenilenen panel önbelleği"""
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._snapshot = None
+        self._computed_at = 0.0
+        self._stale = False
+        self._lock = threading.Lock()
+        self._refreshed = threading.Condition(self._lock)
+        self._refreshing = False
+        # Biten yenileme denemeleri (bekleyenler kendi bekledikleri denemenin sonucunu görür)
+        self._attempts = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+
+    def invalidate(self):
+        """Bir sonraki istekte yenilenmesini sağlar"""
+        self._stale = True
+
+    def _expired(self):
+        return self._stale or time.monotonic() - self._computed_at >= self.ttl
+
+    def get(self):
+        """(bölümler, sürüm, hesaplanma zamanı) döndürür"""
+        snapshot = self._snapshot
+        if snapshot is not None and not self._expired():
+            return snapshot
+        with self._lock:
+            while self._refreshing:
+                # Başka bir thread yeniliyorsa ve eski veri varsa onu kullan
+                if self._snapshot is not None:
+                    return self._snapshot
+                # İlk yükleme: aynı sorguyu paralel çalıştırmak yerine bekle
+                attempt = self._attempts
+                self._refreshed.wait()
+                if self._snapshot is None and self._attempts != attempt:
+                    raise RuntimeError("Dashboard stats are not available yet")
+            if self._snapshot is not None and not self._expired():
+                return self._snapshot
+            self._refreshing = True
+        try:
+            self._stale = False
+            with db_connection() as conn:
+                sections = compute_stats(conn)
+            version = hashlib.sha1(json.dumps(sections, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+            snapshot = (sections, version, time.time())
+            with self._lock:
+                self._snapshot = snapshot
+                self._computed_at = time.monotonic()
+                self.refreshes += 1
+            return snapshot
+        except Exception:
+            with self._lock:
+                self.refresh_errors += 1
+                # Bir sonraki deneme bir TTL sonra; aksi halde her istek yeniden dener
+                self._computed_at = time.monotonic()
+            if self._snapshot is None:
+                raise
+            logger.exception("Dashboard stats refresh failed, serving previous snapshot")
+            return self._snapshot
+        finally:
+            with self._lock:
+                self._refreshing = False
+                self._attempts += 1
+                self._refreshed.notify_all()
+
+    def max_age(self):
+        """Anlık görüntünün geçerli kalacağı kalan süre (saniye)"""
+        return max(0, int(self.ttl - (time.monotonic() - self._computed_at)))
+
+    def for_permissions(self, allowed):
+        """İzin verilen bölümleri ve yetki kümesine özgü ETag'i döndürür
+
+        Gövde yalnızca ETag'e giren içerikten oluşur; böylece 304 yanıtı
+        istemciyi sunucunun göndereceğinden farklı bir gövdede bırakmaz.
+        """
+        sections, version, _ = self.get()
+        visible = sorted(name for name, permission in SECTION_PERMISSIONS.items() if permission in allowed)
+        data = {name: sections[name] for name in visible}
+        return data, f"{version}-{'.'.join(visible) or 'none'}"
+
+    def stats(self):
+        return {
+            'ttl': self.ttl,
+            'age_seconds': round(time.monotonic() - self._computed_at, 1) if self._snapshot else None,
+            'refreshes': self.refreshes,
+            'refresh_errors': self.refresh_errors,
+        }
+
+
+dashboard_stats = DashboardStatsCache(Config.DASHBOARD_STATS_TTL)
@@ -0,0 +1,307 @@
+"""
+PostgreSQL bağlantı havuzu
+
+Uygulama genelinde tek, thread-safe bir bağlantı havuzu sağlar. Her yardımcı
+fonksiyon yeni bir TCP+auth bağlantısı açmak yerine bağlantıyı havuzdan ödünç
+alır ve işi bitince geri bırakır.
+
+Kullanım:
+
+    from db_pool import db_connection
+
+    with db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT 1")
+"""
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import psycopg2
+import psycopg2.extensions
+import psycopg2.pool
+
+from config import Config
+from metrics import InstrumentedConnection
+
+
+class PoolTimeoutError(psycopg2.pool.PoolError):
+    """Belirlenen süre içinde havuzdan bağlantı alınamadı"""
+
+
+class ConnectionPool:
+    """Min/max boyutlu, ödünç alırken sağlık kontrolü yapan bağlantı havuzu"""
+
+    def __init__(self, minconn, maxconn, timeout=10.0, max_lifetime=1800.0,
+                 ping_interval=30.0, **connect_kwargs):
+        if minconn < 0 or maxconn < 1 or minconn > maxconn:
+            raise ValueError("Geçersiz havuz boyutu: min=%s max=%s" % (minconn, maxconn))
+
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.ping_interval = ping_interval
+        self._connect_kwargs = connect_kwargs
+
+        self._cond = threading.Condition(threading.Lock())
+        # (bağlantı, oluşturulma zamanı, son iade zamanı)
+        self._idle = deque()
+        # id(bağlantı) -> oluşturulma zamanı
+        self._in_use = {}
+        # Açılmakta ya da sağlık kontrolünden geçmekte olan bağlantılar
+        self._pending = 0
+        self._closed = False
+
+        # İzleme sayaçları
+        self._checkouts = 0
+        self._waits = 0
+        self._wait_time_total = 0.0
+        self._wait_time_max = 0.0
+        self._timeouts = 0
+        self._created = 0
+        self._discarded = 0
+
+        for _ in range(minconn):
+            conn = self._connect()
+            self._idle.append((conn, time.monotonic(), time.monotonic()))
+
+    def _connect(self):
+        conn = psycopg2.connect(**self._connect_kwargs)
+        with self._cond:
+            self._created += 1
+        return conn
+
+    def _size(self):
+        return len(self._idle) + len(self._in_use) + self._pending
+
+    def _discard(self, conn):
+        """Bağlantıyı kapatır; çağıran kilidi tutmamalıdır"""
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _is_healthy(self, conn, created_at, released_at):
+        """Ödünç vermeden önce bağlantının kullanılabilir olduğunu doğrular"""
+        now = time.monotonic()
+        if self.max_lifetime and now - created_at > self.max_lifetime:
+            return False
+        if conn.closed:
+            return False
+        status = conn.get_transaction_status()
+        if status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+            return False
+        if self.ping_interval is not None and now - released_at >= self.ping_interval:
+            try:
+                with conn.cursor() as cur:
+                    cur.execute("SELECT 1")
+                conn.rollback()
+            except psycopg2.Error:
+                return False
+        return True
+
+    def getconn(self, timeout=None):
+        """Havuzdan bir bağlantı ödünç alır"""
+        timeout = self.timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+        waited = False
+
+        while True:
+            candidate = None
+            open_new = False
+            with self._cond:
+                if self._closed:
+                    raise psycopg2.pool.PoolError("Bağlantı havuzu kapatıldı")
+                while not self._idle and self._size() >= self.maxconn:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolTimeoutError(
+                            "%.1f saniye içinde bağlantı alınamadı (max=%d)" % (timeout, self.maxconn)
+                        )
+                    waited = True
+                    self._cond.wait(remaining)
+                    if self._closed:
+                        raise psycopg2.pool.PoolError("Bağlantı havuzu kapatıldı")
+
+                if self._idle:
+                    # LIFO: en son kullanılan bağlantı en sıcak olandır
+                    candidate = self._idle.pop()
+                else:
+                    open_new = True
+                self._pending += 1
+
+            if open_new:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._cond:
+                        self._pending -= 1
+                        self._cond.notify()
+                    raise
+                created_at = time.monotonic()
+                with self._cond:
+                    self._pending -= 1
+                    self._in_use[id(conn)] = created_at
+                    self._record_checkout(started, waited)
+                return conn
+
+            conn, created_at, released_at = candidate
+            if self._is_healthy(conn, created_at, released_at):
+                with self._cond:
+                    self._pending -= 1
+                    self._in_use[id(conn)] = created_at
+                    self._record_checkout(started, waited)
+                return conn
+
+            # Bozuk ya da ömrünü doldurmuş bağlantı; at ve tekrar dene
+            self._discard(conn)
+            with self._cond:
+                self._pending -= 1
+                self._discarded += 1
+                self._cond.notify()
+
+    def _record_checkout(self, started, waited):
+        """Kilit tutulurken çağrılır"""
+        self._checkouts += 1
+        if waited:
+            elapsed = time.monotonic() - started
+            self._waits += 1
+            self._wait_time_total += elapsed
+            self._wait_time_max = max(self._wait_time_max, elapsed)
+
+    def putconn(self, conn, close=False):
+        """Ödünç alınan bağlantıyı havuza iade eder"""
+        if not conn.closed and not close:
+            status = conn.get_transaction_status()
+            if status == psycopg2.extensions.TRANSACTION_STATUS_UNKNOWN:
+                close = True
+            elif status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                # Commit edilmemiş işlem havuza taşınmasın
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    close = True
+
+        with self._cond:
+            created_at = self._in_use.pop(id(conn), None)
+            if created_at is None:
+                raise psycopg2.pool.PoolError("Bu bağlantı havuza ait değil")
+            expired = self.max_lifetime and time.monotonic() - created_at > self.max_lifetime
+            keep = not (close or conn.closed or expired or self._closed)
+            if keep:
+                self._idle.append((conn, created_at, time.monotonic()))
+            else:
+                self._discarded += 1
+            self._cond.notify()
+
+        if not keep:
+            self._discard(conn)
+
+    @contextmanager
+    def connection(self, timeout=None):
+        """Bağlantıyı ödünç alıp blok sonunda iade eden context manager
+
+        Blok hata ile biterse açık işlem geri alınır.
+        """
+        conn = self.getconn(timeout)
+        try:
+            yield conn
+        except BaseException:
+            close = False
+            try:
+                conn.rollback()
+            except Exception:
+                close = True
+            self.putconn(conn, close=close)
+            raise
+        else:
+            self.putconn(conn)
+
+    def stats(self):
+        """İzleme için havuz istatistiklerini döndürür"""
+        with self._cond:
+            return {
+                'min_size': self.minconn,
+                'max_size': self.maxconn,
+                'in_use': len(self._in_use),
+                'idle': len(self._idle),
+                'pending': self._pending,
+                'checkouts': self._checkouts,
+                'waits': self._waits,
+                'wait_time_total': round(self._wait_time_total, 6),
+                'wait_time_max': round(self._wait_time_max, 6),
+                'wait_time_avg': round(self._wait_time_total / self._waits, 6) if self._waits else 0.0,
+                'timeouts': self._timeouts,
+                'connections_created': self._created,
+                'connections_discarded': self._discarded,
+            }
+
+    def closeall(self):
+        """Havuzdaki tüm boşta bağlantıları kapatır ve yeni ödünç almayı engeller"""
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._cond.notify_all()
+        for conn, _, _ in idle:
+            self._discard(conn)
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Süreç başına paylaşılan havuzu döndürür (ilk çağrıda oluşturur)
+
+    Fork edilen worker'lar ebeveynin soketlerini paylaşmasın diye havuz PID
+    değiştiğinde yeniden oluşturulur.
+    """
+    global _pool, _pool_pid
+    pid = os.getpid()
+    if _pool is not None and _pool_pid == pid:
+        return _pool
+    with _pool_lock:
+        if _pool is None or _pool_pid != pid:
+            _pool = ConnectionPool(
+                Config.DB_POOL_MIN,
+                Config.DB_POOL_MAX,
+                timeout=Config.DB_POOL_TIMEOUT,
+                max_lifetime=Config.DB_POOL_MAX_LIFETIME,
+                ping_interval=Config.DB_POOL_PING_INTERVAL,
+                connect_timeout=5,
+                # Sorgu süreleri istek ölçümlerine ve profilleyiciye eklensin
+                connection_factory=(InstrumentedConnection
+                                    if Config.METRICS_ENABLED or Config.QUERY_PROFILER_ENABLED else None),
+                **Config.get_db_config()
+            )
+            _pool_pid = pid
+    return _pool
+
+
+def db_connection(timeout=None):
+    """Paylaşılan havuzdan bağlantı ödünç alan context manager"""
+    return get_pool().connection(timeout)
+
+
+def pool_stats():
+    """Havuz oluşturulmamışsa boş istatistik döndürür"""
+    if _pool is None or _pool_pid != os.getpid():
+        return {}
+    return _pool.stats()
+
+
+def close_pool():
+    """Paylaşılan havuzu kapatır"""
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is not None:
+            _pool.closeall()
+        _pool = None
+        _pool_pid = None
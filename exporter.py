@@ -0,0 +1,96 @@
+"""
+Sunucu tarafı imleç ile akış halinde dışa aktarma
+
+Sorgu sonucu belleğe ``fetchall()`` ile alınmaz; adlandırılmış (server-side)
+bir psycopg2 imlecinden parça parça okunur ve her parça CSV ya da NDJSON
+olarak hemen istemciye yazılır. Bellek kullanımı satır sayısından bağımsız
+olarak parça boyutuyla sınırlı kalır.
+"""
+import csv
+import io
+import json
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+
+from db_pool import db_connection
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson; charset=utf-8',
+}
+
+DEFAULT_FETCH_SIZE = 2000
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"{type(value).__name__} JSON'a çevrilemez")
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    return value
+
+
+def _encode_csv(columns, rows, header=False):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(columns)
+    for row in rows:
+        writer.writerow([_csv_value(value) for value in row])
+    return buffer.getvalue()
+
+
+def _encode_ndjson(columns, rows):
+    return ''.join(
+        json.dumps(dict(zip(columns, row)), default=_json_default, ensure_ascii=False) + '\n'
+        for row in rows
+    )
+
+
+def _stream(sql, params, columns, fmt, fetch_size):
+    # Bağlantı akış bitene (ya da istemci kopana) kadar havuzdan ödünç alınır
+    with db_connection() as conn:
+        with conn.cursor(name=f'export_{uuid.uuid4().hex}') as cur:
+            cur.itersize = fetch_size
+            cur.execute(sql, params)
+            # İlk parça: sorgu hataları yanıt başlamadan önce yüzeye çıksın
+            yield _encode_csv(columns, (), header=True) if fmt == 'csv' else ''
+            while True:
+                rows = cur.fetchmany(fetch_size)
+                if not rows:
+                    break
+                if fmt == 'csv':
+                    yield _encode_csv(columns, rows)
+                else:
+                    yield _encode_ndjson(columns, rows)
+
+
+def stream_query(sql, params, columns, fmt='csv', fetch_size=DEFAULT_FETCH_SIZE):
+    """Sorguyu çalıştırır ve sonucu parça parça üreten bir iterator döndürür
+
+    Bağlantı alma ve sorgu hataları bu fonksiyon çağrılırken yükselir; akış
+    başladıktan sonra istemci bağlantıyı keserse imleç ve bağlantı iade edilir.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError('Unsupported export format')
+    stream = _stream(sql, params, columns, fmt, fetch_size)
+    first = next(stream)
+
+    def primed():
+        try:
+            if first:
+                yield first
+            yield from stream
+        finally:
+            stream.close()
+
+    return primed()
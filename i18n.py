@@ -0,0 +1,135 @@
+"""
+Çeviri kataloğu
+
+``translations/{lang}.json`` dosyalarını süreç başına bir kez yükler ve her
+dil için İngilizce yedeği anahtar bazında birleştirilmiş, değiştirilemez bir
+eşleme tutar. Dosyalar yalnızca değişiklik zamanı (mtime) değiştiğinde ya da
+``reload()`` / sinyal ile açıkça istendiğinde yeniden okunur; böylece her
+template render'ında disk erişimi ve JSON ayrıştırma yapılmaz.
+"""
+import json
+import logging
+import os
+import signal
+import threading
+import time
+from types import MappingProxyType
+
+from config import Config
+
+TRANSLATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'translations')
+DEFAULT_LANGUAGE = 'en'
+
+logger = logging.getLogger(__name__)
+
+
+class TranslationCatalog:
+    """Dil başına birleştirilmiş, değiştirilemez çeviri eşlemeleri"""
+
+    def __init__(self, directory=TRANSLATIONS_DIR, fallback=DEFAULT_LANGUAGE, check_interval=2.0):
+        self.directory = directory
+        self.fallback = fallback
+        # mtime kontrolleri arasındaki en kısa süre (0: her istekte, None/negatif: hiç)
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._merged = {}
+        self._mtimes = {}
+        self._last_check = 0.0
+        self._reload_requested = False
+        # Her yeniden yüklemede artar; çeviri içeren önbellek anahtarlarında kullanılır
+        self.version = 0
+
+    def _path(self, lang):
+        return os.path.join(self.directory, f'{lang}.json')
+
+    def _mtime(self, lang):
+        try:
+            return os.stat(self._path(lang)).st_mtime_ns
+        except OSError:
+            return None
+
+    def _read(self, lang):
+        try:
+            with open(self._path(lang), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except ValueError as e:
+            logger.error("Invalid translation file %s: %s", self._path(lang), e)
+            return None
+
+    def _build(self, lang):
+        """Kilit tutulurken çağrılır"""
+        fallback = self._read(self.fallback) or {}
+        self._mtimes[self.fallback] = self._mtime(self.fallback)
+        if lang == self.fallback:
+            merged = dict(fallback)
+        else:
+            own = self._read(lang)
+            self._mtimes[lang] = self._mtime(lang)
+            if own is None:
+                # Dil dosyası yok: tamamen İngilizce'ye düş
+                merged = dict(fallback)
+            else:
+                merged = dict(fallback)
+                merged.update(own)
+        mapping = MappingProxyType(merged)
+        self._merged[lang] = mapping
+        return mapping
+
+    def _stale(self):
+        """Yüklenmiş dosyalardan biri değiştiyse True döndürür"""
+        if self.check_interval is None or self.check_interval < 0:
+            return False
+        now = time.monotonic()
+        if now - self._last_check < self.check_interval:
+            return False
+        self._last_check = now
+        return any(self._mtime(lang) != mtime for lang, mtime in list(self._mtimes.items()))
+
+    def get(self, lang=DEFAULT_LANGUAGE):
+        """Dilin birleştirilmiş çevirilerini döndürür"""
+        if self._reload_requested or self._stale():
+            self.reload()
+        mapping = self._merged.get(lang)
+        if mapping is not None:
+            return mapping
+        with self._lock:
+            mapping = self._merged.get(lang)
+            if mapping is None:
+                mapping = self._build(lang)
+            return mapping
+
+    def reload(self):
+        """Yüklü tüm dilleri diskten yeniden okur"""
+        with self._lock:
+            self._reload_requested = False
+            langs = list(self._merged) or [self.fallback]
+            self._merged = {}
+            self._mtimes = {}
+            for lang in langs:
+                self._build(lang)
+            self.version += 1
+        logger.info("Translations reloaded (version %d)", self.version)
+
+    def request_reload(self):
+        """Bir sonraki erişimde yeniden yüklemeyi işaretler (sinyal güvenli)"""
+        self._reload_requested = True
+
+
+translation_catalog = TranslationCatalog(check_interval=Config.TRANSLATIONS_RELOAD_INTERVAL)
+
+
+def get_translations(lang=DEFAULT_LANGUAGE):
+    return translation_catalog.get(lang)
+
+
+def install_reload_signal(signum=None):
+    """Verilen sinyal geldiğinde çevirileri yeniden yükler (yalnızca ana thread'de)"""
+    if signum is None:
+        signum = getattr(signal, 'SIGUSR2', None)
+    if signum is None or threading.current_thread() is not threading.main_thread():
+        return False
+    # Handler kilit almaz; yükleme bir sonraki istekte yapılır
+    signal.signal(signum, lambda *_: translation_catalog.request_reload())
+    return True
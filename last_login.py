@@ -0,0 +1,223 @@
+"""
+Son giriş zamanı için write-behind kuyruğu
+
+Başarılı girişler ``last_login`` değerini senkron UPDATE ile yazmak yerine
+bellekteki kuyruğa bırakır. Arka plandaki thread kuyruğu her
+``flush_interval`` saniyede bir ya da ``max_batch`` girdiye ulaşıldığında tek
+çok satırlı UPDATE ile yazar. Aynı kullanıcının birden fazla girişi tek
+satırda birleşir; satırlar id sırasıyla güncellendiği için süreçler arasında
+kilit sırası çakışması olmaz. Süreç kapanırken kalan girdiler yazılır.
+
+Zaman damgası veritabanı saatinden yazılır: kuyrukta yalnızca girişin
+``time.monotonic`` değeri tutulur, flush sırasında ``LOCALTIMESTAMP`` eksi
+kuyrukta geçen süre yazılır. Başarısız flush'tan sonra thread, kuyruk dolu
+olsa bile artan bir süre (en fazla ``MAX_RETRY_DELAY``) bekler.
+
+Yazılmamış girdiler ``apply_pending`` ile okunan satırlara uygulanabilir;
+böylece kullanıcı listesi en fazla ``flush_interval`` kadar eski kalır.
+Gösterilen değer de veritabanı saatinden hesaplanır (satırları okuyan
+bağlantıdaki ``clock_timestamp()``), flush sonrası değer kaymaz.
+"""
+import atexit
+import logging
+import os
+import threading
+import time
+from datetime import timedelta
+
+from config import Config
+from db_pool import db_connection
+
+logger = logging.getLogger(__name__)
+
+# Art arda başarısız flush'lar arasındaki en uzun bekleme (saniye)
+MAX_RETRY_DELAY = 30.0
+
+
+class LastLoginWriter:
+    """last_login güncellemelerini toplayıp toplu yazan daemon thread"""
+
+    def __init__(self, flush_interval=1.0, max_batch=500):
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self._cond = threading.Condition(threading.Lock())
+        # user_id -> en son girişin time.monotonic() değeri
+        self._pending = {}
+        self._stopping = False
+        self._thread = None
+        # Aynı anda tek flush çalışsın (thread ve kapanış flush'ı)
+        self._flush_lock = threading.Lock()
+        # Başarısız flush sonrası bekleme; başarılı flush'ta sıfırlanır
+        self._retry_delay = 0.0
+
+        # İzleme sayaçları
+        self._flushes = 0
+        self._rows_written = 0
+        self._failures = 0
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='last-login-writer', daemon=True)
+        self._thread.start()
+        return self
+
+    def is_alive(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def record(self, user_id):
+        """Giriş zamanını kuyruğa ekler (beklemez)"""
+        when = time.monotonic()
+        with self._cond:
+            current = self._pending.get(user_id)
+            if current is None or current < when:
+                self._pending[user_id] = when
+            if len(self._pending) >= self.max_batch:
+                self._cond.notify()
+
+    def apply_pending(self, rows, cur, id_key='id', field='last_login'):
+        """Henüz yazılmamış giriş zamanlarını okunan satırlara uygular
+
+        ``cur`` satırları okuyan bağlantının imlecidir; zaman flush ile aynı
+        saatten (veritabanı) hesaplanır.
+        """
+        with self._cond:
+            if not self._pending:
+                return rows
+            pending = dict(self._pending)
+        cur.execute("SELECT clock_timestamp()::timestamp AS now")
+        clock = cur.fetchone()
+        now_monotonic = time.monotonic()
+        now = clock['now'] if isinstance(clock, dict) else clock[0]
+        for row in rows:
+            recorded = pending.get(row[id_key])
+            if recorded is None:
+                continue
+            when = now - timedelta(seconds=now_monotonic - recorded)
+            if row[field] is None or row[field] < when:
+                row[field] = when
+        return rows
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if self._retry_delay:
+                    # Kuyruk dolu olsa da bekle; yoksa başarısız flush'lar arka arkaya döner
+                    self._cond.wait_for(lambda: self._stopping, self._retry_delay)
+                elif not self._stopping and len(self._pending) < self.max_batch:
+                    self._cond.wait(self.flush_interval)
+                if self._stopping:
+                    return
+            self.flush()
+
+    def flush(self):
+        """Kuyruktaki girdileri tek UPDATE ile yazar; yazılan satır sayısını döndürür"""
+        with self._flush_lock:
+            with self._cond:
+                if not self._pending:
+                    return 0
+                batch, self._pending = self._pending, {}
+
+            user_ids = sorted(batch)
+            try:
+                with db_connection() as conn, conn.cursor() as cur:
+                    # Yaş, sorgudan hemen önce hesaplanır; zaman veritabanı saatinden gelir
+                    now = time.monotonic()
+                    ages = [now - batch[user_id] for user_id in user_ids]
+                    cur.execute("""
+                        UPDATE users u
+                        SET last_login = v.last_login
+                        FROM (
+                            SELECT id, LOCALTIMESTAMP - age * INTERVAL '1 second' AS last_login
+                            FROM unnest(%s::int[], %s::float8[]) AS t(id, age)
+                        ) v
+                        WHERE u.id = v.id
+                          AND (u.last_login IS NULL OR u.last_login < v.last_login)
+                    """, (user_ids, ages))
+                    conn.commit()
+            except Exception as e:
+                # Girdileri geri koy; bir sonraki flush'ta tekrar denenir
+                with self._cond:
+                    self._failures += 1
+                    self._retry_delay = min(MAX_RETRY_DELAY, max(self.flush_interval, self._retry_delay * 2))
+                    for user_id, when in batch.items():
+                        current = self._pending.get(user_id)
+                        if current is None or current < when:
+                            self._pending[user_id] = when
+                logger.warning("last_login flush failed (%d entries), retrying in %.1fs: %s",
+                               len(batch), self._retry_delay, e)
+                return 0
+
+            with self._cond:
+                self._retry_delay = 0.0
+                self._flushes += 1
+                self._rows_written += len(batch)
+            return len(batch)
+
+    def stop(self, timeout=5.0):
+        """Thread'i durdurur ve kalan girdileri yazar"""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        self.flush()
+
+    def stats(self):
+        with self._cond:
+            return {
+                'pending': len(self._pending),
+                'flushes': self._flushes,
+                'rows_written': self._rows_written,
+                'failures': self._failures,
+                'retry_delay': self._retry_delay,
+                'flush_interval': self.flush_interval,
+                'max_batch': self.max_batch,
+            }
+
+
+_writer = None
+_writer_pid = None
+_writer_lock = threading.Lock()
+
+
+def get_last_login_writer():
+    """Bu süreç için yazıcıyı döndürür (gerekirse başlatır)
+
+    Fork sonrası ebeveynin thread'i ve kuyruğu çocuğa geçmediğinden PID
+    kontrol edilir.
+    """
+    global _writer, _writer_pid
+    pid = os.getpid()
+    if _writer is not None and _writer_pid == pid and _writer.is_alive():
+        return _writer
+    with _writer_lock:
+        if _writer is None or _writer_pid != pid or not _writer.is_alive():
+            _writer = LastLoginWriter(
+                flush_interval=Config.LAST_LOGIN_FLUSH_INTERVAL_MS / 1000.0,
+                max_batch=Config.LAST_LOGIN_MAX_BATCH
+            ).start()
+            _writer_pid = pid
+    return _writer
+
+
+def record_login(user_id):
+    get_last_login_writer().record(user_id)
+
+
+def apply_pending_logins(rows, cur):
+    """Bu süreçte henüz yazılmamış giriş zamanlarını satırlara uygular (cur: satırları okuyan imleç)"""
+    if _writer is None or _writer_pid != os.getpid():
+        return rows
+    return _writer.apply_pending(rows, cur)
+
+
+def last_login_stats():
+    if _writer is None or _writer_pid != os.getpid():
+        return {}
+    return _writer.stats()
+
+
+@atexit.register
+def flush_last_logins():
+    """Süreç kapanırken kalan girdileri yazar"""
+    if _writer is not None and _writer_pid == os.getpid():
+        _writer.stop()
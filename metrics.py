@@ -0,0 +1,261 @@
+"""
+İstek ölçümleri ve Prometheus metin çıktısı
+
+Her istek için süre, veritabanı sorgu süresi, bcrypt süresi ve template
+render süresi thread-local bir sayaçta toplanır ve istek bitince rota bazında
+histogramlara eklenir. Ölçüm yolu yalnızca ``time.perf_counter`` çağrıları,
+bir sözlük güncellemesi ve istek sonunda tek kilitli histogram güncellemesinden
+oluşur; üretimde açık kalacak kadar ucuzdur.
+
+Veritabanı süresi, havuzdaki bağlantılara verilen ``InstrumentedConnection``
+sayesinde her imlecin ``execute`` çağrılarından ölçülür; aynı kanca açıksa
+ifadeleri ``query_profiler``'a da bildirir.
+"""
+import threading
+import time
+from bisect import bisect_left
+
+import psycopg2.extensions
+
+import query_profiler
+
+# Saniye cinsinden histogram sınırları (+Inf ayrıca eklenir)
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# İstek içinde ayrıca ölçülen süre türleri
+TIMER_KINDS = ('db', 'bcrypt', 'template')
+
+_local = threading.local()
+
+
+def begin_request():
+    """Bu thread için istek sayaçlarını sıfırlar"""
+    _local.started = time.perf_counter()
+    _local.timers = dict.fromkeys(TIMER_KINDS, 0.0)
+    _local.queries = 0
+    _local.render_depth = 0
+
+
+def add_time(kind, seconds):
+    """Aktif isteğe süre ekler (istek dışında yok sayılır)"""
+    timers = getattr(_local, 'timers', None)
+    if timers is not None:
+        timers[kind] += seconds
+
+
+def end_request():
+    """İstek sayaçlarını döndürür ve temizler: (toplam süre, süreler, sorgu sayısı)"""
+    started = getattr(_local, 'started', None)
+    if started is None:
+        return None
+    elapsed = time.perf_counter() - started
+    timers = _local.timers
+    queries = _local.queries
+    _local.started = _local.timers = None
+    return elapsed, timers, queries
+
+
+class Timer:
+    """``with Timer('bcrypt'):`` bloğunun süresini aktif isteğe ekler"""
+
+    __slots__ = ('kind', 'started')
+
+    def __init__(self, kind):
+        self.kind = kind
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        add_time(self.kind, time.perf_counter() - self.started)
+        return False
+
+
+# Template render süresi: Flask sinyalleri ile, iç içe render'lar (ör. sidebar)
+# yalnızca en dıştaki render'da sayılır
+def template_started(sender, template, context, **extra):
+    if getattr(_local, 'timers', None) is None:
+        return
+    if _local.render_depth == 0:
+        _local.render_started = time.perf_counter()
+    _local.render_depth += 1
+
+
+def template_finished(sender, template, context, **extra):
+    if getattr(_local, 'timers', None) is None or _local.render_depth == 0:
+        return
+    _local.render_depth -= 1
+    if _local.render_depth == 0:
+        _local.timers['template'] += time.perf_counter() - _local.render_started
+
+
+class TimedCursorMixin:
+    """execute/executemany/copy sürelerini aktif isteğe ekler"""
+
+    def execute(self, query, vars=None):
+        started = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            _record_query(self, query, time.perf_counter() - started)
+
+    def executemany(self, query, vars_list):
+        started = time.perf_counter()
+        try:
+            return super().executemany(query, vars_list)
+        finally:
+            _record_query(self, query, time.perf_counter() - started)
+
+    def copy_expert(self, sql, file, size=8192):
+        started = time.perf_counter()
+        try:
+            return super().copy_expert(sql, file, size)
+        finally:
+            _record_query(self, sql, time.perf_counter() - started)
+
+
+def _record_query(cursor, query, elapsed):
+    timers = getattr(_local, 'timers', None)
+    if timers is not None:
+        timers['db'] += elapsed
+        _local.queries += 1
+    if query_profiler.active():
+        query_profiler.record(query, elapsed, cursor.rowcount)
+
+
+_timed_classes = {}
+
+
+def _timed_cursor_class(factory):
+    cls = _timed_classes.get(factory)
+    if cls is None:
+        cls = type('Timed' + factory.__name__, (TimedCursorMixin, factory), {})
+        _timed_classes[factory] = cls
+    return cls
+
+
+class InstrumentedConnection(psycopg2.extensions.connection):
+    """Açtığı her imleci (cursor_factory dahil) süre ölçen sınıfa çeviren bağlantı"""
+
+    def cursor(self, *args, **kwargs):
+        factory = kwargs.get('cursor_factory') or self.cursor_factory or psycopg2.extensions.cursor
+        kwargs['cursor_factory'] = _timed_cursor_class(factory)
+        return super().cursor(*args, **kwargs)
+
+
+class Histogram:
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """Rota bazında istek sayaçları ve süre histogramları"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        # (rota, metod, durum kodu) -> sayı
+        self._requests = {}
+        # (tür, rota, metod) -> Histogram; tür: request + TIMER_KINDS
+        self._histograms = {}
+        self._queries = {}
+
+    def observe_request(self, route, method, status, elapsed, timers, queries):
+        with self._lock:
+            key = (route, method, status)
+            self._requests[key] = self._requests.get(key, 0) + 1
+            for kind, value in (('request', elapsed),) + tuple(timers.items()):
+                hkey = (kind, route, method)
+                histogram = self._histograms.get(hkey)
+                if histogram is None:
+                    histogram = self._histograms[hkey] = Histogram(self.buckets)
+                histogram.observe(value)
+            qkey = (route, method)
+            self._queries[qkey] = self._queries.get(qkey, 0) + queries
+
+    def snapshot(self):
+        with self._lock:
+            histograms = {key: (list(h.counts), h.sum, h.count) for key, h in self._histograms.items()}
+            return dict(self._requests), histograms, dict(self._queries)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels):
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + '}'
+
+
+def _number(value):
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
+
+
+HISTOGRAM_HELP = {
+    'request': ('http_request_duration_seconds', 'Total request latency'),
+    'db': ('http_request_db_seconds', 'Time spent in database queries per request'),
+    'bcrypt': ('http_request_bcrypt_seconds', 'Time spent in password hashing per request'),
+    'template': ('http_request_template_seconds', 'Time spent rendering templates per request'),
+}
+
+
+def render_prometheus(registry, gauges=None):
+    """Kayıtları ve ek göstergeleri Prometheus metin biçimine çevirir
+
+    ``gauges``: {metrik adı: (açıklama, değer)} ya da {ad: (açıklama, {etiketler: değer})}
+    """
+    requests, histograms, queries = registry.snapshot()
+    lines = [
+        '# HELP http_requests_total Requests by route, method and status',
+        '# TYPE http_requests_total counter',
+    ]
+    for (route, method, status), count in sorted(requests.items()):
+        lines.append(f'http_requests_total{_labels(route=route, method=method, status=status)} {count}')
+
+    lines.append('# HELP http_request_db_queries_total Database queries by route and method')
+    lines.append('# TYPE http_request_db_queries_total counter')
+    for (route, method), count in sorted(queries.items()):
+        lines.append(f'http_request_db_queries_total{_labels(route=route, method=method)} {count}')
+
+    bounds = [_number(b) for b in registry.buckets] + ['+Inf']
+    for kind in ('request',) + TIMER_KINDS:
+        name, help_text = HISTOGRAM_HELP[kind]
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} histogram')
+        for (hkind, route, method), (counts, total, count) in sorted(histograms.items()):
+            if hkind != kind:
+                continue
+            cumulative = 0
+            for bound, bucket_count in zip(bounds, counts):
+                cumulative += bucket_count
+                lines.append(f'{name}_bucket{_labels(route=route, method=method, le=bound)} {cumulative}')
+            lines.append(f'{name}_sum{_labels(route=route, method=method)} {_number(total)}')
+            lines.append(f'{name}_count{_labels(route=route, method=method)} {count}')
+
+    for name, (help_text, value) in (gauges or {}).items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} gauge')
+        if isinstance(value, dict):
+            for labels, labelled_value in value.items():
+                lines.append(f'{name}{_labels(**dict(labels))} {_number(labelled_value)}')
+        else:
+            lines.append(f'{name} {_number(value)}')
+    return '\n'.join(lines) + '\n'
+
+
+metrics_registry = MetricsRegistry()
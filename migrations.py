@@ -0,0 +1,436 @@
+"""
+Sürümlü şema geçişleri
+
+Tüm tablo, sütun, index ve trigger tanımları burada, sıralı geçişler olarak
+tutulur; uygulanan en son sürüm ``schema_migrations`` tablosuna yazılır.
+Açılışta ``ensure_schema`` tek bir sorguyla sürümü kontrol eder; şema
+güncelse başka hiçbir şey yapılmaz. Eksik geçişler advisory lock altında,
+her biri kendi işleminde uygulanır; böylece aynı anda açılan worker'lar
+birbirini beklemekle yetinir.
+
+Yeni geçiş eklerken listenin sonuna bir sonraki sürüm numarasıyla ekleyin;
+uygulanmış geçişleri değiştirmeyin.
+
+    python migrations.py          # bekleyen geçişleri uygular
+    python migrations.py status   # mevcut ve hedef sürümü gösterir
+"""
+import logging
+import sys
+
+import psycopg2
+import psycopg2.errors
+
+from db_pool import db_connection
+
+logger = logging.getLogger(__name__)
+
+# pg_advisory_lock anahtarı (geçişler için sabit, uygulamaya özgü)
+MIGRATION_LOCK_KEY = 726311
+
+MIGRATIONS = [
+    (1, 'baseline schema', (
+        """
+        CREATE TABLE IF NOT EXISTS users (
+            id SERIAL PRIMARY KEY,
+            username VARCHAR(50) UNIQUE NOT NULL,
+            email VARCHAR(100) UNIQUE NOT NULL,
+            password VARCHAR(255) NOT NULL,
+            full_name VARCHAR(100) NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            is_active BOOLEAN DEFAULT TRUE,
+            last_login TIMESTAMP,
+            language VARCHAR(5) DEFAULT 'en'
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS projects (
+            id SERIAL PRIMARY KEY,
+            name VARCHAR(200) NOT NULL,
+            description TEXT,
+            start_date DATE,
+            end_date DATE,
+            budget DECIMAL(15,2),
+            status VARCHAR(20) DEFAULT 'active',
+            created_by INTEGER REFERENCES users(id),
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS materials (
+            id SERIAL PRIMARY KEY,
+            name VARCHAR(200) NOT NULL,
+            description TEXT,
+            unit VARCHAR(50) NOT NULL,
+            unit_price DECIMAL(10,2) NOT NULL,
+            category VARCHAR(100),
+            supplier VARCHAR(200),
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS labor (
+            id SERIAL PRIMARY KEY,
+            position VARCHAR(100) NOT NULL,
+            hourly_rate DECIMAL(10,2) NOT NULL,
+            daily_rate DECIMAL(10,2),
+            description TEXT,
+            category VARCHAR(100),
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS equipment (
+            id SERIAL PRIMARY KEY,
+            name VARCHAR(200) NOT NULL,
+            description TEXT,
+            daily_rate DECIMAL(10,2) NOT NULL,
+            hourly_rate DECIMAL(10,2),
+            category VARCHAR(100),
+            supplier VARCHAR(200),
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS project_materials (
+            id SERIAL PRIMARY KEY,
+            project_id INTEGER REFERENCES projects(id) ON DELETE CASCADE,
+            material_id INTEGER REFERENCES materials(id),
+            quantity DECIMAL(10,2) NOT NULL,
+            unit_price DECIMAL(10,2) NOT NULL,
+            total_price DECIMAL(15,2) GENERATED ALWAYS AS (quantity * unit_price) STORED,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS project_labor (
+            id SERIAL PRIMARY KEY,
+            project_id INTEGER REFERENCES projects(id) ON DELETE CASCADE,
+            labor_id INTEGER REFERENCES labor(id),
+            hours DECIMAL(8,2) NOT NULL,
+            hourly_rate DECIMAL(10,2) NOT NULL,
+            total_cost DECIMAL(15,2) GENERATED ALWAYS AS (hours * hourly_rate) STORED,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS project_equipment (
+            id SERIAL PRIMARY KEY,
+            project_id INTEGER REFERENCES projects(id) ON DELETE CASCADE,
+            equipment_id INTEGER REFERENCES equipment(id),
+            days DECIMAL(8,2) NOT NULL,
+            daily_rate DECIMAL(10,2) NOT NULL,
+            total_cost DECIMAL(15,2) GENERATED ALWAYS AS (days * daily_rate) STORED,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS permissions (
+            id SERIAL PRIMARY KEY,
+            name VARCHAR(100) UNIQUE NOT NULL,
+            description TEXT,
+            module VARCHAR(50) NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS user_permissions (
+            id SERIAL PRIMARY KEY,
+            user_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
+            permission_id INTEGER REFERENCES permissions(id) ON DELETE CASCADE,
+            granted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            granted_by INTEGER REFERENCES users(id),
+            UNIQUE(user_id, permission_id)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS roles (
+            id SERIAL PRIMARY KEY,
+            name VARCHAR(100) UNIQUE NOT NULL,
+            description TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS role_permissions (
+            id SERIAL PRIMARY KEY,
+            role_id INTEGER REFERENCES roles(id) ON DELETE CASCADE,
+            permission_id INTEGER REFERENCES permissions(id) ON DELETE CASCADE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(role_id, permission_id)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS user_roles (
+            id SERIAL PRIMARY KEY,
+            user_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
+            role_id INTEGER REFERENCES roles(id) ON DELETE CASCADE,
+            assigned_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            assigned_by INTEGER REFERENCES users(id),
+            UNIQUE(user_id, role_id)
+        )
+        """,
+    )),
+    (2, 'user profile columns', (
+        # Kullanıcı formu ve listesi bu sütunları kullanıyor, hiçbir CREATE TABLE tanımlamıyordu
+        "ALTER TABLE users ADD COLUMN IF NOT EXISTS first_name VARCHAR(100)",
+        "ALTER TABLE users ADD COLUMN IF NOT EXISTS last_name VARCHAR(100)",
+        "ALTER TABLE users ADD COLUMN IF NOT EXISTS country VARCHAR(100)",
+        "ALTER TABLE users ADD COLUMN IF NOT EXISTS region VARCHAR(100)",
+        "ALTER TABLE users ADD COLUMN IF NOT EXISTS department VARCHAR(100)",
+        "ALTER TABLE users ADD COLUMN IF NOT EXISTS position VARCHAR(100)",
+    )),
+    (3, 'foreign key and hot query indexes', (
+        # UNIQUE(user_id, ...) kısıtları user_id/role_id ile başlayan aramaları zaten
+        # karşılıyor; burada ters yöndeki ve hiç indekslenmemiş join sütunları var.
+        # Rolü değişen kullanıcıları bulma (permission_listener) ve rol silme kaskadı
+        "CREATE INDEX IF NOT EXISTS idx_user_roles_role_id ON user_roles (role_id)",
+        # Yetki silme kaskadları
+        "CREATE INDEX IF NOT EXISTS idx_role_permissions_permission_id ON role_permissions (permission_id)",
+        "CREATE INDEX IF NOT EXISTS idx_user_permissions_permission_id ON user_permissions (permission_id)",
+        # Proje maliyet sorguları: proje başına kalemler
+        "CREATE INDEX IF NOT EXISTS idx_project_materials_project_id ON project_materials (project_id)",
+        "CREATE INDEX IF NOT EXISTS idx_project_labor_project_id ON project_labor (project_id)",
+        "CREATE INDEX IF NOT EXISTS idx_project_equipment_project_id ON project_equipment (project_id)",
+        # Katalog kalemi hangi projelerde kullanılıyor (fiyat güncellemeleri)
+        "CREATE INDEX IF NOT EXISTS idx_project_materials_material_id ON project_materials (material_id)",
+        "CREATE INDEX IF NOT EXISTS idx_project_labor_labor_id ON project_labor (labor_id)",
+        "CREATE INDEX IF NOT EXISTS idx_project_equipment_equipment_id ON project_equipment (equipment_id)",
+        "CREATE INDEX IF NOT EXISTS idx_projects_created_by ON projects (created_by)",
+        # Kullanıcı listesi keyset sayfalama (varsayılan sıralama)
+        "CREATE INDEX IF NOT EXISTS idx_users_created_at_id ON users (created_at, id)",
+    )),
+    (4, 'permission change notify triggers', (
+        """
+        CREATE OR REPLACE FUNCTION notify_permission_change() RETURNS trigger AS $$
+        DECLARE
+            payload JSON;
+        BEGIN
+            IF TG_TABLE_NAME = 'permissions' THEN
+                payload := json_build_object('table', TG_TABLE_NAME);
+            ELSIF TG_TABLE_NAME = 'role_permissions' THEN
+                IF TG_OP = 'DELETE' THEN
+                    payload := json_build_object('table', TG_TABLE_NAME, 'role_id', OLD.role_id);
+                ELSIF TG_OP = 'UPDATE' THEN
+                    payload := json_build_object('table', TG_TABLE_NAME, 'role_id', NEW.role_id,
+                                                 'old_role_id', OLD.role_id);
+                ELSE
+                    payload := json_build_object('table', TG_TABLE_NAME, 'role_id', NEW.role_id);
+                END IF;
+            ELSE
+                IF TG_OP = 'DELETE' THEN
+                    payload := json_build_object('table', TG_TABLE_NAME, 'user_id', OLD.user_id);
+                ELSIF TG_OP = 'UPDATE' THEN
+                    payload := json_build_object('table', TG_TABLE_NAME, 'user_id', NEW.user_id,
+                                                 'old_user_id', OLD.user_id);
+                ELSE
+                    payload := json_build_object('table', TG_TABLE_NAME, 'user_id', NEW.user_id);
+                END IF;
+            END IF;
+            PERFORM pg_notify('permission_changes', payload::text);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        "DROP TRIGGER IF EXISTS user_permissions_notify ON user_permissions",
+        """
+        CREATE TRIGGER user_permissions_notify
+        AFTER INSERT OR UPDATE OR DELETE ON user_permissions
+        FOR EACH ROW EXECUTE FUNCTION notify_permission_change()
+        """,
+        "DROP TRIGGER IF EXISTS user_roles_notify ON user_roles",
+        """
+        CREATE TRIGGER user_roles_notify
+        AFTER INSERT OR UPDATE OR DELETE ON user_roles
+        FOR EACH ROW EXECUTE FUNCTION notify_permission_change()
+        """,
+        "DROP TRIGGER IF EXISTS role_permissions_notify ON role_permissions",
+        """
+        CREATE TRIGGER role_permissions_notify
+        AFTER INSERT OR UPDATE OR DELETE ON role_permissions
+        FOR EACH ROW EXECUTE FUNCTION notify_permission_change()
+        """,
+        # Katalog değişiklikleri için ifade başına tek bildirim yeterli
+        "DROP TRIGGER IF EXISTS permissions_notify ON permissions",
+        """
+        CREATE TRIGGER permissions_notify
+        AFTER INSERT OR UPDATE OR DELETE ON permissions
+        FOR EACH STATEMENT EXECUTE FUNCTION notify_permission_change()
+        """,
+    )),
+    (5, 'project cost summary', (
+        # Proje başına maliyet özeti; satır tablolarındaki trigger'lar farkları uygular
+        """
+        CREATE TABLE IF NOT EXISTS project_cost_summary (
+            project_id INTEGER PRIMARY KEY REFERENCES projects(id) ON DELETE CASCADE,
+            materials_total DECIMAL(18,2) NOT NULL DEFAULT 0,
+            labor_total DECIMAL(18,2) NOT NULL DEFAULT 0,
+            equipment_total DECIMAL(18,2) NOT NULL DEFAULT 0,
+            grand_total DECIMAL(18,2) GENERATED ALWAYS AS (materials_total + labor_total + equipment_total) STORED,
+            material_lines INTEGER NOT NULL DEFAULT 0,
+            labor_lines INTEGER NOT NULL DEFAULT 0,
+            equipment_lines INTEGER NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        # İfade düzeyinde çalışır: COPY ya da toplu INSERT tek bir gruplanmış upsert
+        # üretir. Argümanlar: (özet toplam sütunu, satır sayısı sütunu, tutar sütunu)
+        """
+        CREATE OR REPLACE FUNCTION apply_project_cost_delta() RETURNS trigger AS $$
+        DECLARE
+            total_column TEXT := TG_ARGV[0];
+            lines_column TEXT := TG_ARGV[1];
+            amount_column TEXT := TG_ARGV[2];
+            delta_rows TEXT;
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                delta_rows := format('SELECT project_id, %1$I AS amount, 1 AS lines FROM new_rows',
+                                     amount_column);
+            ELSIF TG_OP = 'DELETE' THEN
+                delta_rows := format('SELECT project_id, -%1$I AS amount, -1 AS lines FROM old_rows',
+                                     amount_column);
+            ELSE
+                delta_rows := format('SELECT project_id, %1$I AS amount, 1 AS lines FROM new_rows
+                                      UNION ALL
+                                      SELECT project_id, -%1$I, -1 FROM old_rows', amount_column);
+            END IF;
+            -- Silinmiş projeler (ON DELETE CASCADE) join ile elenir; kilit sırası
+            -- project_id'ye göre sabit olsun diye sıralanır
+            EXECUTE format($sql$
+                INSERT INTO project_cost_summary AS s (project_id, %1$I, %2$I)
+                SELECT d.project_id, SUM(d.amount), SUM(d.lines)
+                FROM (%3$s) d
+                JOIN projects p ON p.id = d.project_id
+                GROUP BY d.project_id
+                HAVING SUM(d.amount) <> 0 OR SUM(d.lines) <> 0
+                ORDER BY d.project_id
+                ON CONFLICT (project_id) DO UPDATE SET
+                    %1$I = s.%1$I + EXCLUDED.%1$I,
+                    %2$I = s.%2$I + EXCLUDED.%2$I,
+                    updated_at = CURRENT_TIMESTAMP
+            $sql$, total_column, lines_column, delta_rows);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+    ) + tuple(
+        statement
+        for table, arguments in (
+            ('project_materials', "'materials_total', 'material_lines', 'total_price'"),
+            ('project_labor', "'labor_total', 'labor_lines', 'total_cost'"),
+            ('project_equipment', "'equipment_total', 'equipment_lines', 'total_cost'"),
+        )
+        for event, transition in (
+            ('insert', 'NEW TABLE AS new_rows'),
+            ('update', 'OLD TABLE AS old_rows NEW TABLE AS new_rows'),
+            ('delete', 'OLD TABLE AS old_rows'),
+        )
+        for statement in (
+            f"DROP TRIGGER IF EXISTS {table}_cost_{event} ON {table}",
+            f"""
+            CREATE TRIGGER {table}_cost_{event}
+            AFTER {event.upper()} ON {table}
+            REFERENCING {transition}
+            FOR EACH STATEMENT EXECUTE FUNCTION apply_project_cost_delta({arguments})
+            """,
+        )
+    ) + (
+        # Mevcut satırlardan ilk doldurma
+        """
+        INSERT INTO project_cost_summary (project_id, materials_total, labor_total, equipment_total,
+                                          material_lines, labor_lines, equipment_lines)
+        SELECT p.id,
+               COALESCE(m.total, 0), COALESCE(l.total, 0), COALESCE(e.total, 0),
+               COALESCE(m.lines, 0), COALESCE(l.lines, 0), COALESCE(e.lines, 0)
+        FROM projects p
+        LEFT JOIN (SELECT project_id, SUM(total_price) AS total, COUNT(*) AS lines
+                   FROM project_materials GROUP BY project_id) m ON m.project_id = p.id
+        LEFT JOIN (SELECT project_id, SUM(total_cost) AS total, COUNT(*) AS lines
+                   FROM project_labor GROUP BY project_id) l ON l.project_id = p.id
+        LEFT JOIN (SELECT project_id, SUM(total_cost) AS total, COUNT(*) AS lines
+                   FROM project_equipment GROUP BY project_id) e ON e.project_id = p.id
+        ON CONFLICT (project_id) DO NOTHING
+        """,
+    )),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def current_version(conn):
+    """Uygulanmış en son sürümü döndürür (tek sorgu; tablo yoksa 0)"""
+    with conn.cursor() as cur:
+        try:
+            cur.execute("SELECT COALESCE(MAX(version), 0) FROM schema_migrations")
+            version = cur.fetchone()[0]
+        except psycopg2.errors.UndefinedTable:
+            version = 0
+    conn.rollback()
+    return version
+
+
+def apply_migrations(conn, target=LATEST_VERSION):
+    """Bekleyen geçişleri verilen bağlantı üzerinde uygular; uygulanan sürümleri döndürür"""
+    applied = []
+    with conn.cursor() as cur:
+        # Aynı anda başlayan süreçler sırayla girer; kilidi alan ikinci süreç
+        # sürümü yeniden okuyup yapacak iş kalmadığını görür
+        cur.execute("SELECT pg_advisory_lock(%s)", (MIGRATION_LOCK_KEY,))
+        try:
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS schema_migrations (
+                    version INTEGER PRIMARY KEY,
+                    description TEXT NOT NULL,
+                    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            conn.commit()
+            cur.execute("SELECT COALESCE(MAX(version), 0) FROM schema_migrations")
+            version = cur.fetchone()[0]
+            for number, description, statements in MIGRATIONS:
+                if number <= version or number > target:
+                    continue
+                for statement in statements:
+                    cur.execute(statement)
+                cur.execute("INSERT INTO schema_migrations (version, description) VALUES (%s, %s)",
+                            (number, description))
+                conn.commit()
+                applied.append(number)
+                logger.info("Applied migration %d: %s", number, description)
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cur.execute("SELECT pg_advisory_unlock(%s)", (MIGRATION_LOCK_KEY,))
+            conn.commit()
+    return applied
+
+
+def migrate(target=LATEST_VERSION):
+    """Paylaşılan havuzdan bir bağlantıyla bekleyen geçişleri uygular"""
+    with db_connection() as conn:
+        return apply_migrations(conn, target)
+
+
+def ensure_schema():
+    """Şema güncel değilse geçişleri uygular; güncelse yalnızca tek sorgu çalışır"""
+    with db_connection() as conn:
+        if current_version(conn) >= LATEST_VERSION:
+            return []
+        return apply_migrations(conn)
+
+
+if __name__ == '__main__':
+    with db_connection() as connection:
+        version = current_version(connection)
+        if len(sys.argv) > 1 and sys.argv[1] == 'status':
+            print(f"Sema surumu: {version} (hedef {LATEST_VERSION})")
+            sys.exit(0 if version >= LATEST_VERSION else 1)
+        applied_versions = apply_migrations(connection)
+    if applied_versions:
+        print(f"Uygulanan gecisler: {', '.join(map(str, applied_versions))}")
+    else:
+        print(f"Sema guncel (surum {version})")
@@ -0,0 +1,219 @@
+"""
+Parola hash'leme yardımcıları
+
+bcrypt bilerek yavaştır ve GIL'i bıraksa da tek istekte binlerce parola
+hash'lemek bir worker'ı dakikalarca meşgul eder. Toplu işlemler için hash'ler
+süreç havuzunda (tüm çekirdeklerde) hesaplanır. Giriş sırasındaki doğrulamalar
+ise sınırlı boyutlu bir thread havuzunda ve kuyruk sınırıyla çalışır; havuz
+doluysa istek beklemek yerine hemen reddedilir. Üretilen ``$2b$`` hash'leri
+Flask-Bcrypt'in ``check_password_hash`` fonksiyonu ile uyumludur.
+"""
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+import bcrypt
+
+from config import Config
+from metrics import add_time
+
+# bcrypt 72 bayttan uzun parolaları kabul etmez / keser
+MAX_PASSWORD_BYTES = 72
+
+
+def _hash_one(password, rounds):
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+
+
+def _check(password, hashed):
+    try:
+        return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+    except ValueError:
+        # Bozuk hash ya da bcrypt'in kabul etmediği uzunlukta parola
+        return False
+
+
+def hash_rounds(hashed):
+    """Hash'in maliyet faktörünü döndürür ($2b$12$... -> 12)"""
+    try:
+        return int(hashed.split('$')[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+def needs_rehash(hashed, rounds=None):
+    return hash_rounds(hashed) != (rounds or Config.BCRYPT_LOG_ROUNDS)
+
+
+def _hash_many(passwords, rounds):
+    return [_hash_one(password, rounds) for password in passwords]
+
+
+def _worker_count():
+    return Config.PASSWORD_HASH_WORKERS or os.cpu_count() or 1
+
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+
+def get_hash_executor():
+    """Süreç başına paylaşılan hash süreç havuzunu döndürür
+
+    Çok thread'li bir worker'dan fork güvenli olmadığı için alt süreçler
+    ``spawn`` ile başlatılır; havuz ilk kullanımda bir kez oluşturulur.
+    """
+    global _executor, _executor_pid
+    pid = os.getpid()
+    if _executor is not None and _executor_pid == pid:
+        return _executor
+    with _executor_lock:
+        if _executor is None or _executor_pid != pid:
+            _executor = ProcessPoolExecutor(
+                max_workers=_worker_count(),
+                mp_context=multiprocessing.get_context('spawn')
+            )
+            _executor_pid = pid
+    return _executor
+
+
+def hash_passwords(passwords, rounds=None):
+    """Parolaları süreç havuzunda hash'ler; sırayı koruyarak liste döndürür"""
+    passwords = list(passwords)
+    if not passwords:
+        return []
+    rounds = rounds or Config.BCRYPT_LOG_ROUNDS
+    executor = get_hash_executor()
+    # Süreçler arası iletişim maliyetini azaltmak için parçalar halinde gönder
+    chunk = max(1, min(64, len(passwords) // (_worker_count() * 4)))
+    batches = [passwords[i:i + chunk] for i in range(0, len(passwords), chunk)]
+    hashed = []
+    for result in executor.map(_hash_many, batches, [rounds] * len(batches)):
+        hashed.extend(result)
+    return hashed
+
+
+def shutdown_hash_executor():
+    global _executor, _executor_pid
+    with _executor_lock:
+        if _executor is not None and _executor_pid == os.getpid():
+            _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+        _executor_pid = None
+
+
+class VerifierBusyError(RuntimeError):
+    """Doğrulama kuyruğu dolu ya da sonuç zamanında gelmedi"""
+
+
+class PasswordVerifier:
+    """Giriş doğrulamaları için sınırlı thread havuzu ve kabul kontrolü
+
+    Aynı anda en fazla ``workers`` hash çalışır, ``max_queue`` kadarı sırada
+    bekleyebilir. Kapasite doluysa ``submit`` beklemeden ``VerifierBusyError``
+    yükseltir; böylece giriş fırtınası istek thread'lerini tüketmez.
+    """
+
+    def __init__(self, workers=4, max_queue=32, timeout=5.0):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bcrypt')
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+
+        # İzleme sayaçları
+        self._completed = 0
+        self._rejected = 0
+        self._timeouts = 0
+        self._wait_time_total = 0.0
+        self._wait_time_max = 0.0
+        self._hash_time_total = 0.0
+        self._hash_time_max = 0.0
+
+    def _run(self, submitted, fn, args):
+        started = time.monotonic()
+        with self._lock:
+            self._running += 1
+            waited = started - submitted
+            self._wait_time_total += waited
+            self._wait_time_max = max(self._wait_time_max, waited)
+        try:
+            return fn(*args)
+        finally:
+            elapsed = time.monotonic() - started
+            with self._lock:
+                self._running -= 1
+                self._pending -= 1
+                self._completed += 1
+                self._hash_time_total += elapsed
+                self._hash_time_max = max(self._hash_time_max, elapsed)
+
+    def try_submit(self, fn, *args):
+        """Kapasite varsa işi kuyruğa alır ve future döndürür, yoksa None"""
+        with self._lock:
+            if self._pending >= self.workers + self.max_queue:
+                self._rejected += 1
+                return None
+            self._pending += 1
+        return self._executor.submit(self._run, time.monotonic(), fn, args)
+
+    def submit(self, fn, *args):
+        future = self.try_submit(fn, *args)
+        if future is None:
+            raise VerifierBusyError('Password verification queue is full')
+        return future
+
+    def verify(self, password, hashed):
+        """Parolayı doğrular; kuyruk doluysa ya da süre aşılırsa VerifierBusyError"""
+        started = time.perf_counter()
+        future = self.submit(_check, password, hashed)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            with self._lock:
+                self._timeouts += 1
+                # Henüz başlamamış iş iptal edilirse _run hiç çalışmaz
+                if future.cancel():
+                    self._pending -= 1
+            raise VerifierBusyError('Password verification timed out')
+        finally:
+            # İstek thread'inin beklediği süre (kuyruk + hash)
+            add_time('bcrypt', time.perf_counter() - started)
+
+    def hash_async(self, password, callback, rounds=None):
+        """Arka planda yeni hash üretip callback(hash) çağırır; kapasite yoksa atlanır"""
+        rounds = rounds or Config.BCRYPT_LOG_ROUNDS
+        return self.try_submit(lambda: callback(_hash_one(password, rounds)))
+
+    def stats(self):
+        with self._lock:
+            completed = self._completed
+            return {
+                'workers': self.workers,
+                'max_queue': self.max_queue,
+                'running': self._running,
+                'queued': self._pending - self._running,
+                'completed': completed,
+                'rejected': self._rejected,
+                'timeouts': self._timeouts,
+                'wait_time_total': round(self._wait_time_total, 4),
+                'wait_time_max': round(self._wait_time_max, 4),
+                'wait_time_avg': round(self._wait_time_total / completed, 4) if completed else 0.0,
+                'hash_time_total': round(self._hash_time_total, 4),
+                'hash_time_max': round(self._hash_time_max, 4),
+                'hash_time_avg': round(self._hash_time_total / completed, 4) if completed else 0.0,
+                'rounds': Config.BCRYPT_LOG_ROUNDS,
+            }
+
+
+password_verifier = PasswordVerifier(
+    workers=Config.LOGIN_HASH_WORKERS,
+    max_queue=Config.LOGIN_HASH_QUEUE,
+    timeout=Config.LOGIN_HASH_TIMEOUT
+)
@@ -0,0 +1,100 @@
+"""
+Etkin yetki önbelleği
+
+Kullanıcı başına derlenmiş etkin yetkileri (doğrudan + rol üzerinden gelen,
+bkz. ``rbac.UserPermissions``) bellekte tutar. Girdiler TTL ile eskir, boyut
+sınırı aşıldığında en az kullanılan girdi (LRU) atılır. Yetki/rol değiştiren her yol ilgili kullanıcıyı
+``invalidate`` ile hemen düşürmelidir.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from config import Config
+
+
+def _key(user_id):
+    try:
+        return int(user_id)
+    except (TypeError, ValueError):
+        return user_id
+
+
+class PermissionCache:
+    """TTL + LRU tahliyeli, thread-safe kullanıcı yetki önbelleği"""
+
+    def __init__(self, maxsize=1024, ttl=60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        # Her invalidate'te artar; yükleme sırasında geçersiz kılınan
+        # girdilerin eski veriyle geri yazılmasını engeller
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def generation(self):
+        with self._lock:
+            return self._generation
+
+    def get(self, user_id):
+        """Geçerli girdiyi ya da None döndürür"""
+        key = _key(user_id)
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, user_id, value, generation=None):
+        """Girdiyi kaydeder; yükleme sırasında invalidate olduysa yazmaz"""
+        if self.maxsize <= 0:
+            return
+        key = _key(user_id)
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, *user_ids):
+        """Verilen kullanıcıların girdilerini düşürür"""
+        with self._lock:
+            self._generation += 1
+            for user_id in user_ids:
+                self._data.pop(_key(user_id), None)
+
+    def invalidate_all(self):
+        """Tüm önbelleği temizler (ör. rol yetkileri değiştiğinde)"""
+        with self._lock:
+            self._generation += 1
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'max_size': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+permission_cache = PermissionCache(
+    maxsize=Config.PERMISSION_CACHE_SIZE,
+    ttl=Config.PERMISSION_CACHE_TTL
+)
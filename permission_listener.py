@@ -0,0 +1,152 @@
+"""
+Yetki değişikliği dinleyicisi
+
+``user_permissions``, ``user_roles`` ve ``role_permissions`` tablolarındaki
+trigger'lar ``permission_changes`` kanalına NOTIFY gönderir (bkz.
+``migrations``, sürüm 4). Her worker süreci
+bu kanalı arka plandaki bir thread ile dinler ve etkilenen kullanıcıları
+yerel yetki önbelleğinden düşürür; rol ya da katalog değişikliklerinde RBAC
+motorundaki ilgili maskeleri yeniden hesaplar. Böylece başka bir süreçte ya
+da sunucuda yapılan yetki değişiklikleri TTL'i beklemeden görünür olur.
+"""
+import json
+import logging
+import os
+import select
+import threading
+
+import psycopg2
+import psycopg2.extensions
+
+from config import Config
+from db_pool import db_connection
+from rbac import rbac_engine
+
+CHANNEL = 'permission_changes'
+
+logger = logging.getLogger(__name__)
+
+
+class PermissionChangeListener(threading.Thread):
+    """LISTEN bağlantısını açık tutan ve bildirimleri işleyen daemon thread"""
+
+    def __init__(self, engine, poll_timeout=5.0, reconnect_delay=1.0, max_reconnect_delay=30.0):
+        super().__init__(name='permission-listener', daemon=True)
+        self.engine = engine
+        self.cache = engine.cache
+        self.poll_timeout = poll_timeout
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self._stop_event = threading.Event()
+        self._conn = None
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _connect(self):
+        # LISTEN kalıcı bir oturum gerektirir; havuz dışı, autocommit bağlantı
+        conn = psycopg2.connect(connect_timeout=5, **Config.get_db_config())
+        conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        with conn.cursor() as cur:
+            cur.execute(f"LISTEN {CHANNEL}")
+        return conn
+
+    def run(self):
+        delay = self.reconnect_delay
+        while not self._stop_event.is_set():
+            try:
+                self._conn = self._connect()
+                # Bağlantı yokken kaçırılmış olabilecek bildirimler için
+                self.engine.reset()
+                delay = self.reconnect_delay
+                logger.info("Permission listener connected (pid=%s)", os.getpid())
+                self._listen()
+            except Exception as e:
+                logger.warning("Permission listener error, reconnecting in %.1fs: %s", delay, e)
+                self._stop_event.wait(delay)
+                delay = min(delay * 2, self.max_reconnect_delay)
+            finally:
+                if self._conn is not None:
+                    try:
+                        self._conn.close()
+                    except Exception:
+                        pass
+                    self._conn = None
+
+    def _listen(self):
+        conn = self._conn
+        while not self._stop_event.is_set():
+            ready, _, _ = select.select([conn], [], [], self.poll_timeout)
+            if not ready:
+                continue
+            conn.poll()
+            while conn.notifies:
+                notify = conn.notifies.pop(0)
+                self.handle_payload(notify.payload)
+
+    def handle_payload(self, payload):
+        """Tek bir NOTIFY yükünü işler"""
+        try:
+            data = json.loads(payload)
+        except (TypeError, ValueError):
+            logger.warning("Invalid permission notification payload: %r", payload)
+            self.engine.reset()
+            return
+
+        if data.get('table') == 'permissions':
+            # Katalog değişti; bit pozisyonları kayabilir
+            self.engine.reset()
+            return
+
+        user_ids = [uid for uid in (data.get('user_id'), data.get('old_user_id')) if uid is not None]
+        if user_ids:
+            self.cache.invalidate(*user_ids)
+
+        role_ids = [rid for rid in (data.get('role_id'), data.get('old_role_id')) if rid is not None]
+        if data.get('table') == 'role_permissions' and role_ids:
+            try:
+                for role_id in role_ids:
+                    self.engine.refresh_role(role_id)
+                self.cache.invalidate(*self._users_with_roles(role_ids))
+            except Exception as e:
+                logger.warning("Role refresh failed, resetting permission engine: %s", e)
+                self.engine.reset()
+
+    def _users_with_roles(self, role_ids):
+        with db_connection() as conn, conn.cursor() as cur:
+            cur.execute(
+                "SELECT DISTINCT user_id FROM user_roles WHERE role_id = ANY(%s)",
+                (list(role_ids),)
+            )
+            return [row[0] for row in cur.fetchall()]
+
+
+_listener = None
+_listener_pid = None
+_listener_lock = threading.Lock()
+
+
+def start_permission_listener():
+    """Bu süreç için dinleyici thread'i başlatır (zaten çalışıyorsa bir şey yapmaz)
+
+    Fork sonrası ebeveynin thread'i çocuğa geçmediğinden PID kontrol edilir.
+    """
+    global _listener, _listener_pid
+    pid = os.getpid()
+    if _listener is not None and _listener_pid == pid and _listener.is_alive():
+        return _listener
+    with _listener_lock:
+        if _listener is None or _listener_pid != pid or not _listener.is_alive():
+            _listener = PermissionChangeListener(rbac_engine)
+            _listener_pid = pid
+            _listener.start()
+    return _listener
+
+
+def stop_permission_listener():
+    global _listener, _listener_pid
+    with _listener_lock:
+        if _listener is not None and _listener_pid == os.getpid():
+            _listener.stop()
+        _listener = None
+        _listener_pid = None
@@ -0,0 +1,161 @@
+"""
+Proje maliyet özetleri
+
+``project_cost_summary`` tablosu proje başına malzeme/işçilik/ekipman
+toplamlarını ve satır sayılarını tutar; satır tablolarındaki ifade düzeyi
+trigger'lar her INSERT/UPDATE/DELETE/COPY'de yalnızca farkı uygular (bkz.
+``migrations``, sürüm 5). Proje toplamı okumak tek bir birincil anahtar
+aramasıdır; satır tabloları taranmaz.
+
+Trigger'ları atlayan işlemlerden (TRUNCATE, elle düzeltmeler) sonra özet
+yeniden hesaplanabilir ya da doğrulanabilir:
+
+    python project_costs.py verify
+    python project_costs.py rebuild [--project 42 ...]
+"""
+import argparse
+import sys
+import time
+
+import psycopg2.extras
+
+from db_pool import db_connection
+
+SUMMARY_COLUMNS = ('materials_total', 'labor_total', 'equipment_total',
+                   'material_lines', 'labor_lines', 'equipment_lines')
+
+# Satır tablolarından gerçek toplamlar ({where} proje filtresi için)
+ACTUAL_COSTS_SQL = """
+    SELECT p.id AS project_id,
+           COALESCE(m.total, 0) AS materials_total,
+           COALESCE(l.total, 0) AS labor_total,
+           COALESCE(e.total, 0) AS equipment_total,
+           COALESCE(m.lines, 0) AS material_lines,
+           COALESCE(l.lines, 0) AS labor_lines,
+           COALESCE(e.lines, 0) AS equipment_lines
+    FROM projects p
+    LEFT JOIN (SELECT project_id, SUM(total_price) AS total, COUNT(*) AS lines
+               FROM project_materials GROUP BY project_id) m ON m.project_id = p.id
+    LEFT JOIN (SELECT project_id, SUM(total_cost) AS total, COUNT(*) AS lines
+               FROM project_labor GROUP BY project_id) l ON l.project_id = p.id
+    LEFT JOIN (SELECT project_id, SUM(total_cost) AS total, COUNT(*) AS lines
+               FROM project_equipment GROUP BY project_id) e ON e.project_id = p.id
+    {where}
+"""
+
+
+def _project_filter(project_ids):
+    if project_ids is None:
+        return '', ()
+    return 'WHERE p.id = ANY(%s)', (list(project_ids),)
+
+
+def serialize_costs(row):
+    """Özet satırını JSON'a uygun sözlüğe çevirir"""
+    budget = row['budget']
+    grand_total = row['grand_total']
+    return {
+        'project_id': row['project_id'],
+        'name': row['name'],
+        'materials_total': float(row['materials_total']),
+        'labor_total': float(row['labor_total']),
+        'equipment_total': float(row['equipment_total']),
+        'grand_total': float(grand_total),
+        'material_lines': row['material_lines'],
+        'labor_lines': row['labor_lines'],
+        'equipment_lines': row['equipment_lines'],
+        'budget': float(budget) if budget is not None else None,
+        # Pozitif değer bütçe altında kalındığını gösterir
+        'budget_variance': float(budget - grand_total) if budget is not None else None,
+        'budget_used_pct': (round(float(grand_total / budget * 100), 2)
+                            if budget else None),
+    }
+
+
+def get_project_costs(project_ids):
+    """Verilen projelerin maliyet özetlerini {project_id: dict} olarak döndürür"""
+    with db_connection() as conn, conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+        # Özeti henüz olmayan (satırsız) projeler sıfır toplamla döner
+        cur.execute("""
+            SELECT p.id AS project_id, p.name, p.budget,
+                   COALESCE(s.materials_total, 0) AS materials_total,
+                   COALESCE(s.labor_total, 0) AS labor_total,
+                   COALESCE(s.equipment_total, 0) AS equipment_total,
+                   COALESCE(s.grand_total, 0) AS grand_total,
+                   COALESCE(s.material_lines, 0) AS material_lines,
+                   COALESCE(s.labor_lines, 0) AS labor_lines,
+                   COALESCE(s.equipment_lines, 0) AS equipment_lines
+            FROM projects p
+            LEFT JOIN project_cost_summary s ON s.project_id = p.id
+            WHERE p.id = ANY(%s)
+        """, (list(project_ids),))
+        rows = cur.fetchall()
+    return {row['project_id']: serialize_costs(row) for row in rows}
+
+
+def rebuild(project_ids=None):
+    """Özeti satır tablolarından yeniden hesaplar; güncellenen proje sayısını döndürür
+
+    Yeniden hesaplama sırasında eşzamanlı bir farkın kaybolmaması için satır
+    tablolarına yazma kısa süreliğine engellenir (SHARE kilidi).
+    """
+    where, params = _project_filter(project_ids)
+    with db_connection() as conn, conn.cursor() as cur:
+        try:
+            cur.execute("LOCK TABLE project_materials, project_labor, project_equipment IN SHARE MODE")
+            cur.execute(f"""
+                INSERT INTO project_cost_summary AS s (project_id, {', '.join(SUMMARY_COLUMNS)})
+                {ACTUAL_COSTS_SQL.format(where=where)}
+                ON CONFLICT (project_id) DO UPDATE SET
+                    {', '.join(f'{column} = EXCLUDED.{column}' for column in SUMMARY_COLUMNS)},
+                    updated_at = CURRENT_TIMESTAMP
+            """, params)
+            updated = cur.rowcount
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    return updated
+
+
+def verify(project_ids=None):
+    """Özeti gerçek toplamlarla karşılaştırır; farklı olan projelerin listesini döndürür"""
+    where, params = _project_filter(project_ids)
+    mismatch = ' OR '.join(f'a.{column} IS DISTINCT FROM COALESCE(s.{column}, 0)'
+                           for column in SUMMARY_COLUMNS)
+    with db_connection() as conn, conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+        cur.execute(f"""
+            SELECT a.project_id,
+                   {', '.join(f'a.{column} AS actual_{column}, s.{column} AS summary_{column}'
+                              for column in SUMMARY_COLUMNS)}
+            FROM ({ACTUAL_COSTS_SQL.format(where=where)}) a
+            LEFT JOIN project_cost_summary s ON s.project_id = a.project_id
+            WHERE {mismatch}
+            ORDER BY a.project_id
+        """, params)
+        rows = cur.fetchall()
+        conn.rollback()
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Proje maliyet ozetini dogrular ya da yeniden hesaplar')
+    parser.add_argument('command', choices=('verify', 'rebuild'))
+    parser.add_argument('--project', type=int, action='append', help='Yalnizca bu proje(ler)')
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    if args.command == 'rebuild':
+        updated = rebuild(args.project)
+        print(f"{updated} proje ozeti yeniden hesaplandi ({time.perf_counter() - started:.2f} sn)")
+        return 0
+
+    mismatches = verify(args.project)
+    for row in mismatches[:50]:
+        print(dict(row))
+    print(f"{len(mismatches)} uyumsuz proje ({time.perf_counter() - started:.2f} sn)")
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,108 @@
+"""
+İstek bazında sorgu profilleyici (N+1 tespiti)
+
+``QUERY_PROFILER_ENABLED`` açıkken ``metrics.InstrumentedConnection``
+imleçleri her ifadeyi buraya da bildirir. İstek boyunca ifadeler normalize
+edilmiş metinlerine göre gruplanır (sayı, toplam süre, satır sayısı). Aynı
+ifade eşik değerinden fazla tekrarlandığında N+1 olarak işaretlenir; istek
+sonunda özet yanıt başlıklarına ve log kaydına yazılır.
+
+Template'lerde ``has_permission`` gibi fonksiyonların döngü içinde her satır
+için sorgu atması bu şekilde üretime gitmeden yakalanır.
+"""
+import logging
+import re
+import threading
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+
+# Normalize edilmiş metin önbelleği (parametreli sorgularda metin sayısı sınırlı)
+_normalized = {}
+_NORMALIZED_MAX = 2048
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST_RE = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_SPACE_RE = re.compile(r'\s+')
+
+
+def normalize(query):
+    """Sabitleri ``?`` ile değiştirip boşlukları tekleştirir"""
+    if isinstance(query, bytes):
+        query = query.decode('utf-8', 'replace')
+    elif not isinstance(query, str):
+        # psycopg2.sql.Composed vb.
+        query = str(query)
+    cached = _normalized.get(query)
+    if cached is not None:
+        return cached
+    text = _STRING_RE.sub('?', query)
+    text = _NUMBER_RE.sub('?', text)
+    text = text.replace('%s', '?')
+    text = _IN_LIST_RE.sub('(?)', text)
+    text = _SPACE_RE.sub(' ', text).strip()
+    if len(_normalized) >= _NORMALIZED_MAX:
+        _normalized.clear()
+    _normalized[query] = text
+    return text
+
+
+def begin():
+    """Bu thread için yeni bir profil başlatır"""
+    # normalize edilmiş metin -> [sayı, toplam süre, toplam satır]
+    _local.statements = {}
+
+
+def active():
+    return getattr(_local, 'statements', None) is not None
+
+
+def record(query, elapsed, rowcount):
+    statements = getattr(_local, 'statements', None)
+    if statements is None:
+        return
+    key = normalize(query)
+    entry = statements.get(key)
+    if entry is None:
+        statements[key] = [1, elapsed, max(rowcount, 0)]
+    else:
+        entry[0] += 1
+        entry[1] += elapsed
+        entry[2] += max(rowcount, 0)
+
+
+def finish(threshold):
+    """Profili kapatır ve özet döndürür (profil yoksa None)"""
+    statements = getattr(_local, 'statements', None)
+    if statements is None:
+        return None
+    _local.statements = None
+    suspects = sorted(
+        ({'statement': text, 'count': count, 'time_ms': round(total * 1000, 3), 'rows': rows}
+         for text, (count, total, rows) in statements.items() if count >= threshold),
+        key=lambda item: item['count'], reverse=True
+    )
+    return {
+        'queries': sum(entry[0] for entry in statements.values()),
+        'distinct': len(statements),
+        'time_ms': round(sum(entry[1] for entry in statements.values()) * 1000, 3),
+        'rows': sum(entry[2] for entry in statements.values()),
+        'n_plus_one': suspects,
+    }
+
+
+def report(summary, route, response, threshold):
+    """Özeti yanıt başlıklarına ve log kaydına yazar"""
+    response.headers['X-Query-Count'] = str(summary['queries'])
+    response.headers['X-Query-Time-Ms'] = str(summary['time_ms'])
+    if summary['n_plus_one']:
+        response.headers['X-Query-N-Plus-One'] = str(len(summary['n_plus_one']))
+        top = summary['n_plus_one'][0]
+        logger.warning("Possible N+1 on %s: %d statements repeated >= %d times (top: %dx %s)",
+                       route, len(summary['n_plus_one']), threshold, top['count'], top['statement'],
+                       extra={'query_profile': summary})
+    else:
+        logger.debug("Query profile for %s: %d queries, %.3f ms", route,
+                     summary['queries'], summary['time_ms'], extra={'query_profile': summary})
@@ -0,0 +1,216 @@
+"""
+Bitset tabanlı RBAC motoru
+
+``permissions`` tablosundaki her satıra (id sırasına göre) bir bit pozisyonu
+verilir; her rol için bir tamsayı maske önceden hesaplanır. Kullanıcının
+maskesi doğrudan yetkilerinin maskesi ile rollerinin maskelerinin OR'udur.
+Böylece ``has_permission`` tek bir sözlük araması ve bitwise AND'e iner.
+
+- Kullanıcı yetkisi/rolü değiştiğinde yalnızca o kullanıcının maskesi
+  önbellekten düşürülür ve bir sonraki kontrolde tek sorguyla yeniden kurulur.
+- Rol yetkileri değiştiğinde yalnızca o rolün maskesi yeniden hesaplanır.
+- Yetki kataloğu değiştiğinde (bit pozisyonları kayabileceği için) katalog
+  yeniden yüklenir ve tüm kullanıcı maskeleri düşürülür.
+- Bildirim kaçırılsa ya da dinleyici kapalı olsa bile katalog ve rol maskeleri
+  ``PERMISSION_CACHE_TTL`` saniyeden eskiyse yeniden yüklenir.
+"""
+import hashlib
+import logging
+import threading
+import time
+
+from config import Config
+from db_pool import db_connection
+from permission_cache import permission_cache
+
+logger = logging.getLogger(__name__)
+
+
+class PermissionCatalog:
+    """Değişmez yetki kataloğu: ad <-> bit eşlemesi ve rol maskeleri"""
+
+    __slots__ = ('names', 'modules', 'ids', 'bit_by_name', 'bit_by_id', 'role_masks', 'full_mask', 'version')
+
+    def __init__(self, rows, role_masks):
+        # rows: (id, name, module[, description]) - id sırasına göre
+        self.names = tuple(row[1] for row in rows)
+        self.modules = tuple(row[2] for row in rows)
+        self.ids = tuple(row[0] for row in rows)
+        self.bit_by_name = {name: 1 << i for i, name in enumerate(self.names)}
+        self.bit_by_id = {perm_id: 1 << i for i, perm_id in enumerate(self.ids)}
+        self.role_masks = dict(role_masks)
+        self.full_mask = (1 << len(self.names)) - 1
+        # İçerik tabanlı sürüm: katalog aynıysa tüm süreçlerde aynı değer (ETag'ler için)
+        self.version = hashlib.sha1(repr(tuple(tuple(row) for row in rows)).encode('utf-8')).hexdigest()[:16]
+
+    def mask_of_ids(self, permission_ids):
+        mask = 0
+        for perm_id in permission_ids:
+            mask |= self.bit_by_id.get(perm_id, 0)
+        return mask
+
+    def mask_of(self, names):
+        mask = 0
+        for name in names:
+            mask |= self.bit_by_name.get(name, 0)
+        return mask
+
+    def with_role_mask(self, role_id, mask):
+        """Tek rol maskesi güncellenmiş yeni bir katalog döndürür"""
+        catalog = PermissionCatalog.__new__(PermissionCatalog)
+        for attr in PermissionCatalog.__slots__:
+            setattr(catalog, attr, getattr(self, attr))
+        catalog.role_masks = dict(self.role_masks)
+        if mask is None:
+            catalog.role_masks.pop(role_id, None)
+        else:
+            catalog.role_masks[role_id] = mask
+        return catalog
+
+
+class UserPermissions:
+    """Bir kullanıcının derlenmiş yetki maskesi (kendi kataloğuna bağlı)"""
+
+    __slots__ = ('catalog', 'mask')
+
+    def __init__(self, catalog, mask):
+        self.catalog = catalog
+        self.mask = mask
+
+    def has(self, permission_name):
+        return bool(self.mask & self.catalog.bit_by_name.get(permission_name, 0))
+
+    def has_all(self, names):
+        required = self.catalog.mask_of(names)
+        return bool(required) and self.mask & required == required
+
+    def names(self):
+        return frozenset(name for name, _ in self.items())
+
+    def items(self):
+        """(ad, modül) çiftlerini bit sırasıyla döndürür"""
+        catalog = self.catalog
+        return [(catalog.names[i], catalog.modules[i])
+                for i in range(len(catalog.names)) if self.mask >> i & 1]
+
+
+# Katalog yüklenemediğinde kullanılan boş yetki kümesi
+NO_PERMISSIONS = UserPermissions(PermissionCatalog((), {}), 0)
+
+
+class RBACEngine:
+    """Katalog ve rol maskelerini yöneten, kullanıcı maskelerini önbellekleyen motor"""
+
+    def __init__(self, cache):
+        self.cache = cache
+        self._catalog = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def catalog(self):
+        catalog = self._catalog
+        if catalog is None:
+            with self._lock:
+                if self._catalog is None:
+                    self._catalog = self._load_catalog()
+                    self._loaded_at = time.monotonic()
+                catalog = self._catalog
+        elif time.monotonic() - self._loaded_at > Config.PERMISSION_CACHE_TTL:
+            self._refresh_expired()
+            catalog = self._catalog or catalog
+        return catalog
+
+    def _refresh_expired(self):
+        """Süresi dolan kataloğu yeniden yükler; yükleme sırasında diğer thread'ler eskisini kullanır"""
+        with self._lock:
+            if time.monotonic() - self._loaded_at <= Config.PERMISSION_CACHE_TTL:
+                return
+            # Tek thread yükler; hata olursa bir TTL boyunca eski katalog kullanılır
+            self._loaded_at = time.monotonic()
+            previous = self._catalog
+        try:
+            catalog = self._load_catalog()
+        except Exception:
+            logger.exception("Permission catalog reload failed, keeping previous catalog")
+            return
+        with self._lock:
+            if self._catalog is not previous:
+                # Bu arada reload/reset/refresh_role çalıştı; onların sonucu daha yeni
+                return
+            self._catalog = catalog
+        if previous is None or catalog.version != previous.version or catalog.role_masks != previous.role_masks:
+            self.cache.invalidate_all()
+
+    def _load_catalog(self):
+        with db_connection() as conn, conn.cursor() as cursor:
+            cursor.execute("SELECT id, name, module, description FROM permissions ORDER BY id")
+            rows = cursor.fetchall()
+            cursor.execute("SELECT role_id, permission_id FROM role_permissions")
+            role_rows = cursor.fetchall()
+
+        catalog = PermissionCatalog(rows, {})
+        role_masks = {}
+        for role_id, perm_id in role_rows:
+            role_masks[role_id] = role_masks.get(role_id, 0) | catalog.bit_by_id.get(perm_id, 0)
+        catalog.role_masks = role_masks
+        return catalog
+
+    def reload(self):
+        """Kataloğu ve tüm rol maskelerini yeniden yükler"""
+        catalog = self._load_catalog()
+        with self._lock:
+            self._catalog = catalog
+            self._loaded_at = time.monotonic()
+        # Bit pozisyonları değişmiş olabilir
+        self.cache.invalidate_all()
+
+    def reset(self):
+        """Kataloğu düşürür; bir sonraki kontrolde yeniden yüklenir"""
+        with self._lock:
+            self._catalog = None
+        self.cache.invalidate_all()
+
+    def refresh_role(self, role_id):
+        """Tek bir rolün maskesini yeniden hesaplar"""
+        with db_connection() as conn, conn.cursor() as cursor:
+            cursor.execute("SELECT permission_id FROM role_permissions WHERE role_id = %s", (role_id,))
+            perm_ids = [row[0] for row in cursor.fetchall()]
+        with self._lock:
+            if self._catalog is None:
+                return
+            mask = self._catalog.mask_of_ids(perm_ids) if perm_ids else None
+            self._catalog = self._catalog.with_role_mask(role_id, mask)
+
+    def for_user(self, user_id):
+        """Kullanıcının derlenmiş yetkilerini döndürür (önbellekli)"""
+        cached = self.cache.get(user_id)
+        if cached is not None:
+            return cached
+
+        generation = self.cache.generation()
+        catalog = self.catalog
+        with db_connection() as conn, conn.cursor() as cursor:
+            cursor.execute("""
+                SELECT 'p', permission_id FROM user_permissions WHERE user_id = %s
+                UNION ALL
+                SELECT 'r', role_id FROM user_roles WHERE user_id = %s
+            """, (user_id, user_id))
+            rows = cursor.fetchall()
+
+        mask = 0
+        for kind, ref_id in rows:
+            if kind == 'p':
+                mask |= catalog.bit_by_id.get(ref_id, 0)
+            else:
+                mask |= catalog.role_masks.get(ref_id, 0)
+
+        compiled = UserPermissions(catalog, mask)
+        self.cache.set(user_id, compiled, generation)
+        return compiled
+
+    def has_permission(self, user_id, permission_name):
+        return self.for_user(user_id).has(permission_name)
+
+
+rbac_engine = RBACEngine(permission_cache)
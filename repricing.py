@@ -0,0 +1,330 @@
+"""
+Katalog fiyat değişikliklerinin proje satırlarına yansıtılması
+
+Proje satırlarındaki fiyatlar (``project_materials.unit_price``,
+``project_labor.hourly_rate``, ``project_equipment.daily_rate``) katalogdan
+kopyalanmış anlık değerlerdir. Bu iş bir fiyat değişikliği kümesini önce
+katalog tablolarına uygular, değişen kalemleri geçici bir tabloya yazar, sonra
+açık projelerdeki satırları id sırasıyla parçalar halinde, her parça tek bir
+küme tabanlı UPDATE ve kendi işlemiyle günceller. Böylece satır kilitleri
+parça süresinden uzun tutulmaz. Proje başına maliyet etkisi aynı ifadede
+toplanır; ``project_cost_summary`` trigger'larla güncel kalır.
+
+Değişiklik biçimi (sırayla, bileşik uygulanır)::
+
+    [{"kind": "materials", "category": "Çimento", "pct": 12},
+     {"kind": "equipment", "supplier": "Vinç A.Ş.", "pct": -5},
+     {"kind": "labor", "item_id": 3, "price": 95.00}]
+
+Katalog güncellemesi satırlardan önce commit edilir. Satır aşamasında hata
+olursa (``RepriceFailed.phase == 'lines'``) iş aynı değişikliklerle yeniden
+çalıştırılmamalıdır: yüzde değişiklikleri katalogda ikinci kez uygulanır.
+Bunun yerine ``resync`` ile aynı kalemlerin açık satırları katalogdaki güncel
+fiyata çekilir; katalog değişmez.
+
+    python repricing.py changes.json
+    python repricing.py changes.json --resync   # yarım kalan işi tamamla
+"""
+import argparse
+import json
+import logging
+import sys
+import time
+
+import psycopg2
+import psycopg2.errors
+import psycopg2.extras
+
+from config import Config
+from db_pool import db_connection
+
+logger = logging.getLogger(__name__)
+
+# tür -> (katalog tablosu, fiyat sütunu, satır tablosu, kalem sütunu, miktar sütunu, eşleşme sütunları)
+KINDS = {
+    'materials': ('materials', 'unit_price', 'project_materials', 'material_id', 'quantity',
+                  ('category', 'supplier')),
+    'labor': ('labor', 'hourly_rate', 'project_labor', 'labor_id', 'hours', ('category',)),
+    'equipment': ('equipment', 'daily_rate', 'project_equipment', 'equipment_id', 'days',
+                  ('category', 'supplier')),
+}
+
+# Satırları artık güncellenmeyen proje durumları
+CLOSED_PROJECT_STATUSES = ['completed', 'cancelled', 'closed']
+
+# Kilit beklerken zaman aşımına uğrayan bir parçanın yeniden deneme sayısı
+CHUNK_RETRIES = 3
+
+
+class RepriceError(ValueError):
+    """Geçersiz fiyat değişikliği tanımı"""
+
+
+class RepriceFailed(RuntimeError):
+    """İş bir aşamada veritabanı hatasıyla yarıda kaldı"""
+
+    def __init__(self, phase, cause):
+        self.phase = phase
+        # Satır aşamasında katalog zaten commit edilmiştir
+        self.catalog_committed = phase == 'lines'
+        hint = "; run again with resync to finish the open lines" if self.catalog_committed else ""
+        super().__init__(f"Reprice failed during {phase} phase: {cause}{hint}")
+
+
+def validate_changes(changes):
+    """Değişiklik listesini doğrular ve normalleştirir"""
+    if not isinstance(changes, list) or not changes:
+        raise RepriceError("At least one price change is required")
+    normalized = []
+    for index, change in enumerate(changes, 1):
+        if not isinstance(change, dict) or change.get('kind') not in KINDS:
+            raise RepriceError(f"Change {index}: kind must be one of {', '.join(KINDS)}")
+        match_columns = KINDS[change['kind']][5]
+        selectors = [key for key in ('item_id',) + match_columns if change.get(key) is not None]
+        if len(selectors) != 1:
+            raise RepriceError(f"Change {index}: exactly one of item_id, {', '.join(match_columns)} is required")
+        if ('pct' in change) == ('price' in change):
+            raise RepriceError(f"Change {index}: exactly one of pct or price is required")
+        try:
+            value = float(change['pct'] if 'pct' in change else change['price'])
+        except (TypeError, ValueError):
+            raise RepriceError(f"Change {index}: invalid amount")
+        if ('pct' in change and value <= -100) or ('price' in change and value < 0):
+            raise RepriceError(f"Change {index}: resulting price must not be negative")
+        selector = selectors[0]
+        normalized.append({
+            'kind': change['kind'],
+            'selector': selector,
+            'match': int(change[selector]) if selector == 'item_id' else str(change[selector]),
+            'mode': 'pct' if 'pct' in change else 'price',
+            'value': value,
+        })
+    return normalized
+
+
+def _apply_catalog_changes(cur, changes):
+    """Katalog fiyatlarını günceller, değişen kalemleri reprice_items'a yazar"""
+    for change in changes:
+        catalog, price_column = KINDS[change['kind']][:2]
+        match_column = 'id' if change['selector'] == 'item_id' else change['selector']
+        if change['mode'] == 'pct':
+            new_price = f"ROUND(c.{price_column} * (1 + %(value)s::numeric / 100), 2)"
+        else:
+            new_price = "%(value)s::numeric"
+        # FROM'daki öz-birleşim UPDATE öncesi fiyatı verir; ilk değişikliğin eski fiyatı korunur
+        cur.execute(f"""
+            WITH updated AS (
+                UPDATE {catalog} c
+                SET {price_column} = {new_price}, updated_at = CURRENT_TIMESTAMP
+                FROM {catalog} old
+                WHERE old.id = c.id AND c.{match_column} = %(match)s
+                RETURNING c.id, old.{price_column} AS old_price, c.{price_column} AS new_price
+            )
+            INSERT INTO reprice_items (kind, item_id, old_price, new_price)
+            SELECT %(kind)s, id, old_price, new_price FROM updated
+            ON CONFLICT (kind, item_id) DO UPDATE SET new_price = EXCLUDED.new_price
+        """, {'value': change['value'], 'match': change['match'], 'kind': change['kind']})
+        change['items'] = cur.rowcount
+
+
+def _select_catalog_items(cur, changes):
+    """Katalogu değiştirmeden eşleşen kalemleri güncel fiyatlarıyla reprice_items'a yazar"""
+    for change in changes:
+        catalog, price_column = KINDS[change['kind']][:2]
+        match_column = 'id' if change['selector'] == 'item_id' else change['selector']
+        cur.execute(f"""
+            INSERT INTO reprice_items (kind, item_id, old_price, new_price)
+            SELECT %(kind)s, id, {price_column}, {price_column} FROM {catalog}
+            WHERE {match_column} = %(match)s
+            ON CONFLICT (kind, item_id) DO NOTHING
+        """, {'match': change['match'], 'kind': change['kind']})
+        change['items'] = cur.rowcount
+
+
+def _reprice_chunk(cur, kind, after_id, chunk_size):
+    """Bir parça satırı günceller; (son id, güncellenen satır) döndürür"""
+    # Satır tablosundaki fiyat sütunu katalogdakiyle aynı adı taşır
+    _, price_column, line_table, item_column, quantity_column, _ = KINDS[kind]
+    cur.execute(f"""
+        WITH batch AS (
+            SELECT l.id, l.{price_column} AS old_price, r.new_price
+            FROM {line_table} l
+            JOIN reprice_items r ON r.kind = %(kind)s AND r.item_id = l.{item_column}
+            JOIN projects p ON p.id = l.project_id
+            WHERE l.id > %(after_id)s
+              AND COALESCE(p.status, 'active') <> ALL(%(closed)s)
+              AND l.{price_column} IS DISTINCT FROM r.new_price
+            ORDER BY l.id
+            LIMIT %(chunk_size)s
+            FOR UPDATE OF l
+        ), updated AS (
+            UPDATE {line_table} l
+            SET {price_column} = b.new_price
+            FROM batch b
+            WHERE l.id = b.id
+            RETURNING l.id, l.project_id, l.{quantity_column} * (b.new_price - b.old_price) AS delta
+        ), impact AS (
+            INSERT INTO reprice_impact (project_id, kind, lines, delta)
+            SELECT project_id, %(kind)s, COUNT(*), SUM(delta) FROM updated GROUP BY project_id
+            ON CONFLICT (project_id, kind) DO UPDATE SET
+                lines = reprice_impact.lines + EXCLUDED.lines,
+                delta = reprice_impact.delta + EXCLUDED.delta
+        )
+        SELECT MAX(id), COUNT(*) FROM updated
+    """, {'kind': kind, 'after_id': after_id, 'closed': CLOSED_PROJECT_STATUSES, 'chunk_size': chunk_size})
+    last_id, count = cur.fetchone()
+    return last_id, count
+
+
+def _reprice_lines(conn, kind, chunk_size, lock_timeout_ms):
+    """Bir türün satırlarını parça parça günceller; (satır, parça) döndürür"""
+    after_id = 0
+    total = chunks = 0
+    retries = 0
+    while True:
+        with conn.cursor() as cur:
+            try:
+                cur.execute("SET LOCAL lock_timeout = %s", (f'{lock_timeout_ms}ms',))
+                last_id, count = _reprice_chunk(cur, kind, after_id, chunk_size)
+                conn.commit()
+            except psycopg2.errors.LockNotAvailable:
+                conn.rollback()
+                retries += 1
+                if retries > CHUNK_RETRIES:
+                    raise
+                logger.warning("Reprice %s chunk after id %s waited for locks, retrying (%d)",
+                               kind, after_id, retries)
+                continue
+        retries = 0
+        if not count:
+            return total, chunks
+        total += count
+        chunks += 1
+        after_id = last_id
+
+
+def reprice(changes, chunk_size=None, lock_timeout_ms=None, resync=False):
+    """Fiyat değişikliklerini uygular ve proje başına etki raporu döndürür
+
+    ``resync=True`` katalogu değiştirmez; değişikliklerin seçtiği kalemlerin
+    açık satırlarını güncel katalog fiyatına çeker (yarım kalan işi tamamlar).
+    Veritabanı hatasında hangi aşamada kalındığını taşıyan ``RepriceFailed``
+    yükseltilir.
+    """
+    changes = validate_changes(changes)
+    chunk_size = chunk_size or Config.REPRICE_CHUNK_SIZE
+    lock_timeout_ms = lock_timeout_ms or Config.REPRICE_LOCK_TIMEOUT_MS
+    started = time.perf_counter()
+    phase = 'catalog'
+    with db_connection() as conn:
+        try:
+            with conn.cursor() as cur:
+                # Parçalar arasındaki commit'lerde korunur, işin sonunda silinir
+                cur.execute("""
+                    CREATE TEMP TABLE reprice_items (
+                        kind TEXT, item_id INTEGER, old_price DECIMAL(10,2), new_price DECIMAL(10,2),
+                        PRIMARY KEY (kind, item_id)
+                    )
+                """)
+                cur.execute("""
+                    CREATE TEMP TABLE reprice_impact (
+                        project_id INTEGER, kind TEXT, lines INTEGER, delta DECIMAL(18,2),
+                        PRIMARY KEY (project_id, kind)
+                    )
+                """)
+                # Katalog güncellemesi küçük ve tek işlemde
+                if resync:
+                    _select_catalog_items(cur, changes)
+                else:
+                    _apply_catalog_changes(cur, changes)
+                cur.execute("SELECT kind, COUNT(*) FROM reprice_items GROUP BY kind")
+                items = dict(cur.fetchall())
+            conn.commit()
+            catalog_seconds = time.perf_counter() - started
+
+            phase = 'lines'
+            lines = {}
+            for kind in KINDS:
+                if items.get(kind):
+                    lines[kind] = _reprice_lines(conn, kind, chunk_size, lock_timeout_ms)
+
+            with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+                cur.execute("""
+                    SELECT i.project_id, p.name, SUM(i.lines) AS lines,
+                           SUM(i.delta) FILTER (WHERE i.kind = 'materials') AS materials_delta,
+                           SUM(i.delta) FILTER (WHERE i.kind = 'labor') AS labor_delta,
+                           SUM(i.delta) FILTER (WHERE i.kind = 'equipment') AS equipment_delta,
+                           SUM(i.delta) AS total_delta
+                    FROM reprice_impact i
+                    JOIN projects p ON p.id = i.project_id
+                    GROUP BY i.project_id, p.name
+                    ORDER BY ABS(SUM(i.delta)) DESC, i.project_id
+                """)
+                projects = cur.fetchall()
+        except psycopg2.Error as e:
+            logger.error("Reprice failed during %s phase: %s", phase, e)
+            raise RepriceFailed(phase, e) from e
+        finally:
+            # Temizlik hatası asıl hatanın (RepriceFailed) yerine geçmemeli
+            if not conn.closed:
+                try:
+                    conn.rollback()
+                    with conn.cursor() as cur:
+                        cur.execute("DROP TABLE IF EXISTS reprice_items, reprice_impact")
+                    conn.commit()
+                except psycopg2.Error as e:
+                    logger.warning("Reprice cleanup failed: %s", e)
+
+    def money(value):
+        return round(float(value), 2) if value is not None else 0.0
+
+    report = {
+        'mode': 'resync' if resync else 'apply',
+        'changes': [{key: change[key] for key in ('kind', 'selector', 'match', 'mode', 'value', 'items')}
+                    for change in changes],
+        'items_repriced': items,
+        'lines_updated': {kind: count for kind, (count, _) in lines.items()},
+        'chunks': {kind: count for kind, (_, count) in lines.items()},
+        'projects_affected': len(projects),
+        'total_delta': money(sum(row['total_delta'] or 0 for row in projects)),
+        'projects': [{
+            'project_id': row['project_id'],
+            'name': row['name'],
+            'lines': row['lines'],
+            'materials_delta': money(row['materials_delta']),
+            'labor_delta': money(row['labor_delta']),
+            'equipment_delta': money(row['equipment_delta']),
+            'total_delta': money(row['total_delta']),
+        } for row in projects],
+        'catalog_seconds': round(catalog_seconds, 3),
+        'seconds': round(time.perf_counter() - started, 3),
+    }
+    logger.info("Reprice finished: %s items, %s lines, %d projects in %.2fs",
+                sum(items.values()), sum(report['lines_updated'].values()),
+                len(projects), report['seconds'])
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Katalog fiyat degisikliklerini proje satirlarina uygular')
+    parser.add_argument('changes', help='Fiyat degisikligi listesi iceren JSON dosyasi')
+    parser.add_argument('--chunk-size', type=int)
+    parser.add_argument('--top', type=int, default=20, help='Ozet olarak yazdirilacak proje sayisi')
+    parser.add_argument('--resync', action='store_true',
+                        help='Katalogu degistirmeden acik satirlari guncel katalog fiyatina cek')
+    args = parser.parse_args(argv)
+
+    with open(args.changes, 'r', encoding='utf-8') as f:
+        changes = json.load(f)
+    try:
+        report = reprice(changes, chunk_size=args.chunk_size, resync=args.resync)
+    except (RepriceError, RepriceFailed) as e:
+        print(f"Hata: {e}")
+        return 1
+    report['projects'] = report['projects'][:args.top]
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -4,11 +4,20 @@ PostgreSQL veritabanı kurulum scripti
 Bu script veritabanı tablolarını oluşturur ve gerekli başlangıç verilerini ekler.
 """
 
+import argparse
+import io
+import random
+import time
+from datetime import date, datetime, timedelta
+
 import psycopg2
 import psycopg2.extras
 from flask_bcrypt import Bcrypt
 import sys
 
+from bootstrap import seed_default_users
+from migrations import LATEST_VERSION, apply_migrations
+
 # Veritabanı konfigürasyonu
 DB_CONFIG = {
     'host': 'localhost',
@@ -28,174 +37,27 @@ def create_connection():
         return None
 
 def create_tables(conn):
-    """Veritabanı tablolarını oluşturur"""
+    """Veritabanı tablolarını oluşturur (bekleyen şema geçişlerini uygular)"""
     try:
-        cur = conn.cursor()
-        
-        print("Tablolar olusturuluyor...")
-        
-        # Kullanıcılar tablosu
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS users (
-                id SERIAL PRIMARY KEY,
-                username VARCHAR(50) UNIQUE NOT NULL,
-                email VARCHAR(100) UNIQUE NOT NULL,
-                password VARCHAR(255) NOT NULL,
-                full_name VARCHAR(100) NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                is_active BOOLEAN DEFAULT TRUE,
-                last_login TIMESTAMP,
-                language VARCHAR(5) DEFAULT 'en'
-            )
-        """)
-        print("Users tablosu olusturuldu")
-        
-        # Projeler tablosu
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS projects (
-                id SERIAL PRIMARY KEY,
-                name VARCHAR(200) NOT NULL,
-                description TEXT,
-                start_date DATE,
-                end_date DATE,
-                budget DECIMAL(15,2),
-                status VARCHAR(20) DEFAULT 'active',
-                created_by INTEGER REFERENCES users(id),
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        print("Projects tablosu olusturuldu")
-        
-        # Malzemeler tablosu
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS materials (
-                id SERIAL PRIMARY KEY,
-                name VARCHAR(200) NOT NULL,
-                description TEXT,
-                unit VARCHAR(50) NOT NULL,
-                unit_price DECIMAL(10,2) NOT NULL,
-                category VARCHAR(100),
-                supplier VARCHAR(200),
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        print("Materials tablosu olusturuldu")
-        
-        # İşçilik tablosu
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS labor (
-                id SERIAL PRIMARY KEY,
-                position VARCHAR(100) NOT NULL,
-                hourly_rate DECIMAL(10,2) NOT NULL,
-                daily_rate DECIMAL(10,2),
-                description TEXT,
-                category VARCHAR(100),
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        print("Labor tablosu olusturuldu")
-        
-        # Ekipman tablosu
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS equipment (
-                id SERIAL PRIMARY KEY,
-                name VARCHAR(200) NOT NULL,
-                description TEXT,
-                daily_rate DECIMAL(10,2) NOT NULL,
-                hourly_rate DECIMAL(10,2),
-                category VARCHAR(100),
-                supplier VARCHAR(200),
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        print("Equipment tablosu olusturuldu")
-        
-        # Proje malzemeleri tablosu
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS project_materials (
-                id SERIAL PRIMARY KEY,
-                project_id INTEGER REFERENCES projects(id) ON DELETE CASCADE,
-                material_id INTEGER REFERENCES materials(id),
-                quantity DECIMAL(10,2) NOT NULL,
-                unit_price DECIMAL(10,2) NOT NULL,
-                total_price DECIMAL(15,2) GENERATED ALWAYS AS (quantity * unit_price) STORED,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        print("Project materials tablosu olusturuldu")
-        
-        # Proje işçiliği tablosu
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS project_labor (
-                id SERIAL PRIMARY KEY,
-                project_id INTEGER REFERENCES projects(id) ON DELETE CASCADE,
-                labor_id INTEGER REFERENCES labor(id),
-                hours DECIMAL(8,2) NOT NULL,
-                hourly_rate DECIMAL(10,2) NOT NULL,
-                total_cost DECIMAL(15,2) GENERATED ALWAYS AS (hours * hourly_rate) STORED,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        print("Project labor tablosu olusturuldu")
-        
-        # Proje ekipmanları tablosu
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS project_equipment (
-                id SERIAL PRIMARY KEY,
-                project_id INTEGER REFERENCES projects(id) ON DELETE CASCADE,
-                equipment_id INTEGER REFERENCES equipment(id),
-                days DECIMAL(8,2) NOT NULL,
-                daily_rate DECIMAL(10,2) NOT NULL,
-                total_cost DECIMAL(15,2) GENERATED ALWAYS AS (days * daily_rate) STORED,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        print("Project equipment tablosu olusturuldu")
-        
-        conn.commit()
-        print("Tum tablolar basariyla olusturuldu!")
+        print("Sema gecisleri uygulaniyor...")
+        applied = apply_migrations(conn)
+        if applied:
+            print(f"Uygulanan gecisler: {', '.join(map(str, applied))}")
+        print(f"Sema surumu: {LATEST_VERSION}")
         return True
-        
     except psycopg2.Error as e:
         print(f"Tablo olusturma hatasi: {e}")
         conn.rollback()
         return False
-    finally:
-        cur.close()
 
 def create_default_data(conn):
     """Varsayılan verileri oluşturur"""
     try:
         cur = conn.cursor()
-        bcrypt = Bcrypt()
-        
         print("Varsayilan kullanicilar olusturuluyor...")
         
-        # Admin kullanıcısı
-        admin_password = bcrypt.generate_password_hash('admin123').decode('utf-8')
-        cur.execute("""
-            INSERT INTO users (username, email, password, full_name, language) 
-            VALUES (%s, %s, %s, %s, %s)
-            ON CONFLICT (username) DO UPDATE SET
-                email = EXCLUDED.email,
-                password = EXCLUDED.password,
-                full_name = EXCLUDED.full_name
-        """, ('admin', 'admin@example.com', admin_password, 'System Administrator', 'en'))
-        
-        # Test kullanıcısı
-        test_password = bcrypt.generate_password_hash('test123').decode('utf-8')
-        cur.execute("""
-            INSERT INTO users (username, email, password, full_name, language) 
-            VALUES (%s, %s, %s, %s, %s)
-            ON CONFLICT (username) DO UPDATE SET
-                email = EXCLUDED.email,
-                password = EXCLUDED.password,
-                full_name = EXCLUDED.full_name
-        """, ('test', 'test@example.com', test_password, 'Test User', 'tr'))
+        # Var olan kullanıcıların parolaları korunur (bkz. bootstrap.py --reset-passwords)
+        seed_default_users(conn)
         
         print("Varsayilan kullanicilar olusturuldu!")
         print("   Admin: admin / admin123")
@@ -272,8 +134,263 @@ def create_default_data(conn):
     finally:
         cur.close()
 
+# Ölçek verisi üreteci - kapasite testleri için
+GEN_PREFIX = 'gen_'
+GEN_PROJECT_PREFIX = 'GEN-'
+COPY_CHUNK_ROWS = 100000
+
+FIRST_NAMES = ('Ahmet', 'Mehmet', 'Ayşe', 'Fatma', 'Ali', 'Zeynep', 'Mustafa', 'Elif', 'Can', 'Deniz',
+               'John', 'Mary', 'David', 'Sarah', 'Michael', 'Emma', 'Murat', 'Selin', 'Burak', 'Ece')
+LAST_NAMES = ('Yılmaz', 'Kaya', 'Demir', 'Şahin', 'Çelik', 'Yıldız', 'Aydın', 'Öztürk', 'Arslan', 'Doğan',
+              'Smith', 'Johnson', 'Brown', 'Taylor', 'Wilson', 'Koç', 'Kurt', 'Özdemir', 'Polat', 'Erdem')
+PROJECT_KINDS = ('Konut', 'Ofis', 'Okul', 'Hastane', 'Depo', 'Köprü', 'Otel', 'AVM', 'Fabrika', 'Yol')
+CITIES = ('İstanbul', 'Ankara', 'İzmir', 'Bursa', 'Antalya', 'Konya', 'Adana', 'Trabzon', 'Eskişehir', 'Kayseri')
+PROJECT_STATUSES = ('active', 'active', 'active', 'completed', 'on_hold', 'cancelled')
+DEPARTMENTS = ('Satış', 'Muhasebe', 'Operasyon', 'İnsan Kaynakları', 'Bilgi İşlem', 'Satın Alma', 'Proje Yönetimi')
+POSITIONS = ('Uzman', 'Kıdemli Uzman', 'Müdür', 'Direktör', 'Asistan', 'Mühendis', 'Stajyer')
+
+
+def _like_prefix(prefix):
+    """Öneki LIKE deseni olarak kaçışlar ('gen_' içindeki '_' tek karakter joker değildir)"""
+    return prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+
+
+def _split_lines(rng, total, capacities):
+    """total kalemi türlere rastgele böler; katalogda yeri kalmayan türe kalem düşmez"""
+    counts = [0] * len(capacities)
+    for _ in range(total):
+        candidates = [i for i, capacity in enumerate(capacities) if counts[i] < capacity]
+        if not candidates:
+            break
+        counts[rng.choice(candidates)] += 1
+    return counts
+
+
+def _copy_value(value):
+    if value is None:
+        return '\\N'
+    text = str(value)
+    return text.replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n')
+
+
+def _copy_rows(cur, table, columns, rows):
+    """Satırları parça parça COPY (text biçimi) ile yükler; yüklenen satır sayısını döndürür"""
+    sql = f"COPY {table} ({', '.join(columns)}) FROM STDIN"
+    total = 0
+    buffer = io.StringIO()
+    count = 0
+    for row in rows:
+        buffer.write('\t'.join(_copy_value(value) for value in row))
+        buffer.write('\n')
+        count += 1
+        if count >= COPY_CHUNK_ROWS:
+            buffer.seek(0)
+            cur.copy_expert(sql, buffer)
+            total += count
+            buffer = io.StringIO()
+            count = 0
+    if count:
+        buffer.seek(0)
+        cur.copy_expert(sql, buffer)
+        total += count
+    return total
+
+
+def reset_scale_data(cur):
+    """Önceki üretimden kalan verileri siler"""
+    cur.execute("DELETE FROM projects WHERE name LIKE %s", (_like_prefix(GEN_PROJECT_PREFIX),))
+    cur.execute("DELETE FROM users WHERE username LIKE %s", (_like_prefix(GEN_PREFIX),))
+    cur.execute("DELETE FROM roles WHERE name LIKE %s", (_like_prefix(GEN_PREFIX),))
+    # Katalog satırları: yalnızca üretilmiş olanlar ve hâlâ bir projede kullanılmayanlar
+    for table, name_column, line_table, fk_column in (
+        ('materials', 'name', 'project_materials', 'material_id'),
+        ('labor', 'position', 'project_labor', 'labor_id'),
+        ('equipment', 'name', 'project_equipment', 'equipment_id'),
+    ):
+        cur.execute(f"""
+            DELETE FROM {table} t
+            WHERE t.{name_column} LIKE %s
+              AND NOT EXISTS (SELECT 1 FROM {line_table} l WHERE l.{fk_column} = t.id)
+        """, (_like_prefix(GEN_PREFIX),))
+
+
+def _ensure_catalog(cur, rng, size):
+    """Malzeme/işçilik/ekipman kataloglarını en az ``size`` satıra tamamlar; id listelerini döndürür"""
+    catalogs = {}
+    specs = {
+        'materials': (('name', 'description', 'unit', 'unit_price', 'category', 'supplier'),
+                      lambda i: (f'{GEN_PREFIX}malzeme_{i:05d}', 'Üretilmiş malzeme', rng.choice(('kg', 'adet', 'm³', 'm²', 'lt')),
+                                 round(rng.uniform(0.5, 500), 2), 'İnşaat Malzemesi', f'Tedarikçi {rng.randint(1, 50)}'),
+                      'unit_price'),
+        'labor': (('position', 'hourly_rate', 'daily_rate', 'description', 'category'),
+                  lambda i: (f'{GEN_PREFIX}pozisyon_{i:05d}', round(rng.uniform(40, 150), 2), None,
+                             'Üretilmiş işçilik', rng.choice(('İnşaat', 'Elektrik', 'Tesisat', 'Boya'))),
+                  'hourly_rate'),
+        'equipment': (('name', 'description', 'daily_rate', 'hourly_rate', 'category', 'supplier'),
+                      lambda i: (f'{GEN_PREFIX}ekipman_{i:05d}', 'Üretilmiş ekipman', round(rng.uniform(100, 2000), 2), None,
+                                 'İnşaat Makinesi', f'Kiralama {rng.randint(1, 20)}'),
+                      'daily_rate'),
+    }
+    for table, (columns, make_row, price_column) in specs.items():
+        cur.execute(f"SELECT count(*) FROM {table}")
+        existing = cur.fetchone()[0]
+        if existing < size:
+            _copy_rows(cur, table, columns, (make_row(i) for i in range(existing, size)))
+        cur.execute(f"SELECT id, {price_column} FROM {table} ORDER BY id")
+        catalogs[table] = [(row[0], float(row[1])) for row in cur.fetchall()]
+    return catalogs
+
+
+def generate_scale_data(conn, users=0, projects=0, lines_per_project=20, roles=20,
+                        catalog_size=200, password_pool=8, seed=42, reset=False):
+    """Kapasite testleri için deterministik, büyük hacimli veri üretir
+
+    Kullanıcılar, projeler, proje kalemleri (malzeme/işçilik/ekipman), roller
+    ve yetki atamaları ``COPY`` ile yüklenir. bcrypt pahalı olduğu için yalnızca
+    ``password_pool`` kadar parola hash'lenir ve kullanıcılar arasında paylaşılır
+    (``gen_u0000001`` -> ``scale-pass-1``).
+    """
+    if password_pool < 1:
+        raise ValueError('password_pool must be at least 1')
+    rng = random.Random(seed)
+    bcrypt = Bcrypt()
+    started = time.perf_counter()
+    summary = {}
+
+    pool = [bcrypt.generate_password_hash(f'scale-pass-{i}').decode('utf-8') for i in range(password_pool)]
+
+    cur = conn.cursor()
+    try:
+        # Toplu yükleme: WAL beklemesini işlem sonuna ertele
+        cur.execute("SET LOCAL synchronous_commit = off")
+        if reset:
+            reset_scale_data(cur)
+
+        # Kullanıcılar
+        base = datetime(2022, 1, 1)
+        def user_rows():
+            for i in range(1, users + 1):
+                first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+                created = base + timedelta(seconds=rng.randrange(0, 3 * 365 * 86400))
+                last_login = created + timedelta(days=rng.randint(0, 365)) if rng.random() < 0.7 else None
+                yield (f'{GEN_PREFIX}u{i:07d}', f'{GEN_PREFIX}u{i:07d}@example.com', pool[i % password_pool],
+                       first, last, f'{first} {last}', rng.choice(DEPARTMENTS), rng.choice(POSITIONS),
+                       't' if rng.random() > 0.05 else 'f', created, last_login, rng.choice(('en', 'tr')))
+        summary['users'] = _copy_rows(cur, 'users', ('username', 'email', 'password', 'first_name', 'last_name',
+                                                     'full_name', 'department', 'position', 'is_active',
+                                                     'created_at', 'last_login', 'language'), user_rows())
+        cur.execute("SELECT id FROM users WHERE username LIKE %s ORDER BY id", (_like_prefix(GEN_PREFIX),))
+        user_ids = [row[0] for row in cur.fetchall()]
+
+        # Roller ve yetkiler (yetki sistemi kuruluysa)
+        cur.execute("SELECT to_regclass('permissions') IS NOT NULL AND to_regclass('user_roles') IS NOT NULL")
+        if cur.fetchone()[0] and roles:
+            _copy_rows(cur, 'roles', ('name', 'description'),
+                       ((f'{GEN_PREFIX}rol_{i:03d}', f'Üretilmiş rol {i}') for i in range(roles)))
+            cur.execute("SELECT id FROM roles WHERE name LIKE %s ORDER BY id", (_like_prefix(GEN_PREFIX),))
+            role_ids = [row[0] for row in cur.fetchall()]
+            cur.execute("SELECT id FROM permissions ORDER BY id")
+            permission_ids = [row[0] for row in cur.fetchall()]
+            if permission_ids:
+                summary['role_permissions'] = _copy_rows(cur, 'role_permissions', ('role_id', 'permission_id'), (
+                    (role_id, permission_id)
+                    for role_id in role_ids
+                    for permission_id in rng.sample(permission_ids, rng.randint(1, len(permission_ids)))
+                ))
+            summary['user_roles'] = _copy_rows(cur, 'user_roles', ('user_id', 'role_id'), (
+                (user_id, role_id)
+                for user_id in user_ids
+                for role_id in rng.sample(role_ids, min(len(role_ids), rng.randint(1, 3)))
+            ))
+            if permission_ids:
+                # Kullanıcıların ~%10'una doğrudan yetki
+                summary['user_permissions'] = _copy_rows(cur, 'user_permissions', ('user_id', 'permission_id'), (
+                    (user_id, permission_id)
+                    for user_id in user_ids if rng.random() < 0.1
+                    for permission_id in rng.sample(permission_ids, min(len(permission_ids), rng.randint(1, 3)))
+                ))
+
+        # Katalog ve projeler
+        catalogs = _ensure_catalog(cur, rng, catalog_size)
+        creators = user_ids or [None]
+        def project_rows():
+            for i in range(1, projects + 1):
+                start = date(2022, 1, 1) + timedelta(days=rng.randint(0, 3 * 365))
+                yield (f'{GEN_PROJECT_PREFIX}{i:07d} {rng.choice(CITIES)} {rng.choice(PROJECT_KINDS)}',
+                       'Üretilmiş proje', start, start + timedelta(days=rng.randint(30, 720)),
+                       round(rng.uniform(1e5, 5e7), 2), rng.choice(PROJECT_STATUSES), rng.choice(creators))
+        summary['projects'] = _copy_rows(cur, 'projects', ('name', 'description', 'start_date', 'end_date',
+                                                           'budget', 'status', 'created_by'), project_rows())
+        cur.execute("SELECT id FROM projects WHERE name LIKE %s ORDER BY id", (_like_prefix(GEN_PROJECT_PREFIX),))
+        project_ids = [row[0] for row in cur.fetchall()]
+
+        # Proje kalemleri: her projede tam lines_per_project kalem, türlere rastgele bölünür.
+        # Bir projede aynı katalog kalemi tekrar etmez; üç kataloğun toplamı
+        # lines_per_project'ten küçükse proje katalog boyutu kadar kalem alır.
+        kinds = ('materials', 'labor', 'equipment')
+        capacities = [len(catalogs[kind]) for kind in kinds]
+        splits = [_split_lines(rng, lines_per_project, capacities) for _ in project_ids]
+        def line_rows(kind):
+            catalog = catalogs[kind]
+            kind_index = kinds.index(kind)
+            for project_id, split in zip(project_ids, splits):
+                for item_id, price in rng.sample(catalog, split[kind_index]):
+                    # Birim fiyat katalog fiyatının ±%15'i
+                    unit = round(price * rng.uniform(0.85, 1.15), 2)
+                    if kind == 'materials':
+                        yield project_id, item_id, round(rng.uniform(1, 1000), 2), unit
+                    elif kind == 'labor':
+                        yield project_id, item_id, round(rng.uniform(8, 2000), 2), unit
+                    else:
+                        yield project_id, item_id, round(rng.uniform(1, 180), 2), unit
+        summary['project_materials'] = _copy_rows(cur, 'project_materials',
+                                                  ('project_id', 'material_id', 'quantity', 'unit_price'),
+                                                  line_rows('materials'))
+        summary['project_labor'] = _copy_rows(cur, 'project_labor',
+                                              ('project_id', 'labor_id', 'hours', 'hourly_rate'),
+                                              line_rows('labor'))
+        summary['project_equipment'] = _copy_rows(cur, 'project_equipment',
+                                                  ('project_id', 'equipment_id', 'days', 'daily_rate'),
+                                                  line_rows('equipment'))
+        conn.commit()
+    except psycopg2.Error:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+
+    # İstatistikleri güncelle (planlayıcı yeni hacmi görsün)
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cur:
+            cur.execute("ANALYZE")
+    finally:
+        conn.autocommit = False
+
+    summary['seconds'] = round(time.perf_counter() - started, 2)
+    return summary
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='PostgreSQL veritabani kurulumu ve olcek verisi uretimi')
+    parser.add_argument('--users', type=int, default=0, help='Uretilecek kullanici sayisi')
+    parser.add_argument('--projects', type=int, default=0, help='Uretilecek proje sayisi')
+    parser.add_argument('--lines-per-project', type=int, default=20, help='Proje basina kalem sayisi')
+    parser.add_argument('--roles', type=int, default=20, help='Uretilecek rol sayisi')
+    parser.add_argument('--catalog-size', type=int, default=200,
+                        help='Malzeme/iscilik/ekipman katalog boyutu (en az)')
+    parser.add_argument('--password-pool', type=int, default=8, help='Hashlenecek farkli parola sayisi')
+    parser.add_argument('--seed', type=int, default=42, help='Rastgele uretec tohumu')
+    parser.add_argument('--reset', action='store_true', help='Onceki uretilmis veriyi sil')
+    args = parser.parse_args(argv)
+    if args.password_pool < 1:
+        parser.error('--password-pool en az 1 olmali')
+    return args
+
+
 def main():
     """Ana fonksiyon"""
+    args = parse_args()
     print("PostgreSQL Veritabani Kurulum Scripti")
     print("=" * 50)
     
@@ -308,6 +425,19 @@ def main():
         print("\nGiris bilgileri:")
         print("   - Admin: admin / admin123")
         print("   - Test: test / test123")
+        
+        # Ölçek verisi üretimi (--users / --projects verildiyse)
+        if args.users or args.projects:
+            print("\nOlcek verisi uretiliyor...")
+            summary = generate_scale_data(
+                conn, users=args.users, projects=args.projects,
+                lines_per_project=args.lines_per_project, roles=args.roles,
+                catalog_size=args.catalog_size, password_pool=args.password_pool,
+                seed=args.seed, reset=args.reset
+            )
+            print(f"Olcek verisi yuklendi: {summary}")
+            print(f"   Uretilmis kullanicilar: {GEN_PREFIX}u0000001 / scale-pass-1 ...")
+        
         print("\nUygulamayi baslatmak icin: python app.py")
         
     except Exception as e:
@@ -4,6 +4,30 @@
 let currentUserId = null;
 let usersData = [];
 
+// Conditional GET cache: url -> { etag, data }
+const conditionalCache = new Map();
+
+// Fetch JSON with If-None-Match; a 304 reuses the previously parsed response
+function fetchJSONConditional(url) {
+    const cached = conditionalCache.get(url);
+    const headers = cached ? { 'If-None-Match': cached.etag } : {};
+    return fetch(url, { headers: headers, cache: 'no-store' })
+        .then(response => {
+            if (response.status === 304 && cached) {
+                return cached.data;
+            }
+            return response.json().then(data => {
+                const etag = response.headers.get('ETag');
+                if (etag && data.success) {
+                    conditionalCache.set(url, { etag: etag, data: data });
+                } else {
+                    conditionalCache.delete(url);
+                }
+                return data;
+            });
+        });
+}
+
 // Initialize user management page
 document.addEventListener('DOMContentLoaded', function() {
     // Get users data from window object
@@ -44,29 +68,192 @@ function initializeUserPage() {
         return new bootstrap.Tooltip(tooltipTriggerEl);
     });
 
-    // Initialize DataTable if available
-    if (typeof DataTable !== 'undefined') {
-        new DataTable('#usersTable', {
-            "pageLength": 25,
-            "order": [[ 0, "desc" ]],
-            "columnDefs": [
-                { "orderable": false, "targets": 7 } // Disable ordering on Actions column
-            ],
-            "language": {
-                "search": translations.search || "Search:",
-                "lengthMenu": translations.show_entries || "Show _MENU_ entries",
-                "info": translations.showing_entries || "Showing _START_ to _END_ of _TOTAL_ entries",
-                "infoEmpty": translations.no_entries || "No entries found",
-                "infoFiltered": translations.filtered_entries || "(filtered from _MAX_ total entries)",
-                "paginate": {
-                    "first": translations.first || "First",
-                    "last": translations.last || "Last",
-                    "next": translations.next || "Next",
-                    "previous": translations.previous || "Previous"
+    // Server-side paginated user list
+    initializeUserList();
+}
+
+// Server-side user list (keyset pagination via /api/users)
+let userListCursor = null;
+let userListRequestId = 0;
+let userListLoading = false;
+let userFilterTimer = null;
+
+function initializeUserList() {
+    const loadMoreButton = document.getElementById('loadMoreUsers');
+    const filterForm = document.getElementById('userFilterForm');
+    
+    if (loadMoreButton) {
+        userListCursor = loadMoreButton.dataset.nextCursor || null;
+        loadMoreButton.addEventListener('click', () => loadUsersPage(false));
+    }
+    
+    if (filterForm) {
+        filterForm.addEventListener('submit', function(e) {
+            e.preventDefault();
+            loadUsersPage(true);
+        });
+        filterForm.addEventListener('input', scheduleUserListReload);
+        filterForm.addEventListener('change', scheduleUserListReload);
+        // Reset event fires before the inputs are cleared
+        filterForm.addEventListener('reset', () => setTimeout(() => loadUsersPage(true), 0));
+    }
+    
+    // Export links carry the current filters and sort order
+    document.querySelectorAll('.user-export-link').forEach(link => {
+        link.addEventListener('click', () => {
+            const params = buildUserListParams(true);
+            params.set('format', link.dataset.format);
+            link.href = `/api/users/export?${params.toString()}`;
+        });
+    });
+}
+
+function scheduleUserListReload() {
+    clearTimeout(userFilterTimer);
+    userFilterTimer = setTimeout(() => loadUsersPage(true), 300);
+}
+
+function buildUserListParams(reset) {
+    const params = new URLSearchParams();
+    const filterForm = document.getElementById('userFilterForm');
+    
+    if (filterForm) {
+        for (const [key, value] of new FormData(filterForm).entries()) {
+            if (key === 'sort') {
+                const [sort, direction] = value.split(':');
+                params.set('sort', sort);
+                params.set('direction', direction || 'desc');
+            } else if (value.trim()) {
+                params.set(key, value.trim());
+            }
+        }
+    }
+    
+    if (!reset && userListCursor) {
+        params.set('cursor', userListCursor);
+    }
+    return params;
+}
+
+function loadUsersPage(reset) {
+    if (!reset && (!userListCursor || userListLoading)) {
+        return;
+    }
+    
+    // Only the latest request may update the table
+    const requestId = ++userListRequestId;
+    const loadMoreButton = document.getElementById('loadMoreUsers');
+    userListLoading = true;
+    if (loadMoreButton) {
+        loadMoreButton.disabled = true;
+    }
+    
+    fetch(`/api/users?${buildUserListParams(reset).toString()}`)
+        .then(response => response.json())
+        .then(data => {
+            if (requestId !== userListRequestId) {
+                return;
+            }
+            if (!data.success) {
+                throw new Error(data.message || 'Failed to load users');
+            }
+            
+            const tbody = document.querySelector('#usersTable tbody');
+            if (reset) {
+                tbody.innerHTML = '';
+                usersData = [];
+            }
+            
+            const emptyRow = tbody.querySelector('.no-users-row');
+            if (emptyRow) {
+                emptyRow.remove();
+            }
+            
+            data.data.users.forEach(user => {
+                tbody.appendChild(renderUserRow(user));
+                usersData.push(user);
+            });
+            
+            if (usersData.length === 0) {
+                tbody.appendChild(renderEmptyUsersRow());
+            }
+            
+            userListCursor = data.data.next_cursor;
+            if (loadMoreButton) {
+                loadMoreButton.classList.toggle('d-none', !userListCursor);
+            }
+        })
+        .catch(error => {
+            if (requestId === userListRequestId) {
+                console.error('Error loading users:', error);
+                showNotification(translations.error_loading_users || 'Error loading users', 'error');
+            }
+        })
+        .finally(() => {
+            if (requestId === userListRequestId) {
+                userListLoading = false;
+                if (loadMoreButton) {
+                    loadMoreButton.disabled = false;
                 }
             }
         });
-    }
+}
+
+function createCell(text) {
+    const cell = document.createElement('td');
+    cell.textContent = text;
+    return cell;
+}
+
+function renderUserRow(user) {
+    const row = document.createElement('tr');
+    
+    row.appendChild(createCell(user.id));
+    row.appendChild(createCell(user.username));
+    row.appendChild(createCell(user.first_name || '-'));
+    row.appendChild(createCell(user.last_name || '-'));
+    row.appendChild(createCell(user.email));
+    row.appendChild(createCell(user.country || '-'));
+    row.appendChild(createCell(user.region || '-'));
+    row.appendChild(createCell(user.department || '-'));
+    row.appendChild(createCell(user.position || '-'));
+    
+    const statusCell = document.createElement('td');
+    const badge = document.createElement('span');
+    badge.className = user.is_active ? 'badge bg-success' : 'badge bg-danger';
+    badge.textContent = user.is_active ? (translations.active || 'Active') : (translations.inactive || 'Inactive');
+    statusCell.appendChild(badge);
+    row.appendChild(statusCell);
+    
+    row.appendChild(createCell(user.created_at || '-'));
+    row.appendChild(createCell(user.last_login || translations.never || 'Never'));
+    
+    const userId = parseInt(user.id, 10);
+    const actionsCell = document.createElement('td');
+    actionsCell.innerHTML = `
+        <button class="btn btn-sm btn-outline-primary me-1" onclick="editUser('${userId}')">
+            <i class="fas fa-edit"></i>
+        </button>
+        <button class="btn btn-sm btn-outline-info me-1" onclick="managePermissions('${userId}')" title="Yetki Yönetimi">
+            <i class="fas fa-key"></i>
+        </button>
+        <button class="btn btn-sm btn-outline-danger" onclick="deleteUser('${userId}')">
+            <i class="fas fa-trash"></i>
+        </button>
+    `;
+    row.appendChild(actionsCell);
+    
+    return row;
+}
+
+function renderEmptyUsersRow() {
+    const row = document.createElement('tr');
+    row.className = 'no-users-row';
+    const cell = createCell(translations.no_users_found || 'No users found');
+    cell.colSpan = 13;
+    cell.className = 'text-center text-muted';
+    row.appendChild(cell);
+    return row;
 }
 
 // Bind event listeners
@@ -186,8 +373,7 @@ function loadPermissionsFromAPI(userId) {
     `;
     
     // Make API call to get user permissions
-    fetch(`/api/user_permissions/${userId}`)
-        .then(response => response.json())
+    fetchJSONConditional(`/api/user_permissions/${userId}`)
         .then(data => {
             if (data.success) {
                 renderPermissionsData(data.data);
@@ -604,12 +790,11 @@ function updatePermissionStats() {
     
     if (userId) {
         // Re-fetch only the user permissions data for stats
-        fetch(`/api/user_permissions/${userId}`)
-            .then(response => response.json())
+        fetchJSONConditional(`/api/user_permissions/${userId}`)
             .then(data => {
                 if (data.success) {
                     // Update only the statistics
-                    renderPermissionStats(data.permissions_by_module, data.user_permissions);
+                    renderPermissionStats(data.data.permissions_by_module, data.data.user_permissions);
                 }
             })
             .catch(error => {
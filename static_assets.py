@@ -0,0 +1,185 @@
+"""
+Parmak izli statik dosyalar ve ön sıkıştırma
+
+Derleme adımı ``static/`` altındaki her dosyayı içerik hash'i eklenmiş adla
+(``css/style.3f2a9c1b7d4e.css``) ``static/dist/`` altına kopyalar, metin
+dosyalarının ``.gz`` (ve ``brotli`` kuruluysa ``.br``) sürümlerini üretir ve
+``static/dist/manifest.json`` dosyasına özgün ad -> hash'li ad eşlemesini
+yazar. Dosya adı içerikle değiştiği için bu URL'ler bir yıl süreyle
+``immutable`` önbelleğe alınabilir; tekrar eden sayfa görüntülemelerinde
+tarayıcı statik dosya isteği yapmaz.
+
+Uygulama tarafında ``init_app`` şablonlardaki ``url_for('static', ...)``
+çağrılarını manifest üzerinden ``/assets/<hash'li ad>`` adresine çevirir.
+Manifest yoksa (derleme yapılmamışsa) normal ``/static/`` adresleri kullanılır.
+Manifest açılışta bir kez okunur; yeniden derlemeden sonra uygulama yeniden
+başlatılmalıdır.
+
+    python static_assets.py           # derle
+    python static_assets.py --clean   # manifestte olmayan eski dosyaları da sil
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import sys
+
+try:
+    import brotli
+except ImportError:  # İsteğe bağlı: pip install brotli
+    brotli = None
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+DIST_DIR = os.path.join(STATIC_DIR, 'dist')
+MANIFEST_NAME = 'manifest.json'
+
+# Ön sıkıştırılan uzantılar ve en küçük boyut (daha küçük dosyalarda kazanç yok)
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.svg', '.json', '.txt', '.html', '.map')
+MIN_COMPRESS_BYTES = 256
+
+# Hash'li dosyalar için önbellek süresi (1 yıl)
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+# Kabul edilen kodlamalar, tercih sırasıyla
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+def fingerprint(relpath, content):
+    """Dosya adına içerik hash'ini ekler: css/style.css -> css/style.<hash>.css"""
+    base, ext = os.path.splitext(relpath)
+    return f"{base}.{hashlib.sha256(content).hexdigest()[:12]}{ext}"
+
+
+def _write(path, content):
+    """Atomik yazma: yarım yazılmış dosya hiçbir zaman sunulmaz"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, 'wb') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def _compressed_variants(content):
+    variants = [('.gz', gzip.compress(content, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        variants.append(('.br', brotli.compress(content, quality=11)))
+    # Sıkıştırılmış hali daha büyükse yazılmaz
+    return [(suffix, data) for suffix, data in variants if len(data) < len(content)]
+
+
+def build(static_dir=STATIC_DIR, dist_dir=DIST_DIR, clean=False):
+    """Statik dosyaları derler; (manifest, istatistik) döndürür"""
+    manifest = {}
+    written = set()
+    stats = {'files': 0, 'bytes': 0, 'gzip_bytes': 0, 'brotli_bytes': 0}
+    for root, dirs, files in os.walk(static_dir):
+        if os.path.abspath(root) == os.path.abspath(static_dir):
+            dirs[:] = [d for d in dirs if os.path.join(root, d) != dist_dir]
+        dirs.sort()
+        for name in sorted(files):
+            source = os.path.join(root, name)
+            relpath = os.path.relpath(source, static_dir).replace(os.sep, '/')
+            with open(source, 'rb') as f:
+                content = f.read()
+            hashed = fingerprint(relpath, content)
+            manifest[relpath] = hashed
+            target = os.path.join(dist_dir, hashed)
+            written.add(target)
+            # Aynı hash'li dosya zaten varsa içerik de aynıdır
+            if not os.path.exists(target):
+                _write(target, content)
+            stats['files'] += 1
+            stats['bytes'] += len(content)
+            if name.endswith(COMPRESSIBLE_EXTENSIONS) and len(content) >= MIN_COMPRESS_BYTES:
+                for suffix, data in _compressed_variants(content):
+                    written.add(target + suffix)
+                    if not os.path.exists(target + suffix):
+                        _write(target + suffix, data)
+                    stats['gzip_bytes' if suffix == '.gz' else 'brotli_bytes'] += len(data)
+
+    manifest_path = os.path.join(dist_dir, MANIFEST_NAME)
+    _write(manifest_path, json.dumps(manifest, indent=2, sort_keys=True).encode('utf-8'))
+    written.add(manifest_path)
+
+    if clean:
+        # Dağıtım sırasında eski sayfalar eski hash'leri isteyebilir; bu yüzden isteğe bağlı
+        for root, _, files in os.walk(dist_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                if path not in written:
+                    os.remove(path)
+                    stats['removed'] = stats.get('removed', 0) + 1
+    return manifest, stats
+
+
+def load_manifest(dist_dir=DIST_DIR):
+    """Manifesti okur; yoksa ya da bozuksa boş sözlük döndürür"""
+    try:
+        with open(os.path.join(dist_dir, MANIFEST_NAME), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def init_app(app, enabled=True, dist_dir=DIST_DIR):
+    """Şablonlardaki url_for'u hash'li adreslere yönlendirir ve /assets/ rotasını ekler"""
+    from flask import abort, request, send_from_directory, url_for
+    from werkzeug.security import safe_join
+
+    manifest = load_manifest(dist_dir) if enabled else {}
+    # Yalnızca içerik hash'li adlar immutable sunulur (manifest.json ya da eski dosyalar değil)
+    hashed_names = frozenset(manifest.values())
+
+    def serve_asset(filename):
+        """Hash'li dosyayı sunar; istemci destekliyorsa ön sıkıştırılmış sürümü gönderir"""
+        if filename not in hashed_names:
+            abort(404)
+        mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        response = None
+        for encoding, suffix in ENCODINGS:
+            if not request.accept_encodings[encoding]:
+                continue
+            path = safe_join(dist_dir, filename + suffix)
+            if path and os.path.isfile(path):
+                response = send_from_directory(dist_dir, filename + suffix, mimetype=mimetype,
+                                               max_age=IMMUTABLE_MAX_AGE)
+                response.headers['Content-Encoding'] = encoding
+                break
+        if response is None:
+            response = send_from_directory(dist_dir, filename, mimetype=mimetype, max_age=IMMUTABLE_MAX_AGE)
+        response.vary.add('Accept-Encoding')
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+        return response
+
+    def asset_url_for(endpoint, **values):
+        """url_for ile aynı imza; 'static' adreslerini manifestteki hash'li adrese çevirir"""
+        if endpoint == 'static':
+            hashed = manifest.get(values.get('filename'))
+            if hashed:
+                values['filename'] = hashed
+                endpoint = 'hashed_static'
+        return url_for(endpoint, **values)
+
+    app.add_url_rule('/assets/<path:filename>', 'hashed_static', serve_asset)
+    app.jinja_env.globals['url_for'] = asset_url_for
+    app.extensions['static_assets'] = {'manifest_entries': len(manifest)}
+    return asset_url_for
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Statik dosyalari parmak izi ve on sikistirma ile derler')
+    parser.add_argument('--clean', action='store_true', help='Manifestte olmayan eski dosyalari sil')
+    args = parser.parse_args(argv)
+
+    manifest, stats = build(clean=args.clean)
+    print(f"{len(manifest)} dosya derlendi: {stats}")
+    if brotli is None:
+        print("brotli kurulu degil; yalnizca .gz uretildi")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
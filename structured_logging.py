@@ -0,0 +1,210 @@
+"""
+Kuyruk tabanlı, yapılandırılmış loglama
+
+İstek thread'i log kaydını yalnızca kuyruğa bırakır; biçimlendirme (JSON) ve
+G/Ç arka plandaki ``QueueListener`` thread'inde yapılır. Mesajlar ``%``
+biçiminde tembel olarak birleştirilir, yani filtrelenen ya da örneklemeden
+geçmeyen kayıtlar hiç biçimlendirilmez.
+
+Her kayda istek bağlamı (request_id, user_id, route) istek thread'inde
+eklenir. DEBUG kayıtları logger bazında örneklenebilir:
+
+    LOG_SAMPLING="app=0.1,rbac=0.01"
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+import time
+
+from flask import g, has_request_context, request
+
+from config import Config
+
+
+# Kayda eklenen bağlam alanları (istek dışında None)
+CONTEXT_FIELDS = ('request_id', 'user_id', 'route')
+
+# LogRecord'un standart alanları; bunların dışındaki ``extra`` alanlar JSON'a eklenir
+_RESERVED = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+class RequestContextFilter(logging.Filter):
+    """İstek bağlamını kayda ekler (istek thread'inde çalışmalı)"""
+
+    def filter(self, record):
+        if has_request_context():
+            record.request_id = getattr(g, 'request_id', None)
+            record.user_id = getattr(g, 'user_id', None)
+            record.route = request.endpoint
+        else:
+            record.request_id = record.user_id = record.route = None
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """DEBUG kayıtlarını logger bazında verilen oranla örnekler
+
+    Oran en uzun eşleşen logger önekinden alınır; eşleşme yoksa kayıt geçer.
+    """
+
+    def __init__(self, rates=None, level=logging.DEBUG):
+        super().__init__()
+        self.rates = dict(rates or {})
+        self.level = level
+        self._cache = {}
+
+    def _rate(self, name):
+        rate = self._cache.get(name)
+        if rate is None:
+            rate = 1.0
+            best = -1
+            for prefix, value in self.rates.items():
+                if (name == prefix or name.startswith(prefix + '.')) and len(prefix) > best:
+                    rate, best = value, len(prefix)
+            self._cache[name] = rate
+        return rate
+
+    def filter(self, record):
+        if record.levelno > self.level or not self.rates:
+            return True
+        rate = self._rate(record.name)
+        return rate >= 1.0 or random.random() < rate
+
+
+def parse_sampling(spec):
+    """"app=0.1,rbac=0.01" -> {'app': 0.1, 'rbac': 0.01}"""
+    rates = {}
+    for item in (spec or '').split(','):
+        name, _, value = item.partition('=')
+        if name.strip() and value.strip():
+            try:
+                rates[name.strip()] = max(0.0, min(1.0, float(value)))
+            except ValueError:
+                continue
+    return rates
+
+
+class JSONFormatter(logging.Formatter):
+    """Her kaydı tek satırlık JSON nesnesine çevirir"""
+
+    def format(self, record):
+        data = {
+            'ts': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(record.created))
+                  + '.%03d' % record.msecs,
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for field in CONTEXT_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                data[field] = value
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED and key not in CONTEXT_FIELDS and not key.startswith('_'):
+                data[key] = value
+        if record.exc_info:
+            data['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(data, default=str, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    """Geliştirme için okunabilir biçim (bağlam alanları sonda)"""
+
+    def __init__(self):
+        super().__init__('%(asctime)s %(levelname)s %(name)s %(message)s')
+
+    def format(self, record):
+        line = super().format(record)
+        context = ' '.join(f'{field}={getattr(record, field)}' for field in CONTEXT_FIELDS
+                           if getattr(record, field, None) is not None)
+        return f'{line} [{context}]' if context else line
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Kuyruğa biçimlendirmeden bırakan, kuyruk doluysa kaydı düşüren handler"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Süreç içi kuyruk: biçimlendirme listener thread'ine bırakılır.
+        # Argümanlar kayıt anındaki nesnelere referanstır; değiştirilebilir
+        # nesneler yerine değerleri loglayın.
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_handler = None
+_listener = None
+_listener_pid = None
+_lock = threading.Lock()
+
+
+def _build_listener(log_queue):
+    stream = logging.StreamHandler(sys.stderr)
+    stream.setFormatter(JSONFormatter() if Config.LOG_FORMAT == 'json' else TextFormatter())
+    listener = logging.handlers.QueueListener(log_queue, stream, respect_handler_level=True)
+    listener.start()
+    return listener
+
+
+def setup_logging():
+    """Kök logger'ı kuyruk handler'ına bağlar ve listener thread'ini başlatır"""
+    global _handler, _listener, _listener_pid
+    with _lock:
+        if _handler is not None:
+            return _handler
+        log_queue = queue.Queue(maxsize=Config.LOG_QUEUE_SIZE)
+        _handler = DroppingQueueHandler(log_queue)
+        _handler.addFilter(SamplingFilter(parse_sampling(Config.LOG_SAMPLING)))
+        _handler.addFilter(RequestContextFilter())
+
+        root = logging.getLogger()
+        for existing in list(root.handlers):
+            root.removeHandler(existing)
+        root.addHandler(_handler)
+        root.setLevel(Config.LOG_LEVEL)
+
+        _listener = _build_listener(log_queue)
+        _listener_pid = os.getpid()
+    return _handler
+
+
+def ensure_log_listener():
+    """Fork edilen worker'da listener thread'ini yeniden başlatır"""
+    global _listener, _listener_pid
+    if _handler is None or _listener_pid == os.getpid():
+        return
+    with _lock:
+        if _listener_pid != os.getpid():
+            # Ebeveynin kuyruğu kilitli kalmış olabilir; yeni kuyruk kullan
+            _handler.queue = queue.Queue(maxsize=Config.LOG_QUEUE_SIZE)
+            _listener = _build_listener(_handler.queue)
+            _listener_pid = os.getpid()
+
+
+def logging_stats():
+    if _handler is None:
+        return {}
+    return {'queued': _handler.queue.qsize(), 'dropped': _handler.dropped}
+
+
+@atexit.register
+def stop_logging():
+    """Kuyrukta kalan kayıtları yazar ve listener'ı durdurur"""
+    global _listener
+    if _listener is not None and _listener_pid == os.getpid():
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,243 @@
+"""
+Toplu kullanıcı içe aktarma
+
+İK dışa aktarımlarından gelen CSV dosyalarını tek seferde yükler:
+
+1. Satırlar doğrulanır (zorunlu alanlar, uzunluklar, dosya içi tekrarlar).
+2. Parolalar süreç havuzunda, tüm çekirdeklerde hash'lenir.
+3. Geçerli satırlar ``COPY`` ile geçici bir staging tablosuna akıtılır.
+4. Staging tablosu tek ``INSERT ... SELECT ... ON CONFLICT DO NOTHING`` ile
+   ``users`` tablosuna birleştirilir; eklenemeyen satırlar çakışma nedeniyle
+   birlikte raporlanır.
+
+Komut satırından:
+
+    python user_import.py personel.csv
+"""
+import csv
+import io
+import sys
+import time
+
+from config import Config
+from db_pool import db_connection
+from password_hashing import MAX_PASSWORD_BYTES, hash_passwords
+
+# CSV başlığında beklenen sütunlar (username, email, password zorunlu)
+IMPORT_COLUMNS = ('username', 'email', 'password', 'first_name', 'last_name',
+                  'country', 'region', 'department', 'position', 'is_active')
+REQUIRED_COLUMNS = ('username', 'email', 'password')
+COLUMN_LIMITS = {'username': 50, 'email': 100, 'full_name': 100}
+
+# Staging tablosuna COPY ile yazılan sütunlar (sıra önemli)
+STAGING_COLUMNS = ('line', 'username', 'email', 'password', 'first_name', 'last_name',
+                   'full_name', 'country', 'region', 'department', 'position', 'is_active')
+
+TRUE_VALUES = ('1', 'true', 'yes', 'evet', 'on', 'aktif', 'active')
+FALSE_VALUES = ('0', 'false', 'no', 'hayir', 'hayır', 'off', 'pasif', 'inactive')
+
+
+class UserImportError(ValueError):
+    """Dosya bütünüyle reddedildi (başlık hatası, satır sınırı vb.)"""
+
+
+class ImportTooLarge(UserImportError):
+    """Dosya satır ya da boyut sınırını aşıyor"""
+
+
+def _parse_bool(value):
+    value = (value or '').strip().lower()
+    if not value or value in TRUE_VALUES:
+        return True
+    if value in FALSE_VALUES:
+        return False
+    raise ValueError(f"Invalid is_active value: {value}")
+
+
+def parse_import_csv(text, max_rows=None):
+    """CSV metnini doğrular; (geçerli satırlar, hatalar) döndürür
+
+    Hatalar ``{'line', 'username', 'message'}`` sözlükleridir. Satır numaraları
+    başlık satırı 1 olacak şekilde dosyadaki satırlara karşılık gelir.
+    """
+    max_rows = max_rows or Config.USER_IMPORT_MAX_ROWS
+    reader = csv.DictReader(io.StringIO(text))
+    header = [name.strip().lower() for name in (reader.fieldnames or [])]
+    missing = [name for name in REQUIRED_COLUMNS if name not in header]
+    if missing:
+        raise UserImportError(f"Missing required columns: {', '.join(missing)}")
+    reader.fieldnames = header
+
+    rows = []
+    errors = []
+    seen_usernames = set()
+    seen_emails = set()
+    for line, record in enumerate(reader, start=2):
+        if len(rows) + len(errors) >= max_rows:
+            raise ImportTooLarge(f"Too many rows (max {max_rows})")
+        record = {key: (value or '').strip() for key, value in record.items() if key in IMPORT_COLUMNS}
+        username = record.get('username', '')
+        email = record.get('email', '')
+        password = record.get('password', '')
+
+        def reject(message):
+            errors.append({'line': line, 'username': username, 'message': message})
+
+        if not username or not email or not password:
+            reject('Username, email and password are required')
+            continue
+        if '@' not in email:
+            reject('Invalid email address')
+            continue
+        if len(password.encode('utf-8')) > MAX_PASSWORD_BYTES:
+            reject(f'Password longer than {MAX_PASSWORD_BYTES} bytes')
+            continue
+        try:
+            is_active = _parse_bool(record.get('is_active'))
+        except ValueError as e:
+            reject(str(e))
+            continue
+
+        first_name = record.get('first_name', '')
+        last_name = record.get('last_name', '')
+        full_name = f"{first_name} {last_name}".strip() or username
+        too_long = [name for name, value in (('username', username), ('email', email), ('full_name', full_name))
+                    if len(value) > COLUMN_LIMITS[name]]
+        if too_long:
+            reject(f"Value too long: {', '.join(too_long)}")
+            continue
+        if username in seen_usernames or email.lower() in seen_emails:
+            reject('Duplicate username or email in file')
+            continue
+        seen_usernames.add(username)
+        seen_emails.add(email.lower())
+
+        rows.append({
+            'line': line, 'username': username, 'email': email, 'password': password,
+            'first_name': first_name, 'last_name': last_name, 'full_name': full_name,
+            'country': record.get('country', ''), 'region': record.get('region', ''),
+            'department': record.get('department', ''), 'position': record.get('position', ''),
+            'is_active': is_active,
+        })
+    return rows, errors
+
+
+def _copy_buffer(rows):
+    """Satırları COPY (FORMAT csv) için bellekte CSV'ye yazar"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        values = [row[key] for key in STAGING_COLUMNS]
+        values[STAGING_COLUMNS.index('is_active')] = 't' if row['is_active'] else 'f'
+        writer.writerow(values)
+    buffer.seek(0)
+    return buffer
+
+
+def load_users(rows):
+    """Hash'lenmiş satırları COPY + tek INSERT ile yükler
+
+    Eklenen kullanıcı sayısını ve zaten var olan kullanıcı adı/e-posta
+    nedeniyle eklenemeyen satırları döndürür.
+    """
+    with db_connection() as conn, conn.cursor() as cur:
+        cur.execute("""
+            CREATE TEMP TABLE user_import_staging (
+                line INTEGER PRIMARY KEY,
+                username VARCHAR(50) NOT NULL,
+                email VARCHAR(100) NOT NULL,
+                password VARCHAR(255) NOT NULL,
+                first_name VARCHAR(100),
+                last_name VARCHAR(100),
+                full_name VARCHAR(100) NOT NULL,
+                country VARCHAR(100),
+                region VARCHAR(100),
+                department VARCHAR(100),
+                position VARCHAR(100),
+                is_active BOOLEAN NOT NULL
+            ) ON COMMIT DROP
+        """)
+        cur.copy_expert(
+            f"COPY user_import_staging ({', '.join(STAGING_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+            _copy_buffer(rows)
+        )
+        # CTE'deki INSERT ana sorgunun anlık görüntüsünde görünmez; bu yüzden
+        # users üzerindeki EXISTS kontrolleri yalnızca önceden var olan kayıtları görür
+        cur.execute("""
+            WITH inserted AS (
+                INSERT INTO users (username, email, password, first_name, last_name, full_name,
+                                   country, region, department, position, is_active, created_at)
+                SELECT username, email, password, first_name, last_name, full_name,
+                       country, region, department, position, is_active, NOW()
+                FROM user_import_staging
+                ORDER BY line
+                ON CONFLICT DO NOTHING
+                RETURNING username
+            )
+            SELECT s.line, s.username,
+                   EXISTS (SELECT 1 FROM users u WHERE u.username = s.username) AS username_taken,
+                   EXISTS (SELECT 1 FROM users u WHERE u.email = s.email) AS email_taken
+            FROM user_import_staging s
+            WHERE NOT EXISTS (SELECT 1 FROM inserted i WHERE i.username = s.username)
+            ORDER BY s.line
+        """)
+        conflicts = []
+        for line, username, username_taken, email_taken in cur.fetchall():
+            reasons = [name for name, taken in (('username', username_taken), ('email', email_taken)) if taken]
+            conflicts.append({
+                'line': line,
+                'username': username,
+                'message': f"Already exists: {', '.join(reasons) or 'username/email'}"
+            })
+        conn.commit()
+    return len(rows) - len(conflicts), conflicts
+
+
+def import_users_csv(text, max_rows=None):
+    """CSV içeriğini doğrular, hash'ler ve yükler; özet rapor döndürür"""
+    started = time.perf_counter()
+    rows, errors = parse_import_csv(text, max_rows)
+    parsed_at = time.perf_counter()
+
+    hashes = hash_passwords(row['password'] for row in rows)
+    for row, hashed in zip(rows, hashes):
+        row['password'] = hashed
+    hashed_at = time.perf_counter()
+
+    inserted, conflicts = load_users(rows) if rows else (0, [])
+    finished = time.perf_counter()
+
+    total = len(rows) + len(errors)
+    elapsed = finished - started
+    return {
+        'total_rows': total,
+        'inserted': inserted,
+        'invalid': len(errors),
+        'conflicts': len(conflicts),
+        'errors': errors + conflicts,
+        'timings': {
+            'parse': round(parsed_at - started, 3),
+            'hash': round(hashed_at - parsed_at, 3),
+            'load': round(finished - hashed_at, 3),
+            'total': round(elapsed, 3),
+        },
+        'rows_per_sec': round(total / elapsed, 1) if elapsed > 0 else None,
+    }
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 2:
+        print("Kullanim: python user_import.py <dosya.csv>")
+        sys.exit(1)
+    with open(sys.argv[1], 'r', encoding='utf-8-sig', newline='') as f:
+        content = f.read()
+    try:
+        report = import_users_csv(content)
+    except UserImportError as e:
+        print(f"Ice aktarma reddedildi: {e}")
+        sys.exit(1)
+    for error in report['errors']:
+        print(f"  satir {error['line']} ({error['username']}): {error['message']}")
+    print(f"{report['inserted']}/{report['total_rows']} kullanici eklendi, "
+          f"{report['invalid']} gecersiz, {report['conflicts']} cakisma "
+          f"({report['timings']['total']}s, {report['rows_per_sec']} satir/sn)")